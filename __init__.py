@@ -12,7 +12,7 @@
 COPYRIGHT = "Copyright (C) 2018-2020 justworx"
 
 
-import sys, time, traceback, locale, json
+import sys, time, locale, json
 try:
 	import thread
 except:
@@ -37,6 +37,16 @@ VERSION = 0.0000
 AUTO_DEBUG = True #True/False
 
 
+#
+# XDATA_LEAN
+#  - Default for `xdata.Lean`. When True, exception data omits the
+#    traceback and python version, which makes raising and handling
+#    errors much cheaper. Set `trix.xdata.Lean` to change it at any
+#    time.
+#
+XDATA_LEAN = False
+
+
 #
 # CONFIG / CACHE
 #  - Default root directory for storage of config and cache files.
@@ -138,6 +148,9 @@ class trix(object):
 	__m = __module__
 	__mm = sys.modules
 	__od = {}
+	__rc = {}
+	__nc = {}
+	__loglock = thread.allocate_lock()
 	#__tid = threading.current_thread().ident
 	#__tname = threading.current_thread().name
 	
@@ -449,6 +462,55 @@ class trix(object):
 		
 		"""
 		
+		try:
+			T = cls.__rc[modpath]
+		except KeyError:
+			T = cls.factory(modpath)
+		
+		try:
+			return T(*a, **k)
+		except BaseException as ex:
+			raise type(ex)(
+					xdata(path=modpath, a=a, k=k, T=T
+				))
+	
+	
+	#
+	#
+	# FACTORY (Independent)
+	#  - Resolved paths are cached in `trix.__rc`, so each path is split
+	#    and looked up only once. Later calls to create(), ncreate(),
+	#    factory(), and nfactory() go straight to the cached callable.
+	#
+	#
+	@classmethod
+	def factory(cls, modpath, *a, **k):
+		"""
+		Return the class (or other callable) specified by `modpath`, as
+		for `trix.create`. If *args or **kwargs are given, a callable is
+		returned with those arguments bound to it (functools.partial).
+		
+		Use `trix.factory` where the same kind of object is created many
+		times; calling the result skips all path resolution.
+		
+		>>> Socket = trix.factory("socket.socket")
+		>>> sock = Socket()
+		>>> 
+		
+		"""
+		try:
+			T = cls.__rc[modpath]
+		except KeyError:
+			T = cls.__rc[modpath] = cls.__resolve(modpath)
+		
+		if a or k:
+			return cls.module('functools').partial(T, *a, **k)
+		return T
+	
+	
+	@classmethod
+	def __resolve(cls, modpath):
+		# Resolve `modpath` to the object it names; see `trix.factory`.
 		p = modpath.split(".")
 		m = p[:-1] # module
 		o = p[-1]  # object
@@ -460,6 +522,7 @@ class trix(object):
 				T  = mm.__dict__[o]
 			else:
 				T = __builtins__[o]
+			return T
 		
 		except KeyError as ex:
 			try:
@@ -479,13 +542,6 @@ class trix(object):
 						otype=otype, mod=".".join(m), obj=o, T=T, 
 						error="err-create-fail", reason=reason, message=message
 					))
-		
-		try:
-			return T(*a, **k)
-		except BaseException as ex:
-			raise type(ex)(
-					xdata(path=modpath, a=a, k=k, obj=o, T=type(o)
-				))
 	
 	
 	#
@@ -517,14 +573,45 @@ class trix(object):
 		>>> trix.ncreate("util.console.Console").console()
 		
 		"""
-		a = a or []
-		k = k or {}
+		try:
+			T = cls.__nc[innerPath]
+		except KeyError:
+			T = cls.nfactory(innerPath)
 		
 		try:
-			return cls.create(cls.innerpath(innerPath), *a, **k)
+			return T(*a, **k)
 		except Exception as ex:
 			raise type(ex)(xdata(innerPath=innerPath, a=a, k=k))
-			
+	
+	
+	#
+	#
+	# N-FACTORY  (Independent)
+	#
+	#
+	@classmethod
+	def nfactory(cls, innerPath, *a, **k):
+		"""
+		Like `trix.factory`, but pass the inner path instead of the full
+		path. This is the fastest way to repeatedly create objects from
+		trix subpackages.
+		
+		>>> Reader = trix.nfactory("util.stream.reader.Reader")
+		>>> 
+		
+		"""
+		try:
+			T = cls.__nc[innerPath]
+		except KeyError:
+			try:
+				T = cls.factory(cls.innerpath(innerPath))
+			except Exception as ex:
+				raise type(ex)(xdata(innerPath=innerPath))
+			cls.__nc[innerPath] = T
+		
+		if a or k:
+			return cls.module('functools').partial(T, *a, **k)
+		return T
 	
 	
 	
@@ -1040,6 +1127,12 @@ class trix(object):
 		NOTE: In this case, any keyword args are passed to the JConfig 
 		      constructor.
 		
+		Parsed files are cached for as long as they're unchanged on disk,
+		so a file is read only once no matter how often it's requested.
+		Each call returns a fresh copy of the config. Call the function
+		`trix.config.invalidate()` to clear the cache (or pass a path to
+		clear just one file).
+		
 		EXAMPLE:
 		>>>
 		>>> # Return a configuration stored within a file.
@@ -1074,9 +1167,8 @@ class trix(object):
 			# by dict 
 			config.update(**k)
 		except AttributeError:
-			# by path...
-			jconf = cls.jconfig(config, **k)
-			config = jconf.obj
+			# by path... (parsed files are cached; see util.jconfig)
+			config = cls.nmodule("util.jconfig").configcache.get(config, **k)
 		return config
 	
 	
@@ -1392,7 +1484,7 @@ class trix(object):
 		
 		"""
 		try:
-			return cls.create('weakref.proxy', obj)
+			return cls.factory('weakref.proxy')(obj)
 		except BaseException:
 			return obj
 	
@@ -1501,16 +1593,23 @@ class trix(object):
 		>>> trix.scan('[1, 2, 3] frog {"x" : "stream"}').split()
 		['[1, 2, 3]', 'frog', '{"x" : "stream"}']
 		
-		The `trix.data.scan.Scanner` class is complicated, and relies on
-		many subpackages.
+		The scanner is a `trix.data.scan.FastScanner`, which has the same
+		methods as the (much slower) `Scanner` class, but works on str
+		indices rather than one charinfo object per character.
+		
+		Pass a file, Reader, mmap, or socket to scan text that's read in
+		chunks; consumed text is released as the scan proceeds, so very
+		large files may be split in constant memory.
+		>>> trix.scan(open('app.log', 'rb'), encoding='utf_8').splits(' ')
 		
 		SEE ALSO:
 		>>> from trix.data.scan import *
+		>>> help(FastScanner)
 		>>> help(Scanner)
 		>>> help(charinfo)
 
 		"""
-		return trix.ncreate('data.scan.Scanner', *a, **k)
+		return trix.ncreate('data.scan.FastScanner', *a, **k)
 	
 	
 	# -----------------------------------------------------------------
@@ -1645,7 +1744,7 @@ class trix(object):
 		tb = sys.exc_info()[2]
 		if tb:
 			try:
-				return list(traceback.extract_tb(tb))
+				return list(trix.module('traceback').extract_tb(tb))
 			finally:
 				del(tb)
 	
@@ -1665,7 +1764,7 @@ class trix(object):
 		
 		>>> xdata(a=1, b=9, c=4)
 		"""
-		return xdata(cls, data, **k)
+		return xdata(data, **k)
 	
 	
 	#
@@ -1714,17 +1813,24 @@ class trix(object):
 		#
 		"""
 		if cls.Logging < 0:
-			with thread.allocate_lock():
+			with cls.__loglock:
 				a = list(a)
 				a.append(k)
 				cls.display(a)
 		elif cls.Logging > 0:
-			with thread.allocate_lock():
-				try:
-					cls.__log(*a, **k)
-				except:
-					cls.__log = cls.ncreate('util.loglet.Loglet', cls.__m)
-					cls.__log(*a, **k)
+			#
+			# The loglet queues entries without locking, so the lock is
+			# needed only to make sure just one loglet gets created.
+			#
+			try:
+				cls.__log(*a, **k)
+			except AttributeError:
+				with cls.__loglock:
+					try:
+						cls.__log
+					except AttributeError:
+						cls.__log = cls.ncreate('util.loglet.Loglet', cls.__m)
+				cls.__log(*a, **k)
 	
 	
 	# -----------------------------------------------------------------
@@ -1882,17 +1988,7 @@ class trix(object):
 		Add trix extensions to the trix classmethod. This method is called
 		automatically, directly below.
 		"""
-		cls.tx = trix.ncreate("util.tx.TX")
-
-
-
-#
-#
-# Add Trix Extensions
-#
-#
-trix._addtx()
-tx = trix.tx
+		cls.tx = NLazy("util.tx.TX")
 
 
 
@@ -1923,6 +2019,7 @@ tx = trix.tx
 callx      = trix.callx
 config     = trix.config
 create     = trix.create
+factory    = trix.factory
 debug      = trix.debug
 display    = trix.display
 innerpath  = trix.innerpath
@@ -1937,6 +2034,7 @@ log        = trix.log
 module     = trix.module
 nconfig    = trix.nconfig
 ncreate    = trix.ncreate
+nfactory   = trix.nfactory
 nmodule    = trix.nmodule
 nprocess   = trix.nprocess
 nvalue     = trix.nvalue
@@ -1956,6 +2054,18 @@ trixc      = trix.trixc
 value      = trix.value
 
 
+#
+# CONFIG INVALIDATE
+#  - Call `trix.config.invalidate()` to clear the parsed config file
+#    cache, or `trix.config.invalidate(path)` to remove one file.
+#
+def _config_invalidate(path=None):
+	"""Clear cached config files; return the number removed."""
+	return trix.nmodule("util.jconfig").configcache.invalidate(path)
+
+trix.config.__func__.invalidate = _config_invalidate
+
+
 
 
 # -------------------------------------------------------------------
@@ -2025,6 +2135,48 @@ class NLoader(Loader):
 		Loader.__init__(self, module, value, loader=trix.nmodule)
 
 
+#
+# N-LAZY
+#
+class NLazy(object):
+	"""Intended for internal use."""
+	
+	def __init__(self, innerPath, *a, **k):
+		#
+		#Pass the inner path to a class, plus any constructor args. The
+		#object is created when any of its attributes is first requested.
+		#
+		self.__P = innerPath
+		self.__A = (a, k)
+	
+	def __repr__(self):
+		return "<%s trix.ncreate('%s')>" % (type(self).__name__, self.__P)
+	
+	@property
+	def object(self):
+		# Return the object, creating it if necessary.
+		try:
+			return self.__dict__['_NLazy__O']
+		except KeyError:
+			a, k = self.__A
+			self.__O = trix.ncreate(self.__P, *a, **k)
+			return self.__O
+	
+	def __getattr__(self, name):
+		# Called only for attributes NLazy doesn't have.
+		return getattr(self.object, name)
+
+
+
+#
+#
+# Add Trix Extensions
+#
+#
+trix._addtx()
+tx = trix.tx
+
+
 
 
 
@@ -2113,36 +2265,104 @@ class xdata(dict):
 	"""
 	Package extensive exception data into a dict.
 	Pass optional data and keyword arguments.
+	
+	The current exception's traceback is recorded as a compact tuple
+	of (file, line, name) entries; the "xtracebk" list is built from it
+	only when the dict is first read (eg, when the error is displayed).
+	
+	Set `xdata.Lean = True` to record no traceback and no python 
+	version at all - a cheaper option for production servers that may
+	raise (and handle) errors at a high rate.
 	"""
-
+	
+	Lean = XDATA_LEAN
+	
 	def __init__(self, data=None, **k):
-
+		
 		# argument management
 		data = data or {}
 		data.update(k)
 		
-		self['python-version'] = sys.version
+		if not self.Lean:
+			self['python-version'] = sys.version
 		
 		# create and populate the return dict
 		self['xdata'] = data
 		self.setdefault('xtime', time.time())
-
+		self.__frames = None
+		
 		# If this is a current exception situation,
 		# record its values
+		xtype, xval, tb = sys.exc_info()
 		try:
-			tblist = None
-			xtype, xval = sys.exc_info()[:2]
-			tblist = trix.tracebk()
-			if xtype or xval or tblist:
+			if xtype or xval:
 				self['xtype'] = xtype
-				self.__xtype  = xtype
 				self['xargs'] = xval.args
-				if tblist:
-					self['xtracebk'] = list(tblist)
+				if tb and not self.Lean:
+					frames = []
+					while tb:
+						code = tb.tb_frame.f_code
+						frames.append((code.co_filename, tb.tb_lineno, code.co_name))
+						tb = tb.tb_next
+					self.__frames = tuple(frames)
 		finally:
-			if tblist:
-				del(tblist)
-				tblist = None
+			tb = None
+	
+	
+	#
+	# TRACEBACK
+	#  - Any read of the dict's contents first adds the "xtracebk" list
+	#    of FrameSummary objects, just as the traceback module would
+	#    have produced it. Source lines are looked up only if read.
+	#
+	def __tracebk(self):
+		if self.__frames:
+			FrameSummary = trix.module('traceback').FrameSummary
+			dict.__setitem__(self, 'xtracebk', [
+					FrameSummary(f, n, nm, lookup_line=False) 
+						for f, n, nm in self.__frames
+				])
+			self.__frames = None
+	
+	def __getitem__(self, key):
+		self.__frames and self.__tracebk()
+		return dict.__getitem__(self, key)
+	
+	def __contains__(self, key):
+		self.__frames and self.__tracebk()
+		return dict.__contains__(self, key)
+	
+	def __iter__(self):
+		self.__frames and self.__tracebk()
+		return dict.__iter__(self)
+	
+	def __len__(self):
+		self.__frames and self.__tracebk()
+		return dict.__len__(self)
+	
+	def __repr__(self):
+		self.__frames and self.__tracebk()
+		return dict.__repr__(self)
+	
+	def get(self, key, default=None):
+		self.__frames and self.__tracebk()
+		return dict.get(self, key, default)
+	
+	def keys(self):
+		self.__frames and self.__tracebk()
+		return dict.keys(self)
+	
+	def values(self):
+		self.__frames and self.__tracebk()
+		return dict.values(self)
+	
+	def items(self):
+		self.__frames and self.__tracebk()
+		return dict.items(self)
+	
+	def copy(self):
+		self.__frames and self.__tracebk()
+		return dict(self)
 
 
 
@@ -2227,7 +2447,7 @@ def debug_hook(t, v, tb):
 				#
 				if tb and Debug.showtb():
 					print ("Traceback:")
-					traceback.print_tb(tb)
+					trix.module('traceback').print_tb(tb)
 				print ('')
 			
 			#
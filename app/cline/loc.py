@@ -27,22 +27,32 @@ class loc(cix): #loc(cline):
 		#  - create object base and self.sig (Eg., "en_US.utf_8")
 		#
 		cix.__init__(self)
+		
+		#
+		# BULK
+		#  - When more than one locale is given, display a dict of info 
+		#    dicts, keyed by locale. This lets one process serve many
+		#    locales. Unsupported locales are given an error dict.
+		#
+		if len(self.args) > 1:
+			rdict = {}
+			for sig in self.args:
+				try:
+					self.setloc(sig)
+					rdict[sig] = self.loc_info()
+				except Exception:
+					rdict[sig] = dict(error="err-unsupported-signature",
+							signature=self.sig
+						)
+			self.display(rdict, sort_keys=1)
+			return
+		
 		try:
 			self.sig = self.args[0]
 		except IndexError:
 			self.sig = '.'.join(locale.getlocale()) # default to System
 		
-		if self.sig and self.sig[-1]=='.':
-			self.sig = self.sig[:-1]
-		
-		try:
-			# Set the locale...
-			locale.setlocale(locale.LC_ALL, self.sig)
-		except Exception as ex:
-			raise type(ex)(xdata(error="err-unsupported-signature",
-					detail="unknown-locale-signature", signature=self.sig,
-					suggest="verify-locale-signature"
-				)) 
+		self.setloc(self.sig)
 		
 		#
 		# Display the full locale info dict.
@@ -73,8 +83,31 @@ class loc(cix): #loc(cline):
 	
 	
 	
+	def setloc(self, sig):
+		"""Set the locale to signature `sig`; store it as `self.sig`."""
+		if sig and sig[-1]=='.':
+			sig = sig[:-1]
+		self.sig = sig
+		
+		try:
+			# Set the locale...
+			locale.setlocale(locale.LC_ALL, self.sig)
+		except Exception as ex:
+			raise type(ex)(xdata(error="err-unsupported-signature",
+					detail="unknown-locale-signature", signature=self.sig,
+					suggest="verify-locale-signature"
+				)) 
+	
+	
+	
 	def get_loc_info(self):
-		"""The default action - return locale info dict."""
+		"""The default action - display locale info dict."""
+		self.display(self.loc_info(), sort_keys=1)
+	
+	
+	
+	def loc_info(self):
+		"""Return the locale info dict for the current locale."""
 		
 		rdict = {}
 		
@@ -115,7 +148,7 @@ class loc(cix): #loc(cline):
 		rdict['am'] = datetime.time(11).strftime("%p")
 		rdict['pm'] = datetime.time(21).strftime("%p")
 		
-		self.display(rdict, sort_keys=1)
+		return rdict
 	
 	
 	
@@ -0,0 +1,122 @@
+#
+# Copyright 2018-2020 justworx
+# This file is part of the trix project, distributed under
+# the terms of the GNU Affero General Public License.
+#
+
+from . import *
+
+
+class startup(cline):
+	"""
+	Report the import cost of each module loaded at startup.
+	
+	With no arguments, `import trix` is profiled. Any arguments are
+	taken as a cline command, which is run (with its output discarded)
+	and profiled.
+	
+	Pass --top=N to list the N costliest modules (default 25; 0 for
+	all), and --sort=cumulative to sort by cumulative time instead of
+	each module's own import time. Pass the -t flag to list only trix
+	modules.
+	
+	These options must come before the command; everything from the
+	first other argument on (or everything after `--`) is the command
+	to profile, passed along as given.
+	
+	```
+	python3 -m trix startup
+	python3 -m trix startup version
+	python3 -m trix startup --top=10 --sort=cumulative echo test
+	python3 -m trix startup -t -- test --verbose
+	
+	```
+	
+	"""
+	
+	def __init__(self):
+		cline.__init__(self)
+		os = trix.module('os')
+		subprocess = trix.module('subprocess')
+		
+		opts, args = self.options(sys.argv[2:])
+		top = int(opts.get('top', 25))
+		sort = 2 if opts.get('sort') == 'cumulative' else 1
+		
+		# the command to profile
+		pkg = trix.innerpath()
+		argv = [sys.executable, '-X', 'importtime']
+		if args:
+			argv.extend(['-m', pkg] + args)
+		else:
+			argv.extend(['-c', 'import %s' % pkg])
+		
+		# make sure the package can be found from any directory
+		root = sys.modules[pkg.split('.')[0]].__file__
+		root = os.path.dirname(os.path.dirname(os.path.abspath(root)))
+		env = dict(os.environ)
+		env['PYTHONPATH'] = os.pathsep.join(
+				[root] + [p for p in [env.get('PYTHONPATH')] if p]
+			)
+		
+		p = subprocess.run(argv, env=env, stdout=subprocess.DEVNULL,
+				stderr=subprocess.PIPE, universal_newlines=True
+			)
+		
+		rows = self.parse(p.stderr)
+		count = len(rows)
+		total = sum([r[1] for r in rows])
+		if opts.get('t'):
+			rows = [r for r in rows if (r[0]+'.').startswith(pkg+'.')]
+		
+		rows.sort(key=lambda r: r[sort], reverse=True)
+		
+		print ("Startup: %s" % ' '.join(argv[3:]))
+		print ("  %10s %10s  %s" % ("self ms", "cumul ms", "module"))
+		for name, us, cumul in (rows[:top] if top else rows):
+			print ("  %10.2f %10.2f  %s" % (us/1000.0, cumul/1000.0, name))
+		print ("  %10.2f ms total, %i modules" % (total/1000.0, count))
+	
+	
+	@classmethod
+	def options(cls, args):
+		"""
+		Split startup's own leading options (--top, --sort, -t) from the
+		command to profile. Return an options dict and the command args.
+		
+		>>> startup.options(['--top=5', '-t', 'test', '--top=1', '-x'])
+		({'top': '5', 't': True}, ['test', '--top=1', '-x'])
+		"""
+		opts = {}
+		args = list(args)
+		while args:
+			a = args[0]
+			key = a[2:].split('=')[0] if a[:2] == '--' else None
+			if a == '--':
+				args.pop(0)
+				break
+			elif key in ('top', 'sort') and ('=' in a):
+				opts[key] = a.split('=', 1)[1]
+			elif a == '-t':
+				opts['t'] = True
+			else:
+				break
+			args.pop(0)
+		return opts, args
+	
+	
+	@classmethod
+	def parse(cls, text):
+		"""
+		Parse `-X importtime` output into [module, self-us, cumulative-us]
+		lists.
+		"""
+		rows = []
+		for line in text.splitlines():
+			if line.startswith('import time:'):
+				try:
+					us, cumul, name = line[12:].split('|')
+					rows.append([name.strip(), int(us), int(cumul)])
+				except ValueError:
+					pass # the header line
+		return rows
@@ -13,6 +13,24 @@ from ..util.xqueue import *
 
 SERVICES_NCONFIG = "app/config/service/en.service.conf"
 
+#
+# DEF_BATCH
+#  - The maximum number of events a Service will pull from each of its
+#    queue pairs per pass through the `Services.io` loop.
+#
+DEF_BATCH = 16
+
+#
+# CACHE
+#  - DEF_CACHE_SIZE : default maximum number of cached replies
+#  - DEF_CACHE_TTL  : default seconds a cached reply remains valid
+#  - CACHE_INVALIDATE : command that clears cached replies; pass 
+#                       method names to clear only their replies
+#
+DEF_CACHE_SIZE = 256
+DEF_CACHE_TTL = 60
+CACHE_INVALIDATE = "service-cache-invalidate"
+
 
 #
 # --------- SERVICES -----------------
@@ -42,6 +60,7 @@ class Services(Runner):
 		Runner.__init__(self, config, **k)
 		
 		self.__services = {}
+		self.__server = None
 		
 		serviceConfDict = config['services']
 		for sid in serviceConfDict:
@@ -51,30 +70,48 @@ class Services(Runner):
 			
 			# prep for potential errors
 			n_create = n_config = o_create = o_config = realconf = None
+			factory = None
 			
 			# get config and create the object
 			if "ncreate" in sconfig:
 				n_create = sconfig['ncreate']
 				n_config = sconfig.get('nconfig')
 				realconf = [trix.nconfig(n_config)]
-			elif "ncreate" in sconfig:
+				factory = ['ncreate', n_create, realconf]
+			elif "create" in sconfig:
 				o_create = sconfig['create']
 				o_config = sconfig.get('config')
 				realconf = [trix.config(o_config)]
+				factory = ['create', o_create, realconf]
 			else:
 				realconf = [serviceConfDict]
 			
 			# Create the object.
 			try:
-				sobject = trix.ncreate(n_create, *realconf)
+				if o_create:
+					sobject = trix.create(o_create, *realconf)
+				else:
+					sobject = trix.ncreate(n_create, *realconf)
 			except Exception as ex:
 				raise type(ex)(xdata(
 					n_create=n_create, n_config=n_config, o_create=o_create,
 					o_config=o_config, realconf=realconf, sid=sid
 				))
 			
-			# create, store, and start the service object
-			self.__services[sid] = Service(sid, sobject)
+			#
+			# Create the service object with the executor specified by
+			# the service config; the default executor is "serial".
+			#
+			service = Service(sid, sobject, factory=factory)
+			if sconfig.get('cache'):
+				service.cache = ServiceCache(sconfig['cache'])
+			service.executor = ServiceExecutor.create(
+					service, sconfig.get('executor'), 
+					limit=sconfig.get('limit'), batch=sconfig.get('batch')
+				)
+			
+			# store the service object
+			self.__services[sid] = service
 		
 		#
 		# Start running the Services io loop (in a thread!)
@@ -104,6 +141,54 @@ class Services(Runner):
 			self.__services[s].handle_io()
 	
 	
+	# SERVICES - CLOSE
+	def close(self):
+		"""
+		Shut down the executors of all services, and the server if it's
+		been started by `serve()`, then close.
+		"""
+		try:
+			for s in self.__services:
+				self.__services[s].executor.shutdown()
+		except AttributeError:
+			pass
+		try:
+			if self.__server:
+				self.__server.shutdown()
+				self.__server = None
+		except AttributeError:
+			pass
+		Runner.close(self)
+	
+	
+	# SERVICES - SERVE
+	def serve(self, config=0, **k):
+		"""
+		Expose these services on a port so that they may be called from
+		other processes (or hosts) using RemoteServiceConnect.
+		
+		Pass `config` (a port, url, or dict) as for `trix.net.Server`;
+		the default, 0, listens on a random port. Kwargs are passed to 
+		the server. Returns the running Server object; its `port` is the
+		port to which remote connections should be made.
+		
+		>>> s = Services(config)
+		>>> port = s.serve(0).port
+		>>>
+		>>> # ...then, from any process:
+		>>> c = RemoteServiceConnect(port, 'enc')
+		>>> c.validate('utf8').reply
+		'utf_8'
+		
+		"""
+		k.setdefault('sleep', self.sleep)
+		k['nhandler'] = "net.handler.hservice.HandleService"
+		k['handlerk'] = dict(services=trix.proxify(self))
+		self.__server = trix.ncreate("net.server.Server", config, **k)
+		self.__server.start()
+		return self.__server
+	
+	
 	# SERVICES - CONNECT
 	def connect(self, serviceid):
 		"""
@@ -111,8 +196,8 @@ class Services(Runner):
 		gives access to the service's features.
 		
 		Pass an event object to ServiceConnect using the `request` method,
-		then poll `replies` to receive events in the same order as they
-		were given. Check `Event.reply` (or Event.error) for the result.
+		then call the returned future's `result` method to receive the
+		reply event. Check `Event.reply` (or Event.error) for the result.
 		"""
 		#
 		# all you have to do is add a queue pair to the id'd service
@@ -157,6 +242,293 @@ class ServiceIO(object):
 
 
 
+#
+# --------- SERVICE EXECUTOR -----------------
+#
+class ServiceExecutor(object):
+	"""
+	Executes requests on behalf of a Service.
+	
+	The base class is the "serial" executor. It handles each request
+	immediately, on the `Services` runner thread, delivering its reply
+	before returning. Subclasses hand requests off to a pool of threads
+	or processes so that a slow call doesn't block every service.
+	
+	Executors are selected per-service by the "executor" key of the
+	services config:
+	 * "serial"    - handle requests on the Services thread (default)
+	 * "threads:N" - handle requests in a pool of N threads
+	 * "process:N" - handle requests in a pool of N processes
+	
+	Optional config keys "limit" (the maximum number of requests that
+	may be in progress at once) and "batch" (the maximum number of 
+	events pulled from each queue pair per pass) tune the executor.
+	
+	>>> config = {"services" : {"enc" : {
+	...   "ncreate" : "util.enchelp.EncodingHelper",
+	...   "executor" : "threads:4", "limit" : 8
+	... }}}
+	>>> s = Services(config)
+	
+	"""
+	
+	Mode = "serial"
+	
+	#
+	# CREATE
+	#
+	@classmethod
+	def create(cls, service, spec=None, **k):
+		"""
+		Return an executor for `service` as described by `spec`, a 
+		string in the form "mode[:workers]". Kwargs "limit" and "batch"
+		are passed to the executor's constructor.
+		"""
+		spec = spec or cls.Mode
+		mode, sep, workers = spec.partition(":")
+		try:
+			T = ExecutorModes[mode.strip().lower()]
+			workers = int(workers) if workers else 1
+		except (KeyError, ValueError) as ex:
+			raise ValueError("err-executor-spec", xdata(
+					spec=spec, modes=list(ExecutorModes.keys())
+				))
+		return T(service, workers, **k)
+	
+	
+	#
+	# INIT
+	#
+	def __init__(self, service, workers=1, limit=None, batch=None):
+		"""
+		Pass the `Service` this executor will serve, the number of 
+		`workers`, and optional `limit` and `batch` values.
+		"""
+		self.__service = service
+		self.__workers = max(1, int(workers))
+		self.__limit = int(limit or 2*self.__workers)
+		self.__batch = int(batch or DEF_BATCH)
+		self.__pending = 0
+		self.__lock = thread.allocate_lock()
+	
+	@property
+	def service(self):
+		"""The Service object this executor serves."""
+		return self.__service
+	
+	@property
+	def mode(self):
+		"""The executor mode: "serial", "threads", or "process"."""
+		return self.Mode
+	
+	@property
+	def workers(self):
+		"""The number of workers."""
+		return self.__workers
+	
+	@property
+	def limit(self):
+		"""Maximum number of requests that may be pending at once."""
+		return self.__limit
+	
+	@property
+	def batch(self):
+		"""Maximum number of events to pull per queue pair per pass."""
+		return self.__batch
+	
+	@property
+	def pending(self):
+		"""Number of requests submitted but not yet delivered."""
+		return self.__pending
+	
+	@property
+	def available(self):
+		"""Number of requests that may be submitted right now."""
+		return self.__limit - self.__pending
+	
+	
+	#
+	# SUBMIT
+	#
+	def submit(self, e, qout):
+		"""
+		Handle event `e`, then put it into `qout` with its reply (or 
+		error) set.
+		"""
+		try:
+			e.reply = self.service._handle_request(e)
+		except Exception:
+			e.error = xdata(e=e.dict)
+		self.deliver(e, qout)
+	
+	
+	#
+	# DELIVER
+	#
+	def deliver(self, e, qout):
+		"""Return event `e` to the caller through `qout`."""
+		self.service.deliver(e, qout)
+	
+	
+	#
+	# SHUTDOWN
+	#
+	def shutdown(self):
+		"""Release any resources held by this executor."""
+		pass
+	
+	
+	#
+	# STATUS
+	#
+	def status(self):
+		"""Return a dict describing this executor."""
+		return dict(
+				mode=self.mode, workers=self.workers, limit=self.limit,
+				batch=self.batch, pending=self.pending
+			)
+	
+	
+	# ---- pending-count management, for pooled subclasses -----
+	
+	def _acquire(self):
+		with self.__lock:
+			self.__pending += 1
+	
+	def _release(self):
+		with self.__lock:
+			self.__pending -= 1
+
+
+
+
+#
+# --------- THREAD EXECUTOR -----------------
+#
+class ThreadExecutor(ServiceExecutor):
+	"""
+	Handles requests in a pool of threads.
+	
+	The wrapped object is shared by all threads in the pool, so it must
+	be safe for concurrent use.
+	"""
+	
+	Mode = "threads"
+	
+	def __init__(self, service, workers=1, **k):
+		ServiceExecutor.__init__(self, service, workers, **k)
+		self.__pool = self._createpool()
+	
+	
+	#
+	# SUBMIT
+	#
+	def submit(self, e, qout):
+		"""Submit event `e` to the pool; its reply goes to `qout`."""
+		self._acquire()
+		try:
+			f = self._submit(e)
+		except BaseException:
+			self._release()
+			raise
+		f.add_done_callback(lambda f: self._done(f, e, qout))
+	
+	
+	#
+	# SHUTDOWN
+	#
+	def shutdown(self):
+		"""Shut down the pool without waiting for pending requests."""
+		self.pool.shutdown(wait=False)
+	
+	
+	@property
+	def pool(self):
+		"""The `concurrent.futures` executor that handles requests."""
+		return self.__pool
+	
+	
+	def _createpool(self):
+		futures = trix.module("concurrent.futures")
+		return futures.ThreadPoolExecutor(self.workers)
+	
+	def _submit(self, e):
+		return self.pool.submit(self.service._handle_request, e)
+	
+	
+	def _done(self, f, e, qout):
+		try:
+			e.reply = f.result()
+		except Exception:
+			e.error = xdata(e=e.dict)
+		finally:
+			self._release()
+		self.deliver(e, qout)
+
+
+
+
+#
+# --------- PROCESS EXECUTOR -----------------
+#
+class ProcessExecutor(ThreadExecutor):
+	"""
+	Handles requests in a pool of processes.
+	
+	Each worker process creates its own copy of the wrapped object from
+	the service's "ncreate" (or "create") config, so the object's state
+	is not shared between workers - or with the object held by the
+	Service itself. Event arguments and replies must be picklable.
+	"""
+	
+	Mode = "process"
+	
+	def __init__(self, service, workers=1, **k):
+		if not service.factory:
+			raise ValueError("err-executor-process", xdata(
+					reason="service-config-required", 
+					serviceid=service.serviceid
+				))
+		
+		ThreadExecutor.__init__(self, service, workers, **k)
+	
+	def _createpool(self):
+		futures = trix.module("concurrent.futures")
+		return futures.ProcessPoolExecutor(
+				self.workers, initializer=_process_init, 
+				initargs=tuple(self.service.factory)
+			)
+	
+	def _submit(self, e):
+		return self.pool.submit(_process_call, e.argv, e.kwargs)
+
+
+
+#
+# PROCESS EXECUTOR - WORKER FUNCTIONS
+#  - These run within worker processes; each worker creates its own
+#    wrapped object, then calls it for each request.
+#
+_process_wrap = None
+
+def _process_init(createfn, path, conf):
+	global _process_wrap
+	_process_wrap = Wrap(getattr(trix, createfn)(path, *conf))
+
+def _process_call(argv, kwargs):
+	return _process_wrap(*argv, **kwargs)
+
+
+
+ExecutorModes = dict(
+	serial  = ServiceExecutor,
+	threads = ThreadExecutor,
+	process = ProcessExecutor
+)
+
+
+
+
 #
 # --------- SERVICE -----------------
 #
@@ -174,14 +546,17 @@ class Service(ServiceIO):
 	See the ServiceConnect help for usage notes/examples.
 	
 	"""
-	def __init__(self, serviceid, sobject):
+	def __init__(self, serviceid, sobject, factory=None):
 		ServiceIO.__init__(self)
 		
 		self.__starttime = time.time()
 		self.__serviceid = serviceid
 		self.__object = sobject
 		self.__wrapper = Wrap(sobject)
+		self.__factory = factory
 		self.__qpairs = []
+		self.executor = ServiceExecutor(self)
+		self.cache = None
 	
 	
 	@property
@@ -202,6 +577,14 @@ class Service(ServiceIO):
 		"""Time in seconds (float) since this services' creation."""
 		return time.time() - self.__starttime
 	
+	@property
+	def factory(self):
+		"""
+		The [createfn, path, config] list from which the wrapped object
+		was created, or None.
+		"""
+		return self.__factory
+	
 	
 	# SERVICE - ADD QUEUES
 	def addqueues(self, qproxypair):
@@ -213,29 +596,65 @@ class Service(ServiceIO):
 	def handle_io(self):
 		"""To be called only by the owning Services object."""
 		
-		for queues in self.__qpairs:
+		x = self.executor
+		for queues in list(self.__qpairs):
+			e = None
 			try:
 				qin, qout = queues
 				
-				# pop an event request from the Queue
-				e = qin.get_nowait()
-				
-				# execute the command
-				e.reply = self._handle_request(e)
-				
-				# Set the reply and return the event to the caller via the
-				# out-queue (which is the client's in-queue).
-				qout.put(e)
+				#
+				# Pull up to `x.batch` events from the Queue, as long as the
+				# executor's concurrency limit allows. The executor sets the
+				# reply and returns each event to the caller via the out-
+				# queue (which is the client's in-queue).
+				#
+				for i in range(x.batch):
+					if x.available < 1:
+						return
+					e = qin.get_nowait()
+					
+					#
+					# Status and cache-invalidation requests are answered
+					# immediately, as are requests with a cached reply.
+					#
+					if not e.argc:
+						e.reply = self._handle_request(e)
+						qout.put(e)
+					elif e.argv[0] == CACHE_INVALIDATE:
+						c = self.cache
+						e.reply = c.invalidate(*e.argv[1:]) if c else 0
+						qout.put(e)
+					elif self.cache and self.cache.lookup(e):
+						qout.put(e)
+					else:
+						x.submit(e, qout)
 			
 			except Empty:
 				pass
 			except ReferenceError:
 				self.__qpairs.remove(queues)
 			except Exception:
+				if self.cache:
+					self.cache.discard(e)
 				e.error = xdata(qin=qin,qout=qout,e=e.dict)
 				qout.put(e) # report the error!
 	
 	
+	# SERVICE - DELIVER
+	def deliver(self, e, qout):
+		"""
+		Return event `e` to the caller through `qout`, caching its reply
+		if this service caches replies.
+		"""
+		if self.cache:
+			self.cache.store(e)
+		try:
+			qout.put(e)
+		except ReferenceError:
+			# the ServiceConnect is gone; there's no one to reply to
+			pass
+	
+	
 	# SERVICE - HANDLE REQUEST
 	def _handle_request(self, e):
 		"""Internal use only. Calls the wrapper, returns a value."""
@@ -247,7 +666,8 @@ class Service(ServiceIO):
 		if not e.argc:
 			return dict(
 					service=self.serviceid, uptime=self.uptime, 
-					target=repr(self.__object)
+					target=repr(self.__object), executor=self.executor.status(),
+					cache=self.cache.status() if self.cache else None
 				)
 				# TODO: Add wrapped object's attrs to this dict.
 		
@@ -267,6 +687,211 @@ class Service(ServiceIO):
 
 
 
+#
+# --------- SERVICE CACHE -----------------
+#
+class ServiceCache(object):
+	"""
+	Memoizes the replies of idempotent service methods.
+	
+	A ServiceCache is created for any service whose config contains a
+	"cache" dict. Only the methods named in the cache config's "methods"
+	are cached. The "methods" value may be a list of method names, or a
+	dict mapping method names to their time-to-live, in seconds.
+	
+	A method's ttl of None means the cache's default "ttl" (60 seconds,
+	unless given). A ttl of 0 means the method's replies are not cached
+	at all; a default "ttl" of None keeps replies until they're dropped
+	or invalidated.
+	
+	>>> config = {"services" : {"dir" : {
+	...   "ncreate" : "fs.dir.Dir",
+	...   "cache"   : {
+	...     "size"    : 128,           # max number of cached replies
+	...     "ttl"     : 30,            # default time-to-live
+	...     "methods" : {"ls" : 5, "path" : None}
+	...   }
+	... }}}
+	
+	Replies are keyed by the request Event's `argv` and `kwargs`. The
+	least-recently used reply is dropped when the cache is full. Each
+	caller receives its own copy of a cached reply, so replies may be
+	changed without affecting the cache. Send
+	the CACHE_INVALIDATE command to clear cached replies:
+	
+	>>> c = Services(config).connect('dir')
+	>>> c(CACHE_INVALIDATE)            # clear all cached replies
+	>>> c(CACHE_INVALIDATE, 'ls')      # clear only 'ls' replies
+	
+	Hit and miss counts are included in the service's status reply.
+	"""
+	
+	def __init__(self, config=None, **k):
+		"""Pass a cache config dict and/or kwargs."""
+		config = dict(config or {})
+		config.update(k)
+		
+		methods = config.get('methods') or {}
+		if not isinstance(methods, dict):
+			methods = dict.fromkeys(methods)
+		
+		self.__size = int(config.get('size', DEF_CACHE_SIZE))
+		self.__ttl = config.get('ttl', DEF_CACHE_TTL)
+		self.__methods = {}
+		for m in methods:
+			ttl = self.__ttl if methods[m] is None else methods[m]
+			if ttl != 0:
+				self.__methods[m] = ttl
+		
+		self.__cache = trix.module("collections").OrderedDict()
+		self.__copy = trix.module("copy").deepcopy
+		self.__lock = thread.allocate_lock()
+		self.__generation = 0
+		self.__hitcount = 0
+		self.__misscount = 0
+		self.__evictcount = 0
+	
+	
+	@property
+	def methods(self):
+		"""Dict - cached method names and their time-to-live."""
+		return dict(self.__methods)
+	
+	
+	#
+	# LOOKUP
+	#
+	def lookup(self, e):
+		"""
+		If a valid reply is cached for event `e`, set `e.reply` and return
+		True. Otherwise, return False; the reply will be cached when the
+		event is passed to `store`.
+		"""
+		if e.argv[0] not in self.__methods:
+			return False
+		
+		key = self.key(e)
+		with self.__lock:
+			item = self.__cache.get(key)
+			if item and ((item[0] is None) or (item[0] > time.time())):
+				self.__cache.move_to_end(key)
+				self.__hitcount += 1
+				e.reply = self.__copy(item[1])
+				return True
+			
+			# remember the key (and generation) for `store`
+			self.__misscount += 1
+			e._cachemiss = (key, self.__generation)
+			return False
+	
+	
+	#
+	# STORE
+	#
+	def store(self, e):
+		"""Cache the reply to an event that missed on `lookup`."""
+		miss = self.discard(e)
+		with self.__lock:
+			
+			#
+			# Don't cache errors, or replies to requests that were made
+			# before the most recent invalidation.
+			#
+			if (not miss) or (e.error is not None):
+				return
+			key, generation = miss
+			if (generation != self.__generation) or (
+					e.argv[0] not in self.__methods):
+				return
+			
+			ttl = self.__methods[e.argv[0]]
+			expires = (time.time() + ttl) if ttl is not None else None
+			self.__cache[key] = (expires, self.__copy(e.reply))
+			self.__cache.move_to_end(key)
+			while len(self.__cache) > self.__size:
+				self.__cache.popitem(last=False)
+				self.__evictcount += 1
+	
+	
+	def discard(self, e):
+		"""
+		Forget that event `e` missed on `lookup`, so that its reply won't
+		be cached. Returns the (key, generation) noted by `lookup`, or
+		None. Every event that missed must be passed to `store` or here
+		before it's returned to the caller.
+		"""
+		miss = getattr(e, '_cachemiss', None)
+		if miss:
+			e._cachemiss = None
+		return miss
+	
+	
+	#
+	# INVALIDATE
+	#
+	def invalidate(self, *methods):
+		"""
+		Clear cached replies for the given method names, or all cached
+		replies if no methods are named. Returns the number of replies
+		removed.
+		"""
+		with self.__lock:
+			self.__generation += 1
+			if not methods:
+				n = len(self.__cache)
+				self.__cache.clear()
+				return n
+			
+			kk = [k for k in self.__cache if k[0] in methods]
+			for k in kk:
+				del(self.__cache[k])
+			return len(kk)
+	
+	
+	#
+	# STATUS
+	#
+	def status(self):
+		"""Return a dict with cache size and hit/miss counts."""
+		return dict(
+				size=len(self.__cache), maxsize=self.__size, 
+				hits=self.__hitcount, misses=self.__misscount,
+				evictions=self.__evictcount, methods=self.methods
+			)
+	
+	
+	#
+	# KEY
+	#
+	@classmethod
+	def key(cls, e):
+		"""
+		Return a hashable key derived from event `e`'s argv and kwargs.
+		The method name is always the first item of the key.
+		"""
+		return (e.argv[0], cls.freeze(e.argv[1:]), cls.freeze(e.kwargs))
+	
+	
+	@classmethod
+	def freeze(cls, x):
+		"""Return a hashable equivalent of list, dict, or set `x`."""
+		if isinstance(x, dict):
+			return tuple(sorted(
+					[(k, cls.freeze(x[k])) for k in x], key=lambda i: repr(i[0])
+				))
+		elif isinstance(x, (list, tuple)):
+			return tuple([cls.freeze(v) for v in x])
+		elif isinstance(x, (set, frozenset)):
+			return frozenset([cls.freeze(v) for v in x])
+		try:
+			hash(x)
+			return x
+		except TypeError:
+			return repr(x)
+
+
+
+
 #
 # --------- SERVICE CONNECT -----------------
 #
@@ -283,6 +908,10 @@ class ServiceConnect(ServiceIO):
 	There's never a reason (nor a practical use) for creating a
 	ServiceConnect object directly.
 	
+	Every request returns a `ServiceFuture`. Accessing an attribute of
+	the future (eg, `reply`, `error`, or `dict`) waits for the reply, 
+	so the future may be used as though it were the reply Event itself.
+	
 	# EXAMPLE
 	from trix.app.service import *
 	s = Services()                    # Services starts automatically
@@ -296,12 +925,25 @@ class ServiceConnect(ServiceIO):
 	e = c.fetchn(e.reply)             # pass the cursor to fetchn()
 	e.reply                           # get the result
 	
+	# FUTURES
+	f = c.getnets()                   # returns immediately
+	f.done()                          # True when the reply is in
+	e = f.result()                    # wait for the reply Event
+	
+	# ASYNC
+	e = await c.getnets()             # from within a coroutine
+	
+	# BATCH
+	ee = c.batch([['addnet', "irc.a.net"], ['addnet', "irc.b.net"]])
+	
 	NOTES:
 	 * ServiceConnect requests time out after 9 seconds. This default 
 	   value may be changed by setting ServiceConnect.CallTimeout to
 	   a different value. It may be changed per request by passing
 	   keyword argument "service_connect_timeout" as a float - the 
 	   number of seconds to wait before timeout.
+	 * Each request Event is given a correlation id (`Event.cid`) so
+	   that replies may arrive in any order.
 	"""
 	
 	CallTimeout = 9
@@ -320,32 +962,29 @@ class ServiceConnect(ServiceIO):
 		#
 		self.__qout, self.__qin = queues
 		self.__sid = serviceid
+		
+		#
+		# Replies are matched to requests by correlation id. Only one
+		# thread at a time reads the in-queue; it files each reply by 
+		# cid and wakes any other waiting threads.
+		#
+		self.__cids = trix.module("itertools").count(1)
+		self.__pending = {}
+		self.__replies = {}
+		self.__reading = False
+		self.__cond = trix.module("threading").Condition()
 	
 	
 	def __call__(self, cmd, *a, **k):
 		"""
-		Create and pass an event to the Service. Wait for and return the
-		reply. Raise if there's an exception.
+		Create and pass an event to the Service. Returns a ServiceFuture
+		that waits for and returns the reply.
 		"""
-		c = Event(cmd, *a, **k)
-		self.__qout.put(c)
-		
 		# don't let this block the program forever. Default: 9 sec
 		tout = trix.kpop(k, 'service_connect_timeout')
 		tout = tout.get('service_connect_timeout', self.CallTimeout)
-		tin = time.time()
 		
-		# loop until result (or timeout)
-		r = None
-		while not r:
-			try:
-				r = self.__qin.get_nowait()
-				if r:
-					return r
-				time.sleep(0.01)
-			except Empty:
-				if time.time() - tin > tout:
-					raise Exception("ServiceConnect Timeout", tout)
+		return self.request(Event(cmd, *a, **k), tout)
 	
 	
 	def __getattr__(self, name):
@@ -364,6 +1003,483 @@ class ServiceConnect(ServiceIO):
 		"""
 		return SCCaller(self, name)
 	
+	
+	@property
+	def serviceid(self):
+		"""The id of the service this object connects to."""
+		return self.__sid
+	
+	@property
+	def pending(self):
+		"""Count of requests whose replies have not yet been read."""
+		with self.__cond:
+			return len(self.__pending) + len(self.__replies)
+	
+	
+	#
+	# REQUEST
+	#
+	def request(self, e, timeout=None):
+		"""
+		Send Event `e` to the service; return a ServiceFuture for its 
+		reply. The `timeout` defaults to `self.CallTimeout`.
+		"""
+		e.cid = next(self.__cids)
+		with self.__cond:
+			self.__pending[e.cid] = e
+		self.__qout.put(e)
+		return ServiceFuture(self, e, timeout or self.CallTimeout)
+	
+	
+	#
+	# BATCH
+	#
+	def batch(self, requests, timeout=None):
+		"""
+		Send a list of requests, then gather and return their replies as
+		a list of Events in the order requests were given.
+		
+		Each item in `requests` may be an Event, a command string, or a
+		list in the form [cmd, arg1, arg2, ...].
+		
+		All requests are sent before any reply is awaited, so the batch
+		takes about as long as its slowest request when the service uses
+		a pooled executor.
+		"""
+		ff = []
+		for r in requests:
+			if not isinstance(r, Event):
+				r = Event(r) if isinstance(r, str) else Event(*r)
+			ff.append(self.request(r, timeout))
+		return [f.result() for f in ff]
+	
+	
+	#
+	# WAIT (for ServiceFuture)
+	#
+	def _wait(self, cid, timeout):
+		"""
+		Wait up to `timeout` seconds for the reply with correlation id 
+		`cid`; return the reply Event, or None if it has not arrived.
+		"""
+		tend = time.time() + timeout
+		while True:
+			with self.__cond:
+				if cid in self.__replies:
+					return self.__replies.pop(cid)
+				tleft = tend - time.time()
+				if self.__reading:
+					# another thread is reading the queue; it will notify
+					if tleft <= 0:
+						break
+					self.__cond.wait(tleft)
+					continue
+				self.__reading = True
+			
+			# read the queue (outside the lock)
+			r = None
+			try:
+				if tleft > 0:
+					r = self.__qin.get(timeout=tleft)
+				else:
+					r = self.__qin.get_nowait()
+			except Empty:
+				pass
+			finally:
+				with self.__cond:
+					self.__reading = False
+					if (r is not None) and (r.cid in self.__pending):
+						del self.__pending[r.cid]
+						self.__replies[r.cid] = r
+					self.__cond.notify_all()
+			
+			if (r is None) and (tleft <= 0):
+				break
+		
+		#
+		# Time's up. Unless this was just a check (timeout=0), forget the
+		# request so that a late reply won't be kept forever.
+		#
+		with self.__cond:
+			r = self.__replies.pop(cid, None)
+			if timeout and not r:
+				self.__forget(cid)
+			return r
+	
+	
+	#
+	# RELEASE (for ServiceFuture)
+	#
+	def _release(self, cid):
+		"""
+		Forget request `cid`, and any reply to it that hasn't been read.
+		Called when its ServiceFuture is released, so replies to requests
+		that are never waited on aren't kept.
+		"""
+		with self.__cond:
+			self.__forget(cid)
+			self.__replies.pop(cid, None)
+	
+	
+	def __forget(self, cid):
+		# Called with `__cond` held. An out-queue that holds requests of
+		# its own (see RemoteQueue) is told to let go of this one.
+		e = self.__pending.pop(cid, None)
+		if e is not None:
+			expire = getattr(self.__qout, 'expire', None)
+			if expire:
+				expire(e)
+
+
+
+
+#
+# --------- SERVICE FUTURE -----------------
+#
+class ServiceFuture(object):
+	"""
+	The pending reply to a ServiceConnect request.
+	
+	Call `result()` to wait for the reply Event, or `await` the future
+	from within a coroutine. Any other public attribute is read from
+	the reply Event, waiting for the reply if necessary; if the reply
+	doesn't arrive in time, WaitTimeout is raised. Names starting
+	with an underscore (as probed by copy, pickle, etc.) are never
+	read from the reply.
+	
+	When the future is released, the request is forgotten; a reply that
+	arrives later, or that was never read, is discarded.
+	"""
+	
+	def __init__(self, connect, e, timeout):
+		self.__connect = connect
+		self.__event = e
+		self.__timeout = timeout
+		self.__result = None
+		trix.module("weakref").finalize(self, connect._release, e.cid)
+	
+	def __repr__(self):
+		return "<%s cid=%s %s>" % (
+				type(self).__name__, self.__event.cid, 
+				"done" if self.__result else "pending"
+			)
+	
+	def __getattr__(self, name):
+		if name.startswith('_'):
+			raise AttributeError(name)
+		return getattr(self.result(), name)
+	
+	def __await__(self):
+		asyncio = trix.module("asyncio")
+		loop = asyncio.get_event_loop()
+		return loop.run_in_executor(None, self.result).__await__()
+	
+	@property
+	def cid(self):
+		"""The request event's correlation id."""
+		return self.__event.cid
+	
+	@property
+	def request(self):
+		"""The request Event."""
+		return self.__event
+	
+	
+	def done(self):
+		"""Return True if the reply has arrived."""
+		if not self.__result:
+			self.__result = self.__connect._wait(self.__event.cid, 0)
+		return bool(self.__result)
+	
+	
+	def result(self, timeout=None):
+		"""
+		Wait for and return the reply Event. Raises WaitTimeout if the
+		reply does not arrive within `timeout` seconds (which defaults to
+		the timeout given when the request was made).
+		"""
+		if not self.__result:
+			tout = timeout or self.__timeout
+			self.__result = self.__connect._wait(self.__event.cid, tout)
+			if not self.__result:
+				raise WaitTimeout("ServiceConnect Timeout", xdata(
+						timeout=tout, cid=self.__event.cid, 
+						request=self.__event.dict
+					))
+		return self.__result
+
+
+
+
+#
+# --------- REMOTE SERVICE CONNECT -----------------
+#
+class RemoteServiceConnect(ServiceConnect):
+	"""
+	Client connection to a Service exposed by `Services.serve()`.
+	
+	RemoteServiceConnect works just like ServiceConnect - requests 
+	return a ServiceFuture, and replies are Event objects - but events
+	are sent over a socket connection to a `Services` object that may
+	be running in another process, or on another host.
+	
+	Connections are drawn from a RemotePool shared by all connects to 
+	the same address. Requests are pipelined; many may be in progress
+	on a single socket.
+	
+	# EXAMPLE
+	>>> from trix.app.service import *
+	>>> c = RemoteServiceConnect(9999, 'enc')
+	>>> c.validate('utf8').reply
+	'utf_8'
+	>>> ee = c.batch([['validate', 'utf8'], ['validate', 'latin_1']])
+	
+	NOTES:
+	 * Arguments and replies are sent as JSON, so they must be JSON 
+	   types (or bytes). Tuples and sets arrive as lists.
+	 * Errors are returned in `Event.error`, as for ServiceConnect, 
+	   though error data that can't be sent as JSON is given as its
+	   string representation.
+	"""
+	
+	def __init__(self, config, serviceid, **k):
+		"""
+		Pass `config` (a port, url, or dict) of the server started by
+		`Services.serve()`, and the `serviceid` to connect to. Optional
+		kwarg "size" sets the maximum number of pooled connections.
+		"""
+		qin = Queue()
+		qout = RemoteQueue(RemotePool.pool(config, **k), serviceid, qin)
+		ServiceConnect.__init__(self, serviceid, [qout, qin])
+
+
+
+
+#
+# REMOTE QUEUE
+#  - Stands in for a ServiceConnect's out-queue; `put` sends an event
+#    through a RemotePool. Replies are put into `qin`.
+#
+class RemoteQueue(object):
+	
+	def __init__(self, pool, serviceid, qin):
+		self.__pool = pool
+		self.__sid = serviceid
+		self.__qin = qin
+	
+	def put(self, e):
+		self.__pool.send(self.__sid, e, self.__qin)
+	
+	def expire(self, e):
+		"""Forget request `e`, which has timed out; drop any late reply."""
+		link = getattr(e, '_remotelink', None)
+		if link:
+			e._remotelink = None
+			link[0].expire(link[1])
+
+
+
+
+#
+# --------- REMOTE POOL -----------------
+#
+class RemotePool(object):
+	"""
+	A pool of socket connections to a single `Services.serve()` server.
+	
+	Pools are shared; `RemotePool.pool()` returns the same pool for the
+	same `config` and kwargs. Up to `size` connections are opened, as needed, and
+	requests are spread among them. Each connection has a reader thread
+	that returns replies to the ServiceConnect that sent the request.
+	"""
+	
+	Size = 2
+	
+	__pools = {}
+	__lock = thread.allocate_lock()
+	
+	@classmethod
+	def pool(cls, config, **k):
+		"""
+		Return the shared pool for `config` and kwargs `k` (the pool
+		"size", and kwargs for `sockcon`), creating it if needed.
+		"""
+		key = repr((config, sorted(k.items())))
+		with cls.__lock:
+			if key not in cls.__pools:
+				cls.__pools[key] = cls(config, **k)
+			return cls.__pools[key]
+	
+	@classmethod
+	def closeall(cls):
+		"""Close all shared pools."""
+		with cls.__lock:
+			for key in list(cls.__pools):
+				cls.__pools.pop(key).close()
+	
+	
+	def __init__(self, config, size=None, **k):
+		"""Pass `config` for `sockcon`, and optional pool `size`."""
+		self.__config = config
+		self.__k = k
+		self.__size = size or self.Size
+		self.__links = []
+		self.__next = 0
+		self.__ids = trix.module("itertools").count(1)
+		self.__lock = thread.allocate_lock()
+	
+	
+	@property
+	def size(self):
+		"""Maximum number of connections."""
+		return self.__size
+	
+	@property
+	def links(self):
+		"""List of open connections."""
+		return list(self.__links)
+	
+	
+	#
+	# SEND
+	#
+	def send(self, serviceid, e, qin):
+		"""
+		Send event `e` to service `serviceid`. The event is put into
+		`qin`, with reply or error set, when the reply is received.
+		"""
+		self.link().send(next(self.__ids), serviceid, e, qin)
+	
+	
+	#
+	# LINK
+	#
+	def link(self):
+		"""
+		Return the next connection, opening a new one if the pool is not
+		yet full.
+		"""
+		with self.__lock:
+			self.__links = [x for x in self.__links if x.open]
+			if len(self.__links) < self.__size:
+				self.__links.append(RemoteLink(self.__config, **self.__k))
+			self.__next = (self.__next + 1) % len(self.__links)
+			return self.__links[self.__next]
+	
+	
+	#
+	# CLOSE
+	#
+	def close(self):
+		"""Close all connections."""
+		with self.__lock:
+			for x in self.__links:
+				x.close()
+			self.__links = []
+
+
+
+
+#
+# REMOTE LINK
+#  - A single pooled connection. Requests are written by the calling
+#    thread; replies are read by a reader thread and put into the 
+#    in-queue of the ServiceConnect that sent each request.
+#
+class RemoteLink(object):
+	
+	def __init__(self, config, **k):
+		self.__codec = trix.nvalue("net.handler.hservice.ServiceCodec")
+		self.__sock = trix.ncreate("util.sock.sockcon.sockcon", config, **k)
+		self.__sock.timeout = self.__sock.ctimeout
+		self.__pending = {}
+		self.__lock = thread.allocate_lock()
+		self.__open = True
+		trix.start(self.__read)
+	
+	@property
+	def open(self):
+		return self.__open
+	
+	@property
+	def pending(self):
+		return len(self.__pending)
+	
+	
+	def send(self, wid, serviceid, e, qin):
+		data = self.__codec.encode(
+				dict(id=wid, sid=serviceid, a=list(e.argv), k=e.kwargs)
+			)
+		with self.__lock:
+			self.__pending[wid] = [e, qin]
+			e._remotelink = (self, wid)
+			try:
+				self.__sock.socket.sendall(data)
+			except Exception as ex:
+				self.__pending.pop(wid, None)
+				self.close()
+				raise type(ex)("err-remote-send", xdata(
+						wid=wid, serviceid=serviceid, e=e.dict
+					))
+	
+	
+	def expire(self, wid):
+		# the request timed out; a late reply is ignored
+		with self.__lock:
+			self.__pending.pop(wid, None)
+	
+	
+	def close(self):
+		self.__open = False
+		self.__sock.shutdown()
+	
+	
+	def __read(self):
+		select = trix.module("select")
+		fragment = b''
+		try:
+			s = self.__sock.socket
+			while self.__open:
+				if not select.select([s], [], [], 0.5)[0]:
+					continue
+				data = s.recv(self.__sock.buflen)
+				if not data:
+					break
+				lines = (fragment + data).split(b'\n')
+				fragment = lines.pop()
+				for line in lines:
+					if line:
+						self.__reply(self.__codec.decode(line))
+		except Exception:
+			pass
+		finally:
+			self.__open = False
+			self.__fail()
+	
+	
+	def __reply(self, m):
+		with self.__lock:
+			item = self.__pending.pop(m.get('id'), None)
+		if item:
+			e, qin = item
+			e._remotelink = None
+			if 'x' in m:
+				e.error = m['x']
+			else:
+				e.reply = m.get('r')
+			qin.put(e)
+	
+	
+	def __fail(self):
+		# the connection is gone; fail all pending requests
+		with self.__lock:
+			items = list(self.__pending.values())
+			self.__pending = {}
+		for e, qin in items:
+			e._remotelink = None
+			e.error = dict(error="err-remote-fail", reason="connection-closed")
+			qin.put(e)
+
 
 
 #
@@ -378,5 +1494,3 @@ class SCCaller(object):
 	def __call__(self, *a, **k):
 		return self.__obj(self.__name, *a, **k)
 
-
-
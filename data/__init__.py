@@ -13,4 +13,5 @@ Param    = NLoader("data.param", "Param")
 
 # important subpackage classes
 Scanner  = NLoader("data.scan", "Scanner")
+FastScanner = NLoader("data.scan", "FastScanner")
 ScanQuery = NLoader("data.udata.query", "ScanQuery")
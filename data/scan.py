@@ -7,6 +7,7 @@
 
 from ..data.udata.charinfo import *
 from ..util.stream.buffer import *
+import re, bisect, itertools
 
 
 class Scanner(object):
@@ -53,7 +54,8 @@ class Scanner(object):
 	#
 	def __init__(self, iterable_text, **k):
 		"""
-		Pass anything iterable that produces unicode characters.
+		Pass anything iterable that produces unicode characters. A file,
+		Reader, mmap, or socket is read in chunks (see `scanchunks`).
 		
 		 * Adjust escape character (default, self.Escape, the backslash) 
 		   as needed using keyword argument 'escape'.
@@ -66,6 +68,11 @@ class Scanner(object):
 		self.__k = k
 		self.__escape = k.get('escape', self.Escape)
 		self.__bufsz = k.get('bufsz', self.BufSize)
+		
+		# files, sockets, etc. are read in chunks
+		if hasattr(iterable_text, 'read') or hasattr(iterable_text, 'recv'):
+			iterable_text = itertools.chain.from_iterable(
+					scanchunks(iterable_text, **k))
 		self.__itext = iter(iterable_text)
 		
 		# flag set to True on StopIteration
@@ -282,7 +289,14 @@ class Scanner(object):
 		'123'
 		>>> 
 		
+		In place of a callable, `fn` may be a predicate expression (or
+		a charclass object) as described by `udata.charclass`.
+		>>> Scanner("Line-1 ok").collect("alpha | '-'")
+		'Line-'
+		
 		"""
+		if isinstance(fn, str):
+			fn = udata.charclass(fn)
 		if self.eof:
 			raise StopIteration()
 		
@@ -323,13 +337,18 @@ class Scanner(object):
 		
 		NOTE: If the current character doesn't match what `fn` is looking
 		      for, the pointer is not moved.
+		
+		As with `collect`, `fn` may be a predicate expression.
 		"""
+		if isinstance(fn, str):
+			fn = udata.charclass(fn)
 		
 		# Calling self.c will raise StopIteration if self.eof is set.
 		a = fn(self.c)
 		try:
 			while a:
-				a = fn(self.cc)
+				ci = self.cc
+				a = (ci is not None) and fn(ci) # `cc` is None at end of text
 		except StopIteration:
 			self.__eof = True
 	
@@ -516,69 +535,35 @@ class Scanner(object):
 	def scanbidi(self):
 		"""
 		Scan recursively through bidi open/close characters, until the
-		first bidi character is matched.
+		first bidi character is matched. Brackets are matched as by the
+		`BracketMatch` class, so those within quotes don't count.
 		"""
-		DEBUG = False
-		
 		b = Buffer(mode='r', max_size=self.bufsz)
 		w = b.writer()
 		
 		self.passwhite()
 		
-		# ~ if self.Debug:
-			# ~ print ("FIRST: %s" % (self.c))
-			# ~ print ("BREAK: %s" % (self.c.linebreak))
-		
 		try:
-			
-			# ~ dbg = []
-			
 			#
 			# BRACKET/BRACE/ETC...
+			#  - Chars are fed to the matcher (whenever one that may be a
+			#    token is read) until the open bracket that starts the item
+			#    is closed.
 			#
-			if self.c.bracket:
-				
-				# ~ if self.Debug:
-					# ~ print ("BRACKET")
-				
-				# keep count of the number of unclosed brackets
-				ct = 1
-				
-				# Get the first character (an open bracket) and write it to
-				# the result buffer.
-				br = self.char
-				
-				# ~ if self.Debug:
-					# ~ dbg.append(br)
-					# ~ print (" -- :", ''.join(dbg), ';', str(ct))
-				
-				# Store the ending (close bracket) in `end`
-				end = self.c.bracket[1]
-				
-				# ~ if self.Debug:
-					# ~ print ("BR/END:", br, '/', end)
-				
-				try:
-					while (ct > 0):
-						w.write(self.c.c)
-						ci = self.cc
-						
-						# ~ if self.Debug:
-							# ~ dbg.append(ci.c)
-							# ~ print (" -- :", ''.join(dbg), ';', str(ct))
-						
-						if ci.c == br:
-							ct += 1
-						elif ci.c == end:
-							ct -= 1
-							if not ct > 0:
-								w.write(self.c.c)
-								self.cc
-								return b.read()
-				
-				except StopIteration:
-					self.__eof = True
-					return b.read()
+			bracket = self.c.bracket
+			if bracket and (bracket[0] == 'o'):
+				bm = BracketMatch(self.esc)
+				tokens = bm.tokens
+				chars = []
+				while True:
+					c = self.c.c
+					w.write(c)
+					self.cc
+					chars.append(c)
+					if c in tokens:
+						if bm.close(''.join(chars)) is not None:
+							return b.read()
+						chars = []
 		
 		except StopIteration:
 			self.__eof = True
@@ -655,7 +640,6 @@ class Scanner(object):
 			
 			return r
 		except StopIteration:
-			print ("stop-iter")
 			self.__eof = True
 			return r
 	
@@ -751,6 +735,1122 @@ class Scanner(object):
 
 
 
+# -------------------------------------------------------------------
+#
+#
+# CHUNKED INPUT
+#  - Scanners given a file, Reader, mmap, or socket read it a block
+#    at a time. Bytes are decoded incrementally, so multi-byte chars
+#    may be split between blocks.
+#
+#
+# -------------------------------------------------------------------
+
+SCAN_CHUNK = 65536
+
+def scanchunks(source, **k):
+	"""
+	Generate str chunks of about `chunksize` chars (default 65536) from
+	`source`, which may be anything with a `read` method (a file, mmap,
+	or Reader), a socket (read with `recv`), bytes, or any iterable
+	that produces characters or str/bytes chunks.
+	
+	Bytes are decoded with kwargs `encoding` (default DEF_ENCODE) and
+	`errors` (default DEF_ERRORS).
+	
+	>>> list(scanchunks(iter("abcde"), chunksize=2))
+	['ab', 'cd', 'e']
+	"""
+	size = k.get('chunksize') or SCAN_CHUNK
+	decoder = trix.module('codecs').getincrementaldecoder(
+			k.get('encoding') or DEF_ENCODE)(k.get('errors') or DEF_ERRORS)
+	
+	if isinstance(source, (bytes, bytearray)):
+		source = [source]
+	elif hasattr(source, 'read'):
+		read = source.read
+		source = iter(lambda: read(size), read(0))
+	elif hasattr(source, 'recv'):
+		recv = source.recv
+		source = iter(lambda: recv(size), b'')
+	
+	# chars (or small chunks) are joined into chunks of `size`
+	buf = []
+	ct = 0
+	for x in source:
+		if not isinstance(x, str):
+			x = decoder.decode(x)
+		buf.append(x)
+		ct += len(x)
+		if ct >= size:
+			yield ''.join(buf)
+			buf = []
+			ct = 0
+	
+	buf.append(decoder.decode(b'', True))
+	tail = ''.join(buf)
+	if tail:
+		yield tail
+
+
+def rscannable(source):
+	"""True if `source` is a seekable file or mmap `rscanchunks` reads."""
+	try:
+		return source.seekable() and hasattr(source, 'read')
+	except AttributeError:
+		return hasattr(source, 'seek') and hasattr(source, 'read')
+
+
+def rscanchunks(source, **k):
+	"""
+	Generate str chunks from the end of seekable file (or mmap) `source`
+	to its start. The characters of each chunk are reversed, so joining
+	the chunks gives the file's text backward.
+	
+	Kwargs are as for `scanchunks`; the encoding of a text file is its
+	own. Blocks are aligned to character boundaries for UTF-8 and for
+	single-byte encodings; any other encoding is decoded all at once.
+	"""
+	codecs = trix.module('codecs')
+	size = k.get('chunksize') or SCAN_CHUNK
+	errors = k.get('errors') or DEF_ERRORS
+	encoding = getattr(source, 'encoding', None) or k.get('encoding')
+	encoding = codecs.lookup(encoding or DEF_ENCODE).name
+	
+	# a text file is read from its binary buffer
+	f = getattr(source, 'buffer', source)
+	f.seek(0, 2)
+	pos = f.tell()
+	
+	utf8 = encoding == 'utf-8'
+	if not (utf8 or rscanbytewise(encoding)):
+		f.seek(0)
+		text = f.read().decode(encoding, errors)
+		for i in range(len(text), 0, -size):
+			yield text[max(i-size, 0):i][::-1]
+		return
+	
+	carry = b''
+	while pos > 0:
+		start = max(pos - size, 0)
+		f.seek(start)
+		data = f.read(pos - start) + carry
+		pos = start
+		
+		# a block starting within a UTF-8 sequence leaves its first
+		# (continuation) bytes to the block before it
+		i = 0
+		if utf8 and pos:
+			while (i < 3) and (i < len(data)) and ((data[i] & 0xC0) == 0x80):
+				i += 1
+		carry = data[:i]
+		if len(data) > i:
+			yield data[i:].decode(encoding, errors)[::-1]
+
+
+def rscanbytewise(encoding):
+	"""True if `encoding` is a single-byte encoding."""
+	if encoding in ('ascii', 'latin-1', 'iso8859-1'):
+		return True
+	try:
+		module = trix.module('encodings.%s' % encoding.replace('-', '_'))
+		return hasattr(module, 'decoding_table')
+	except ImportError:
+		return False
+
+
+
+
+# -------------------------------------------------------------------
+#
+#
+# BRACKET MATCHING
+#  - Brackets are matched with a stack, in one pass over just the
+#    bracket, quote, and escape chars in the text (as found by a
+#    regex), so the chars between them are never looked at.
+#  - Brackets between quotes don't count. A quote opens only where
+#    it's not preceded by a word char, so that an apostrophe (as in
+#    "don't") isn't taken for one. An escaped char never counts.
+#  - A close bracket that doesn't match the innermost open bracket
+#    closes the nearest one it does match, leaving any between them
+#    unmatched. A close bracket with no match is ignored.
+#
+#
+# -------------------------------------------------------------------
+
+BRACKET_QUOTES = '"\''
+
+
+class BracketMatch(object):
+	"""
+	Match brackets in text, in one pass, with a stack.
+	
+	Text may be given all at once, or in pieces, by successive calls
+	to `feed()`. Offsets count from `offset` (given to `reset()`), to
+	which the length of each piece is added as it's fed.
+	
+	>>> from trix.data.scan import *
+	>>> BracketMatch().spans('f(a, [b], "c)") [\\\\]]')
+	[(1, 15), (5, 8), (16, 20)]
+	"""
+	
+	# token and quoted-text patterns
+	__patterns = {}
+	
+	def __init__(self, escape=Scanner.Escape, quotes=BRACKET_QUOTES,
+			reverse=False):
+		"""
+		Pass the `escape` char (or None), and the `quotes` chars within
+		which brackets don't count. Pass reverse=True to match brackets
+		in reversed text, where close brackets come first and an escape
+		follows the char it escapes.
+		"""
+		self.__escape = escape or ''
+		self.__quotes = quotes or ''
+		self.__reverse = bool(reverse)
+		self.__open = 'c' if reverse else 'o'
+		self.__find = self.pattern(self.__escape, self.__quotes,
+				reverse).finditer
+		self.__brackets = udata.brackets()
+		self.__tokens = set(self.__brackets).union(self.__quotes,
+				self.__escape)
+		self.reset()
+	
+	
+	@property
+	def depth(self):
+		"""The number of open brackets not yet closed."""
+		return len(self.__stack)
+	
+	@property
+	def offset(self):
+		"""The offset of the next char to be fed."""
+		return self.__offset
+	
+	@property
+	def tokens(self):
+		"""Set of the chars that may start a token."""
+		return self.__tokens
+	
+	@property
+	def open(self):
+		"""List of offsets of the open brackets, innermost last."""
+		return [x[0] for x in self.__stack]
+	
+	
+	def opens(self, c):
+		"""True if `c` is an open bracket."""
+		bracket = self.__brackets.get(c)
+		return bool(bracket) and (bracket[0] == self.__open)
+	
+	
+	@classmethod
+	def pattern(cls, escape, quotes, reverse=False):
+		"""
+		Return a regex matching a token: an open bracket (group 1), a
+		close bracket (group 2), a whole quoted string (group 3), any
+		other of the `quotes` chars (group 4), or the `escape` char along
+		with the char it escapes (group 5).
+		
+		In reversed text, the escape follows the char it escapes, and a
+		run of escapes pairs up from its far end; a char is escaped if an
+		odd number of escapes follow it.
+		"""
+		key = (escape, quotes, reverse)
+		try:
+			return cls.__patterns[key]
+		except KeyError:
+			kinds = {'o':[], 'c':[]}
+			for c, (kind, match) in udata.brackets().items():
+				kinds[kind].append(c)
+			opens, closes = kinds['c' if reverse else 'o'], kinds[
+					'o' if reverse else 'c']
+			strings = '|'.join(['%s%s%s' % (re.escape(q),
+					cls.quoted(q, escape, reverse).pattern, re.escape(q)
+				) for q in quotes])
+			none = '(?!)()'
+			e = re.escape(escape)
+			if not escape:
+				escaped = none
+			elif reverse:
+				escaped = '((?s:.)%s(?:%s%s)*(?!%s)|%s+)' % (e, e, e, e, e)
+			else:
+				escaped = '(%s(?s:.)?)' % e
+			rx = '|'.join([
+					'([%s])' % re.escape(''.join(opens)),
+					'([%s])' % re.escape(''.join(closes)),
+					'(?<!\\w)(%s)' % strings if quotes else none,
+					'([%s])' % re.escape(quotes) if quotes else none
+				])
+			if escape and reverse:
+				# an escaped char is no token, but part of group 5
+				rx = '(?!(?s:.)%s(?:%s%s)*(?!%s))(?:%s)' % (e, e, e, e, rx)
+			rx = '%s|%s' % (rx, escaped)
+			
+			# the lookahead lets the regex engine skip quickly to a token
+			chars = re.escape(''.join(opens + closes) + quotes + escape)
+			rx = cls.__patterns[key] = re.compile('(?=[%s])(?:%s)' % (
+					chars, rx))
+			return rx
+	
+	
+	@classmethod
+	def quoted(cls, quote, escape, reverse=False):
+		"""
+		Return a regex matching the text within `quote` chars, up to the
+		closing quote (or an escape that ends the text). In reversed text,
+		a quote followed by an odd number of escapes is part of the text.
+		"""
+		key = (quote, escape, reverse)
+		try:
+			return cls.__patterns[key]
+		except KeyError:
+			q, e = re.escape(quote), re.escape(escape)
+			if escape and reverse:
+				rx = '(?:[^%s]|%s(?=%s(?:%s%s)*(?!%s)))*' % (q, q, e, e, e, e)
+			elif escape:
+				rx = '(?:%s(?s:.)|[^%s%s])*' % (e, q, e)
+			else:
+				rx = '[^%s]*' % re.escape(quote)
+			rx = cls.__patterns[key] = re.compile(rx)
+			return rx
+	
+	
+	def reset(self, offset=0):
+		"""Forget any open brackets or quote; count from `offset`."""
+		self.__stack = []
+		self.__quote = None
+		self.__escaped = False
+		self.__prev = ''
+		self.__offset = offset
+	
+	
+	def feed(self, text, pos=0, endpos=None):
+		"""
+		Match brackets in `text[pos:endpos]`, generating the (start, end)
+		span of each pair as it's closed; inner pairs come before any
+		that contain them.
+		"""
+		endpos = len(text) if endpos is None else min(endpos, len(text))
+		if pos >= endpos:
+			return
+		
+		delta = self.__offset - pos
+		self.__offset += endpos - pos
+		first = pos
+		if self.__escaped:
+			self.__escaped = False
+			pos += 1
+		prev = self.__prev
+		self.__prev = text[endpos-1]
+		
+		# finish a quote left open by the last piece
+		if self.__quote:
+			pos = self.__unquote(text, pos, endpos)
+			if pos is None:
+				return
+		elif (pos == first) and (text[pos] in self.__quotes) and (
+				prev.isalnum() or (prev == '_')):
+			pos += 1 # it follows a word char, so it's not a quote
+		
+		brackets = self.__brackets
+		stack = self.__stack
+		for m in self.__find(text, pos, endpos):
+			k = m.lastindex
+			if k == 1:
+				stack.append((m.start() + delta, brackets[m.group()][1]))
+			elif k == 2:
+				c = m.group()
+				x = len(stack)
+				while x:
+					x -= 1
+					if stack[x][1] == c:
+						start = stack[x][0]
+						del stack[x:]
+						yield (start, m.end() + delta)
+						break
+			elif k == 4:
+				# a quote that isn't closed within this piece
+				i = m.start()
+				x = text[i-1] if i > first else prev
+				if not (x.isalnum() or (x == '_')):
+					self.__quote = m.group()
+					self.__unquote(text, i+1, endpos)
+					return
+			elif (k == 5) and not self.__reverse:
+				# an escape at the end of the piece escapes the next one
+				self.__escaped = m.end() - m.start() < 2
+	
+	
+	def __unquote(self, text, pos, endpos):
+		# Skip to the char after the closing quote; return None if the
+		# quote is still open at `endpos`.
+		q = self.__quote
+		pos = self.quoted(q, self.__escape, self.__reverse).match(text, pos,
+				endpos).end()
+		if pos < endpos:
+			if text[pos] == q:
+				self.__quote = None
+				return pos + 1
+			self.__escaped = True # an escape ends the piece
+	
+	
+	def count(self, text, pos):
+		"""
+		Return the offset in `text` following the close bracket matching
+		the open bracket at `pos`, if it can be found by counting only the
+		brackets of that kind; that is, if no quote, escape, or other
+		bracket comes before it. Otherwise, return None.
+		"""
+		br = text[pos]
+		end = self.__brackets[br][1]
+		ct = 1
+		q = pos + 1
+		while ct:
+			i = text.find(br, q)
+			x = text.find(end, q)
+			if x < 0:
+				return None
+			elif 0 <= i < x:
+				ct += 1
+				q = i + 1
+			else:
+				ct -= 1
+				q = x + 1
+		
+		key = (self.__escape, self.__quotes, br)
+		try:
+			other = self.__patterns[key]
+		except KeyError:
+			chars = set(udata.brackets()) - set(br+end)
+			chars = re.escape(''.join(sorted(chars)) + self.__quotes +
+					self.__escape)
+			other = self.__patterns[key] = re.compile('[%s]' % chars).search
+		
+		if self.__reverse and (text[q:q+1] in ('', self.__escape)):
+			return None # an escape that follows may escape it
+		if not other(text, pos+1, q-1):
+			return q
+	
+	
+	def close(self, text, pos=0, endpos=None):
+		"""
+		Feed `text[pos:endpos]`, stopping where the outermost bracket is
+		closed. Return the offset following its close bracket, or None if
+		no bracket was closed that leaves none open.
+		"""
+		for start, end in self.feed(text, pos, endpos):
+			if not self.__stack:
+				return end
+	
+	
+	def spans(self, text, pos=0, endpos=None):
+		"""
+		Return a sorted list of (start, end) spans of the bracket pairs
+		in `text[pos:endpos]`. Offsets are indexes into `text`; brackets
+		left unmatched are not included.
+		"""
+		self.reset(pos)
+		return sorted(self.feed(text, pos, endpos))
+
+
+
+
+# -------------------------------------------------------------------
+#
+#
+# FAST SCANNER
+#
+#
+# -------------------------------------------------------------------
+
+class charmemo(dict):
+	"""
+	A dict that computes one property of each character (by way of a
+	charinfo object) the first time it's requested, then keeps it.
+	
+	>>> cat = charmemo('cat')
+	>>> cat['a']
+	'Ll'
+	"""
+	
+	def __init__(self, propname):
+		self.__ci = charinfo('')
+		self.__propname = propname
+	
+	def __missing__(self, c):
+		self.__ci.c = c
+		v = self[c] = getattr(self.__ci, self.__propname)
+		return v
+
+
+
+class FastScanner(Scanner):
+	"""
+	Scan unicode text by index.
+	
+	FastScanner has the same methods and properties as Scanner, but it
+	works on a str, tracking a position within it. Results are sliced
+	from the text rather than written to a buffer one character at a
+	time, and the properties the built-in methods check (space, cat,
+	linebreak, bracket) are looked up once per distinct character.
+	
+	Methods that take a callable `fn` (collect, ignore) still pass it
+	a charinfo object for each character, but the same charinfo object
+	is reused for every character.
+	
+	Given a file, Reader, mmap, socket, or any other iterable instead
+	of a str, the text is read in chunks (see `scanchunks`) into a
+	window that slides forward as items are scanned. Text before the
+	item being scanned is released (but for the last `bufsz` chars,
+	which remain available to `lookback`), so splitting a very large
+	file takes no more memory than its largest item.
+	
+	EXAMPLE
+	>>> trix.scan('[1,2,3] frog {"x":"stream"}').split()
+	['[1,2,3]', 'frog', '{"x":"stream"}']
+	>>> trix.scan(open('app.log', 'rb')).splits(' ')
+	
+	"""
+	
+	Space = charmemo('space')
+	White = charmemo('white')
+	Cat = charmemo('cat')
+	LineBreak = charmemo('linebreak')
+	Bracket = charmemo('bracket')
+	
+	# True where text is reversed (so close brackets come first)
+	Reverse = False
+	
+	# compiled "stop-character" patterns, by (chars, escape)
+	__stops = {}
+	
+	# charclass run matchers, by (charclass, escape)
+	__runs = {}
+	
+	
+	def __init__(self, text, **k):
+		"""
+		Pass text to scan. Anything other than a str is read in chunks,
+		so a file (text or binary), Reader, mmap, socket, or any iterable
+		that produces unicode characters (or str/bytes chunks) may be
+		given.
+		
+		Keyword arguments are the same as for Scanner, plus `chunksize`,
+		`encoding` and `errors`, which are passed to `scanchunks`.
+		"""
+		src = None
+		if not isinstance(text, str):
+			src = scanchunks(text, **k)
+			text = ''
+		
+		Scanner.__init__(self, text, **k)
+		self.__k = k
+		self.__src = src
+		self.__t = text
+		self.__n = len(text)
+		self.__p = -1  # -1 until the first character is read
+		self.__base = 0 # offset of the window within the whole text
+		self.__ci = charinfo('')
+		self.__bm = BracketMatch(self.esc, reverse=self.Reverse)
+	
+	
+	#
+	# POS
+	#
+	@property
+	def pos(self):
+		"""Index of the current character within the text."""
+		return self.__base + max(self.__p, 0)
+	
+	
+	def lookback(self, n=1):
+		"""
+		Return up to `n` characters preceding the current position. At
+		least `bufsz` characters remain available when text is streamed.
+		"""
+		p = max(self.__p, 0)
+		return self.__t[max(p-n, 0):p]
+	
+	
+	@property
+	def r(self):
+		"""
+		Returns a reverse scanner (RScan) for the remaining text.
+		
+		To scan a large file backward from its end, pass the (seekable)
+		file to RScan instead.
+		"""
+		return RScan(self.remainder() or '', **self.__k)
+	
+	
+	#
+	# C / CC / CHAR / EOF
+	#
+	@property
+	def c(self):
+		"""Return current character info object."""
+		if not self.__ready():
+			raise StopIteration()
+		p = self.__p
+		ci = self.__ci
+		ci.c = self.__t[p]
+		ci.o = self.__base + p + 1
+		return ci
+	
+	@property
+	def cc(self):
+		"""
+		Move forward past the current character and return the next 
+		character in a charinfo object (or None, at the end of text).
+		"""
+		if self.__p < 0:
+			if not self.__ready():
+				raise StopIteration()
+			return self.c
+		self.__p += 1
+		if not self.__ready():
+			self.__p = self.__n
+			return None
+		return self.c
+	
+	@property
+	def char(self):
+		"""Return the current character."""
+		if not self.__ready():
+			raise StopIteration()
+		return self.__t[self.__p]
+	
+	@property
+	def eof(self):
+		"""False until end of text is reached."""
+		return (self.__p >= self.__n) and not self.__ready()
+	
+	
+	#
+	# BASE SCAN METHODS
+	#
+	def collect(self, fn):
+		"""
+		Collect each character that matches the criteria of `fn`. The 
+		pointer is left directly after the last matching character.
+		
+		Given a predicate expression or charclass (see `udata.charclass`)
+		rather than a callable, whole runs of matching characters are
+		collected at once.
+		"""
+		if isinstance(fn, str):
+			fn = udata.charclass(fn)
+		if hasattr(fn, 'skip'):
+			return self.__collectrun(fn)
+		
+		esc, ci = self.esc, self.__ci
+		if (self.__p >= self.__n) and not self.__ready():
+			raise StopIteration()
+		p = start = self.__start()
+		t, n = self.__t, self.__n
+		
+		parts = []
+		while True:
+			if p >= n:
+				d = self.__more(start)
+				if d is None:
+					break
+				p, start, t, n = p-d, start-d, self.__t, self.__n
+				continue
+			
+			ci.c = t[p]
+			ci.o = self.__base + p + 1
+			if not fn(ci):
+				break
+			if ci.c == esc:
+				# drop the escape; keep the next character, unchecked
+				parts.append(t[start:p])
+				start = p + 1
+				p += 2
+			else:
+				p += 1
+		
+		p = min(p, n)
+		parts.append(t[start:p])
+		self.__p = p
+		return ''.join(parts)
+	
+	
+	def ignore(self, fn):
+		"""
+		Ignore all characters for which executable `fn` returns True. The
+		iterator stops on the character following ignored text.
+		
+		As with `collect`, `fn` may be a predicate expression.
+		"""
+		if isinstance(fn, str):
+			fn = udata.charclass(fn)
+		skip = getattr(fn, 'skip', None)
+		
+		ci = self.__ci
+		if not self.__ready():
+			raise StopIteration()
+		p = self.__p
+		t, n = self.__t, self.__n
+		
+		while True:
+			if p >= n:
+				d = self.__more(p)
+				if d is None:
+					break
+				p, t, n = p-d, self.__t, self.__n
+				continue
+			
+			if skip:
+				p = skip(t, p)
+				if p < n:
+					break
+				continue
+			
+			ci.c = t[p]
+			ci.o = self.__base + p + 1
+			if not fn(ci):
+				break
+			p += 1
+		self.__p = p
+	
+	
+	#
+	# COLLECT RUN
+	#  - Collect a run of chars in charclass `cc`, a regex match at a
+	#    time. An escape char (if it's in `cc`) ends a match; it's
+	#    dropped, and the char it escapes is kept, unchecked.
+	#
+	def __collectrun(self, cc):
+		esc = self.esc
+		if (self.__p >= self.__n) and not self.__ready():
+			raise StopIteration()
+		p = start = self.__start()
+		t, n = self.__t, self.__n
+		
+		try:
+			skip, escapes = FastScanner.__runs[(cc, esc)]
+		except KeyError:
+			escapes = bool(esc) and (esc in cc)
+			skip = cc.without(esc).skip if escapes else cc.skip
+			FastScanner.__runs[(cc, esc)] = (skip, escapes)
+		
+		parts = []
+		while True:
+			if p < n:
+				p = skip(t, p)
+				if p < n:
+					if escapes and (t[p] == esc):
+						parts.append(t[start:p])
+						start = p + 1
+						p += 2
+						continue
+					break
+			
+			d = self.__more(start)
+			if d is None:
+				break
+			p, start, t, n = p-d, start-d, self.__t, self.__n
+		
+		p = min(p, n)
+		parts.append(t[start:p])
+		self.__p = p
+		return ''.join(parts)
+	
+	
+	#
+	# CONVENIENCE METHODS
+	#
+	def passwhite(self):
+		"""Pass any white space."""
+		if not self.__ready():
+			raise StopIteration()
+		self.__run(self.Space)
+	
+	
+	def scanto(self, char):
+		"""Collect all text to the given character `c`."""
+		return self.__upto(re.escape(char) if len(char) == 1 else '')
+	
+	
+	def remainder(self):
+		"""Return whatever's left of the scan text."""
+		try:
+			return self.__upto('')
+		except StopIteration:
+			pass
+	
+	
+	#
+	# COMPLEX METHODS
+	#
+	def scan(self):
+		"""
+		Pass white space then scan one item - either bidi/quote or a 
+		single string that contains no space characters.
+		"""
+		self.passwhite()
+		
+		q = self.scanquote()
+		if q:
+			return q
+		
+		b = self.scanbidi()
+		if b:
+			return b
+		
+		# collect to the next "Zs" (space separator) character
+		Cat = self.Cat
+		return self.__upto(r'\s', lambda c: Cat[c] == 'Zs')
+	
+	
+	def split(self):
+		"""
+		Split text on white characters, excpet those included in a bidi
+		enclosure or quotes, where whitespace is included in the result.
+		"""
+		r = []
+		try:
+			v = True
+			while v:
+				self.passwhite()
+				v = self.scan()
+				if v:
+					r.append(v)
+		except StopIteration:
+			pass
+		return r
+	
+	
+	def psplit(self, workers=None):
+		"""
+		Split the remaining text as `split()` does, dividing the work
+		among `workers` processes (default: one per CPU).
+		
+		A fast pre-pass (`psplitpoints`) finds newlines at bracket depth
+		zero and outside quotes, dividing the text into one partition per
+		worker. The partitions are scanned in parallel and the results are
+		merged in order. Wherever a partition turns out not to start on
+		an item boundary, the merge rescans serially until the two agree,
+		so the result is always the same as that of `split()`.
+		
+		Streamed text is read in full before it's divided.
+		
+		>>> trix.scan(open('records.txt')).psplit(workers=4)
+		"""
+		text = self.__t[max(self.__p, 0):] + ''.join(self.__src or ())
+		self.__base += max(self.__p, 0) + len(text)
+		self.__t, self.__n, self.__p, self.__src = '', 0, 0, None
+		
+		workers = workers or trix.module('os').cpu_count() or 1
+		if (workers < 2) or (len(text) < PSPLIT_MIN):
+			return pscan(text, 0, len(text), self.__k)[1]
+		
+		points = psplitpoints(text, workers, self.esc)
+		bounds = list(zip([0] + points, points + [len(text)]))
+		
+		try:
+			context = trix.module('multiprocessing').get_context('fork')
+		except ValueError:
+			context = None
+		
+		futures = trix.module('concurrent.futures')
+		with futures.ProcessPoolExecutor(workers, mp_context=context,
+				initializer=_psplit_init, initargs=(text, self.__k)) as pool:
+			results = list(pool.map(_psplit, bounds))
+		
+		return pmerge(text, bounds, results, self.__k)
+	
+	
+	def scanbidi(self):
+		"""
+		Scan recursively through bidi open/close characters, until the
+		first bidi character is matched.
+		"""
+		self.passwhite()
+		if not self.__ready():
+			return ''
+		
+		t, p = self.__t, self.__p
+		bm = self.__bm
+		if bm.opens(t[p]) and not self.__escaped():
+			t, p = self.__t, self.__p
+			q = bm.count(t, p)
+			if q is None:
+				# offsets given to the matcher are absolute, so they hold
+				# when the window moves
+				bm.reset(self.__base + p)
+				q = p
+				while True:
+					end = self.__fedto()
+					q = bm.close(t, q, end)
+					if q is not None:
+						q -= self.__base
+						break
+					
+					# still open; read more
+					q = end
+					d = self.__more(p)
+					if d is None:
+						if q < self.__n:
+							continue # feed the held-back end of the text
+						
+						# unclosed; return the rest of the text
+						self.__p = q
+						return t[p:]
+					p, q, t = p-d, q-d, self.__t
+			
+			self.__p = q
+			return t[p:q]
+	
+	
+	def scanquote(self):
+		"""
+		Scan a quoted string, including its quotation marks. Escaped
+		characters are handled as by `scanto`.
+		"""
+		self.passwhite()
+		if not self.__ready():
+			return ''
+		
+		q = self.__t[self.__p]
+		if (self.LineBreak[q] == "QU") and not self.__escaped():
+			self.__p += 1
+			if not self.__ready():
+				return q
+			
+			cn = self.__upto(re.escape(q))
+			if not self.__ready():
+				return q + cn # unclosed
+			
+			self.__p += 1
+			return q + cn + q
+	
+	
+	def split_escape(self, char="%"):
+		"""
+		Return a list of escape characters + the following char, with
+		any unescaped segments split by spaces.
+		
+		s.split_escape("%m/%d/%y") --> ["%m", "/", "%d", "/", "%y"]
+		
+		"""
+		r = []
+		xchars = re.escape('%s ' % char)
+		White = self.White
+		try:
+			while True:
+				
+				# collect anything that comes before the first escape sequence
+				r.append(self.__upto(xchars))
+				
+				# parse the (two-character) escape sequence
+				if self.char == char:
+					ci = self.cc
+					if ci is None:
+						r.append(char)
+						break
+					
+					cchar = ci.c
+					if cchar.strip():
+						r.append("%s%s" % (char, cchar))
+						self.cc
+					else:
+						r.append("%") # just use it, i guess.
+						r.append(cchar)
+				
+				elif White[self.char]:
+					r.append(self.__run(White))
+				
+				else:
+					r.append(self.__upto(xchars))
+		
+		except StopIteration:
+			pass
+		return r
+	
+	
+	#
+	# UPTO
+	#  - Collect text up to the next character matching `chars`, the
+	#    contents of a regex character class (eg, r'\s'), if `test`
+	#    (when given) returns True for it. Escape characters are removed
+	#    and the characters they escape are kept, unchecked.
+	#
+	def __upto(self, chars, test=None):
+		esc = self.esc
+		if (self.__p >= self.__n) and not self.__ready():
+			raise StopIteration()
+		p = start = self.__start()
+		t, n = self.__t, self.__n
+		
+		key = (chars, esc, self.Reverse)
+		try:
+			search = FastScanner.__stops[key]
+		except KeyError:
+			rx = []
+			if esc and self.Reverse:
+				# a run of escapes, with the char before it if it's a stop
+				rx.append('(?P<r>%s%s+)' % (
+						'[%s]?' % chars if chars else '', re.escape(esc)
+					))
+			if chars:
+				rx.append('(?P<s>[%s])' % chars)
+			if esc and not self.Reverse:
+				rx.append('(?P<e>%s)' % re.escape(esc))
+			search = re.compile('|'.join(rx) or '(?!)').search
+			FastScanner.__stops[key] = search
+		
+		parts = []
+		while True:
+			m = search(t, p)
+			if m:
+				p = m.start()
+				if (m.end() >= n) and esc and self.Reverse:
+					# reversed text; escapes follow the char they escape, so
+					# a run of them (or the char after a stop) may go on in
+					# the next chunk
+					d = self.__more(start)
+					if d is not None:
+						p, start, t, n = p-d, start-d, self.__t, self.__n
+						continue
+				if m.lastgroup == 'r':
+					# a stop char is escaped if an odd number of escapes
+					# follow it
+					x = m.end()
+					c = '' if t[p] == esc else t[p]
+					k = x - p - len(c)
+					if c and not (k % 2) and ((test is None) or test(c)):
+						break
+					parts.append(t[start:p] + c + esc * (k // 2))
+					start = p = x
+					continue
+				elif m.lastgroup == 'e':
+					# (the escaped char may be in the next chunk)
+					parts.append(t[start:p])
+					start = p + 1
+					p += 2
+					continue
+				elif (test is None) or test(t[p]):
+					break
+				p += 1
+				continue
+			
+			# nothing more in the window; read more
+			p = max(p, n)
+			d = self.__more(start)
+			if d is None:
+				p = n
+				break
+			p, start, t, n = p-d, start-d, self.__t, self.__n
+		
+		parts.append(t[start:p])
+		self.__p = p
+		return ''.join(parts)
+	
+	
+	#
+	# RUN
+	#  - Return the run of characters for which `table[c]` is true,
+	#    starting at the current position.
+	#
+	def __run(self, table):
+		p = start = self.__start()
+		t, n = self.__t, self.__n
+		while True:
+			while (p < n) and table[t[p]]:
+				p += 1
+			if p < n:
+				break
+			d = self.__more(start)
+			if d is None:
+				break
+			p, start, t, n = p-d, start-d, self.__t, self.__n
+		
+		self.__p = p
+		return t[start:p]
+	
+	
+	def __escaped(self):
+		# Return True if the current char is escaped. Only in reversed
+		# text can that be known here: it's escaped if an odd number of
+		# escapes follow it. Text may be read into the window; callers
+		# must then reload the window and position.
+		esc = self.esc
+		if not (esc and self.Reverse):
+			return False
+		while True:
+			t, p, n = self.__t, self.__p, self.__n
+			x = p + 1
+			while (x < n) and (t[x] == esc):
+				x += 1
+			if x < n:
+				return bool((x - p - 1) % 2)
+			d = self.__more(p)
+			if d is None:
+				return bool((x - p - 1) % 2)
+			self.__p = p - d
+	
+	
+	def __fedto(self):
+		# Return the end of the text that may be fed to the bracket
+		# matcher. In reversed text that may continue in the next chunk,
+		# a trailing run of escapes (and the char before it) is held
+		# back until the rest of the run is read.
+		t, n = self.__t, self.__n
+		esc = self.esc
+		if (self.__src is None) or not (esc and self.Reverse):
+			return n
+		x = n
+		while (x > 0) and (t[x-1] == esc):
+			x -= 1
+		return max(x - 1, 0)
+	
+	
+	def __start(self):
+		# Return the current position, moving to the first character if
+		# nothing has been read yet.
+		if self.__p < 0:
+			self.__p = 0
+		return self.__p
+	
+	
+	#
+	# WINDOW
+	#  - Text read from a stream is appended to the window one chunk at
+	#    a time. Each time, text more than `bufsz` characters before
+	#    index `keep` (the start of the item being scanned) is dropped,
+	#    and the number of characters dropped is returned so callers may
+	#    adjust their indices. None is returned at the end of input.
+	#
+	def __more(self, keep):
+		if self.__src is None:
+			return None
+		for chunk in self.__src:
+			d = max(0, keep - self.bufsz)
+			self.__t = self.__t[d:] + chunk
+			self.__n = len(self.__t)
+			self.__base += d
+			return d
+		self.__src = None
+		return None
+	
+	
+	def __ready(self):
+		# Return True if there's a current character, reading more text
+		# into the window if necessary.
+		p = self.__start()
+		while p >= self.__n:
+			d = self.__more(p)
+			if d is None:
+				return False
+			p = self.__p = p - d
+		return True
+
+
+
+
 
 # -------------------------------------------------------------------
 #
@@ -760,14 +1860,28 @@ class Scanner(object):
 #
 # -------------------------------------------------------------------
 
-class RScan(Scanner):
-	"""Reverse scanner. Scans text backward."""
+class RScan(FastScanner):
+	"""
+	Reverse scanner. Scans text backward.
+	
+	A seekable file (text or binary) or mmap is read backward in
+	blocks, starting from its end (see `rscanchunks`), so the end of a
+	large log may be parsed without reading the rest of it.
+	"""
 	
 	def __init__(self, forward_iterable,  **k):
 		"""
 		Pass text to scan from the reversed direction.
 		"""
-		Scanner.__init__(self, reversed(forward_iterable))
+		if isinstance(forward_iterable, str):
+			text = forward_iterable[::-1]
+		elif rscannable(forward_iterable):
+			text = rscanchunks(forward_iterable, **k)
+		else:
+			text = reversed(forward_iterable)
+		FastScanner.__init__(self, text, **k)
+	
+	Reverse = True
 	
 	
 	#
@@ -817,4 +1931,190 @@ class RScan(Scanner):
 			return self.collect(lambda c: True)[::-1]
 		except StopIteration:
 			self.__eof = True
+
+
+
+
+# -------------------------------------------------------------------
+#
+#
+# PARALLEL SPLIT
+#  - Support for `FastScanner.psplit`. Partitions are scanned with a
+#    little of the following text (`PSPLIT_SLACK` chars, growing as
+#    needed) so that an item crossing the end of a partition is still
+#    scanned whole.
+#
+#
+# -------------------------------------------------------------------
+
+PSPLIT_MIN = 0x10000   # smaller texts are split serially
+PSPLIT_SLACK = 0x1000
+
+# a bracket or quote starting an item (ie, after a space char)
+PSPLIT_START = re.compile(
+		'(?<![^\u0020\u1680\u2000-\u200a\u205f\u3000])[\\[({"\']'
+	)
+
+
+def psplitpoints(text, parts, escape=Scanner.Escape):
+	"""
+	Return up to `parts`-1 offsets of newlines at which `text` may be
+	divided into partitions of roughly equal size. Only newlines at
+	bracket depth zero and outside of quotes are chosen.
+	
+	As in `split()`, brackets and quotes count only where they start an
+	item; brackets are then matched by `BracketMatch`.
+	
+	>>> psplitpoints('a [1,\\n2]\\nb [3,\\n4]\\nc "5\\n6"\\nd', 4)
+	[8, 17, 25]
+	"""
+	n = len(text)
+	size = n // max(parts, 1)
+	bm = BracketMatch(escape)
+	points = []
+	target = size
+	p = 0
+	while size and (len(points) < parts-1):
+		nl = text.find('\n', max(p, target))
+		if nl < 0:
+			break
+		
+		m = PSPLIT_START.search(text, p, nl)
+		if not m:
+			points.append(nl)
+			target = nl + size
+			p = nl + 1
+			continue
+		
+		p = m.start()
+		c = text[p]
+		if c in '"\'':
+			# skip to the closing (unescaped) quote
+			q = p + 1
+			while True:
+				x = text.find(c, q)
+				if x < 0:
+					return points # unclosed; the rest is one item
+				e = x
+				while escape and (e > q) and (text[e-1] == escape):
+					e -= 1
+				if not (x - e) % 2:
+					break
+				q = x + 1
+			p = x + 1
+		else:
+			# skip to the matching close bracket
+			bm.reset(p)
+			p = bm.close(text, p)
+			if p is None:
+				return points # unclosed
+	
+	return points
+
+
+def pscanitems(scanner, offset=0, stop=None):
+	"""
+	Generate (start, item) for each item `scanner.split()` would return,
+	where `start` is the item's offset (plus `offset`). Stop before any
+	item starting at or beyond `stop`. After each item is generated,
+	`scanner.pos` is just past its end.
+	"""
+	try:
+		while True:
+			scanner.passwhite()
+			start = offset + scanner.pos
+			if (stop is not None) and (start >= stop):
+				return
+			v = scanner.scan()
+			if not v:
+				return
+			yield start, v
+	except StopIteration:
+		pass
+
+
+def pscan(text, a, b, k=None, sync=()):
+	"""
+	Scan the items of `text` that start at offsets from `a` up to `b`,
+	stopping early at any item that starts at an offset in `sync`. The
+	last item may end beyond `b`.
 	
+	Returns (starts, items, end, hit): the offset of each item, the
+	items, the offset just past the last item, and the `sync` offset
+	reached (or None).
+	"""
+	k = k or {}
+	n = len(text)
+	slack = PSPLIT_SLACK
+	while True:
+		z = min(b + slack, n)
+		s = FastScanner(text[a:z], **k)
+		starts, items, end, hit = [], [], a, None
+		for start, item in pscanitems(s, a, b):
+			if start in sync:
+				hit = start
+				break
+			starts.append(start)
+			items.append(item)
+			end = a + s.pos
+		
+		# an item reaching `z` may continue beyond it
+		if (hit is not None) or (end < z) or (z >= n):
+			return starts, items, end, hit
+		slack *= 4
+
+
+def pmerge(text, bounds, results, k=None):
+	"""
+	Merge the `pscan` results for each of the (a, b) partitions given
+	by `bounds`, in order, rescanning serially wherever a partition's
+	items don't start where those of the one before it end.
+	"""
+	space = FastScanner.Space
+	n = len(text)
+	out = []
+	end = 0
+	for (a, b), (starts, items, e, hit) in zip(bounds, results):
+		
+		# the next item starts at the first non-space after the last
+		s = end
+		while (s < n) and space[text[s]]:
+			s += 1
+		if s >= b:
+			continue # this partition is within the last item
+		
+		if (not starts) or (s != starts[0]):
+			i = bisect.bisect_left(starts, s)
+			if (i >= len(starts)) or (starts[i] != s):
+				# out of step; rescan until an item starts where one of
+				# this partition's items does
+				st, it, e2, hit = pscan(text, s, b, k, set(starts))
+				out.extend(it)
+				if hit is None:
+					end = e2
+					continue
+				s = hit
+				i = bisect.bisect_left(starts, s)
+			items = items[i:]
+		
+		out.extend(items)
+		end = e
+	
+	return out
+
+
+
+
+#
+# WORKER FUNCTIONS
+#  - Run within worker processes started by `FastScanner.psplit()`.
+#
+_psplit_text = None
+_psplit_k = None
+
+def _psplit_init(text, k):
+	global _psplit_text, _psplit_k
+	_psplit_text, _psplit_k = text, k
+
+def _psplit(bounds):
+	return pscan(_psplit_text, bounds[0], bounds[1], _psplit_k)
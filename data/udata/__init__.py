@@ -7,9 +7,6 @@
 #
 
 from ... import *
-from .blocks import BLOCKS
-from .brackets import BRACKETPAIRS
-from .proplist import PROPERTIES
 import bisect
 
 
@@ -20,6 +17,28 @@ class udata(object):
 	CSize = 512*2
 	
 	
+	#
+	# TABLES
+	#  - Data tables are loaded on first use, not on import.
+	#
+	@classmethod
+	def table(cls, module, name):
+		"""
+		Return table `name` from module `module` within this package.
+		
+		>>> udata.table('blocks', 'BLOCKS')[0]
+		[[0, 127], 'Basic Latin']
+		"""
+		try:
+			return cls.__tables[name]
+		except AttributeError:
+			cls.__tables = {}
+		except KeyError:
+			pass
+		T = cls.__tables[name] = trix.nvalue('data.udata.%s' % module, name)
+		return T
+	
+	
 	#
 	# BRACKETS
 	#
@@ -34,17 +53,27 @@ class udata(object):
 		('o', ')')
 		>>>
 		
-		>>> 		
-		>>> from trix.data.udata import *
-
 		"""
-		i = ord(c)
-		x = bisect.bisect_left(BRACKETPAIRS, [i])
+		return cls.brackets().get(c)
+	
+	
+	@classmethod
+	def brackets(cls):
+		"""
+		Dict mapping each bracket char to its (open/close indicator,
+		matching bracket) tuple.
+		
+		>>> udata.brackets()[']']
+		('c', '[')
+		"""
 		try:
-			BP = BRACKETPAIRS[x]
-			return (BP[2], unichr(BP[1])) if (BP and BP[0]==i) else None
-		except IndexError:
-			return None
+			return cls.__brackets
+		except AttributeError:
+			cls.__brackets = {
+					chr(c): (kind, chr(m)) for c, m, kind in cls.table(
+						'brackets', 'BRACKETPAIRS')
+				}
+			return cls.__brackets
 	
 	
 	
@@ -54,7 +83,8 @@ class udata(object):
 	@classmethod
 	def block(cls, c):
 		"""
-		Returns the name of the block containing char `c`.
+		Returns the name of the block containing char `c`, or None for
+		codepoints that are not in any block.
 		
 		EXAMPLE
 		>>> from trix.data.udata import *
@@ -63,10 +93,7 @@ class udata(object):
 		>>>
 		
 		"""
-		i = ord(c)+1
-		x = bisect.bisect_left(BLOCKS, [[i]])
-		B = BLOCKS[x-1]
-		return B[1]
+		return cls.proptable().block(c)
 	
 	@classmethod
 	def blocks(cls):
@@ -84,9 +111,9 @@ class udata(object):
 		except AttributeError:
 			cls.__blocks = {}
 			cls.__blocknames = []
-			for b in BLOCKS:
-				cls.__blocknames.append(b[1])
-				cls.__blocks[b[1]] = b[0]
+			for first, last, name in cls.proptable().meta['blocks']:
+				cls.__blocknames.append(name)
+				cls.__blocks[name] = [first, last]
 			return cls.__blocks
 
 	@classmethod
@@ -121,10 +148,23 @@ class udata(object):
 			cls.__breakfast = trix.ncreate('data.udata.breakfast.breakfast')
 			return cls.__breakfast
 	
+	@classmethod
+	def proptable(cls):
+		"""
+		Returns the array-backed codepoint property tables (category,
+		bidi, linebreak, and binary properties). They're built on first
+		use and cached on disk; see `data.udata.proptable`.
+		"""
+		try:
+			return cls.__proptable
+		except AttributeError:
+			cls.__proptable = trix.ncreate('data.udata.proptable.proptable')
+			return cls.__proptable
+	
 	@classmethod
 	def properties(cls, c):
 		"""List of all properties of the given char `c`."""
-		return cls.propfast().get(c)
+		return cls.proptable().props(c)
 	
 	# PROP-ALIAS
 	@classmethod
@@ -139,10 +179,61 @@ class udata(object):
 	# LINE-BREAK PROPERTY (CODE)
 	@classmethod
 	def linebreak(cls, c):
-		return cls.breakfast().get(c)
+		"""The linebreak class of char `c`, or None."""
+		return cls.proptable().linebreak(c)
+	
+	@classmethod
+	def linebreak_classes(cls, text):
+		"""
+		Bytes holding the linebreak code of each character in `text`.
+		Names for the codes are listed in `udata.linebreak_names()`.
+		
+		>>> [udata.linebreak_names()[x] for x in udata.linebreak_classes('a "')]
+		['AL', 'SP', 'QU']
+		"""
+		return cls.table('linebreak', 'linebreak_classes')(text)
+	
+	@classmethod
+	def linebreak_names(cls):
+		"""List of linebreak class names, by code; '' for code zero."""
+		return cls.table('linebreak', 'LB_NAMES')
 		#linebreak = trix.nmodule('data.udata.linebreak')
 		#return linebreak.find_linebreak_property(ord(c))
 	
+	@classmethod
+	def linebreaker(cls):
+		"""
+		Return a new streaming UAX #14 line break segmenter.
+		
+		>>> list(udata.linebreaker().wrap("a bc def", 5))
+		['a bc', 'def']
+		"""
+		return trix.ncreate('data.udata.linebreaker.linebreaker')
+	
+	@classmethod
+	def charclass(cls, expr):
+		"""
+		Return the compiled `charclass` for predicate expression `expr`.
+		Compiled sets are kept, so each expression is compiled just once.
+		
+		>>> udata.charclass("Lu Ll '_'").skip("ab_c d")
+		4
+		
+		SEE ALSO:
+		>>> from trix.data.udata.charclass import *
+		>>> help(charclass)
+		"""
+		try:
+			return cls.__charclass[expr]
+		except AttributeError:
+			cls.__charclass = {}
+		except KeyError:
+			pass
+		cc = cls.__charclass[expr] = trix.ncreate(
+				'data.udata.charclass.charclass', expr
+			)
+		return cc
+	
 	
 	
 	#
@@ -171,11 +262,17 @@ class udata(object):
 		            to query info from a given string (or other iterable).
 		            Eg, text="Text I'm having trouble parsing!" 
 		
+		 * cat, bidi, block, br, props :
+		            Table fields may be matched by keyword; they're checked
+		            in bulk, which is much faster than `where`. Pass a
+		            value or a list of values, eg, cat=['Nd','Nl'].
+		 * workers: Split the query among this many processes.
+		
 		Either `blocks` or `text` may be specified, not both. If neither 
-		is specified, all codepoints are checked for matches.
+		is specified, all blocks are checked for matches.
 		
 		```python3
-		from trix.data.scan.scanquery import *
+		from trix.data.udata.query import *
 		query(
 		    select="block char numeric decimal digit",
 		    blocks=['Basic Latin', 'Gothic'],
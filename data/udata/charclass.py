@@ -0,0 +1,367 @@
+#
+# Copyright 2020 justworx
+# This file is part of the trix project, distributed under the terms
+# of the GNU Affero General Public License.
+#
+
+from .charinfo import *
+import ast, re
+
+
+#
+# CHARCLASS
+#  - A predicate expression is compiled to a codepoint bitmap (one
+#    byte per codepoint, 1 for a match), then to a regex character
+#    class, so whole runs of matching chars can be skipped with one
+#    `re.match`.
+#  - Table fields (cat, bidi, br, block, props) are turned to bitmaps
+#    page by page, from the proptable's two-stage arrays. Any other
+#    charinfo property is evaluated once for each assigned codepoint.
+#
+CODEPOINTS = 0x110000
+
+CHARCLASS_TOKEN = re.compile(r"""\s*(?:
+	(?P<q>'(?:\\.|[^'\\])*'|"(?:\\.|[^"\\])*") |
+	(?P<op>[!|&()]) |
+	(?P<w>[^\s!|&()'"]+)
+)""", re.X)
+
+CHARCLASS_CP = re.compile(r'^(?:U\+|0x)([0-9A-Fa-f]+)$')
+
+# charinfo predicates, in terms of table fields
+CHARCLASS_NAMES = {
+	'alpha'     : 'Lu Ll',
+	'alphanum'  : 'Lu Ll Nd',
+	'connector' : 'Pc',
+	'lineend'   : r"'\r\n\x85'",
+	'lend'      : r"'\r\n\x85'",
+	'tab'       : 'bidi=S',
+	'sep'       : 'bidi=S bidi=B',
+	'white'     : 'bidi=S bidi=B bidi=WS',
+	'space'     : 'Zs & bidi=WS & White_Space',
+	'quote'     : 'Po & bidi=ON & Quotation_Mark'
+}
+
+# keys for field=value items
+CHARCLASS_FIELDS = {
+	'cat' : 'cat', 'category' : 'cat', 'bidi' : 'bidi',
+	'bidirectional' : 'bidi', 'br' : 'linebreak',
+	'linebreak' : 'linebreak', 'block' : 'block'
+}
+
+CHARCLASS_NOT = bytes.maketrans(b'\x00\x01', b'\x01\x00')
+
+
+class charclass(object):
+	"""
+	A set of characters, given as a predicate expression.
+	
+	Items in the expression may be:
+	 * categories     : Lu Ll Nd, or a major class (eg, L for all
+	                    letters)
+	 * characters     : '-_' or "'" (quoted, with python escapes)
+	 * ranges         : a-z, or codepoints U+0041-U+005A, 0x41-0x5A
+	 * properties     : binary properties, eg, White_Space
+	 * field=value    : cat=Lu, bidi=WS, br=QU, block=Basic_Latin
+	 * charinfo names : alpha, alphanum, space, white, quote, etc.
+	
+	Items separated by spaces or `|` are joined (union); `&` takes the
+	intersection of two items (and binds more tightly); `!` negates an
+	item, and parentheses group items.
+	
+	A charclass may be passed, in place of a callable, to a scanner's
+	`collect` and `ignore` methods, which then skip over whole runs of
+	matching chars at once. Called with a charinfo object (or a char),
+	it returns True if the char is in the set.
+	
+	>>> from trix.data.udata.charclass import *
+	>>> cc = charclass("alpha | '-'")
+	>>> cc.skip("Line-1 ok", 0)
+	5
+	>>> 'x' in cc, '1' in cc
+	(True, False)
+	>>> charclass("!(L N) & 0x20-0x7E").skip("+-* x", 0)
+	4
+	"""
+	
+	def __init__(self, expr):
+		"""Compile predicate expression `expr`."""
+		self.__expr = expr
+		self.__tokens = self.tokens(expr)
+		bitmap = self.__union()
+		if self.__tokens:
+			raise ValueError("err-charclass-syntax", xdata(expr=expr,
+					unexpected=self.__tokens[0][1]))
+		
+		self.__ranges = [
+				(m.start(), m.end()-1) for m in re.finditer(b'\x01+', bitmap)
+			]
+		self.__pattern = self.classpattern(self.__ranges)
+		self.__one = re.compile(self.__pattern).match
+		self.__run = re.compile(self.__pattern + '*').match
+		self.__without = {}
+	
+	
+	def __repr__(self):
+		return "<trix/charclass %s>" % repr(self.__expr)
+	
+	def __call__(self, ci):
+		"""True if charinfo `ci` (or a char) is in this set."""
+		return self.__one(getattr(ci, 'c', ci)) is not None
+	
+	def __contains__(self, c):
+		return self.__one(c) is not None
+	
+	
+	@property
+	def expr(self):
+		"""The predicate expression."""
+		return self.__expr
+	
+	@property
+	def pattern(self):
+		"""The regex character class matching chars in this set."""
+		return self.__pattern
+	
+	@property
+	def ranges(self):
+		"""List of (first, last) codepoint ranges in this set."""
+		return self.__ranges
+	
+	
+	def skip(self, text, pos=0):
+		"""
+		Return the index after the run of chars in this set that starts
+		at `pos` in `text` (`pos` itself, if there's no such char).
+		"""
+		return self.__run(text, pos).end()
+	
+	
+	def without(self, chars):
+		"""Return a charclass like this one, excluding `chars`."""
+		try:
+			return self.__without[chars]
+		except KeyError:
+			expr = "(%s) & !%s" % (self.__expr, repr(chars))
+			cc = self.__without[chars] = type(self)(expr)
+			return cc
+	
+	
+	#
+	# CLASS PATTERN
+	#
+	@classmethod
+	def classpattern(cls, ranges):
+		"""Return a regex character class for codepoint `ranges`."""
+		if not ranges:
+			return r'[^\x00-\U0010FFFF]'
+		rx = []
+		for a, b in ranges:
+			if a == b:
+				rx.append('\\U%08X' % a)
+			else:
+				rx.append('\\U%08X-\\U%08X' % (a, b))
+		return '[%s]' % ''.join(rx)
+	
+	
+	#
+	# PARSE
+	#  - union := inter (['|'] inter)*
+	#    inter := unary ('&' unary)*
+	#    unary := '!' unary | '(' union ')' | item
+	#
+	@classmethod
+	def tokens(cls, expr):
+		"""Return a list of (kind, text) tokens for `expr`."""
+		result = []
+		p = 0
+		expr = expr.rstrip()
+		while p < len(expr):
+			m = CHARCLASS_TOKEN.match(expr, p)
+			if not m:
+				raise ValueError("err-charclass-syntax", xdata(expr=expr,
+						pos=p))
+			result.append((m.lastgroup, m.group(m.lastgroup)))
+			p = m.end()
+		return result
+	
+	
+	def __union(self):
+		bitmap = self.__inter()
+		while self.__tokens and (self.__tokens[0][1] != ')'):
+			if self.__tokens[0][1] == '|':
+				self.__tokens.pop(0)
+			bitmap = self.bitor(bitmap, self.__inter())
+		return bitmap
+	
+	
+	def __inter(self):
+		bitmap = self.__unary()
+		while self.__tokens and (self.__tokens[0][1] == '&'):
+			self.__tokens.pop(0)
+			bitmap = self.bitand(bitmap, self.__unary())
+		return bitmap
+	
+	
+	def __unary(self):
+		if not self.__tokens:
+			raise ValueError("err-charclass-syntax", xdata(expr=self.__expr,
+					reason="unexpected-end"))
+		kind, text = self.__tokens.pop(0)
+		if text == '!':
+			return self.__unary().translate(CHARCLASS_NOT)
+		elif text == '(':
+			bitmap = self.__union()
+			if not self.__tokens:
+				raise ValueError("err-charclass-syntax", xdata(
+						expr=self.__expr, reason="unclosed-paren"))
+			self.__tokens.pop(0)
+			return bitmap
+		elif kind == 'q':
+			return self.chars(ast.literal_eval(text))
+		elif kind == 'w':
+			return self.item(text)
+		
+		raise ValueError("err-charclass-syntax", xdata(expr=self.__expr,
+				unexpected=text))
+	
+	
+	#
+	# ITEMS
+	#  - Each of these returns a bitmap.
+	#
+	@classmethod
+	def item(cls, text):
+		"""Return the bitmap for a single (unquoted) item."""
+		pt = udata.proptable()
+		
+		# ranges, and single codepoints
+		if (len(text) == 3) and (text[1] == '-'):
+			return cls.span(ord(text[0]), ord(text[2]))
+		ends = text.split('-')
+		if (len(ends) <= 2) and all(CHARCLASS_CP.match(x) for x in ends):
+			ends = [int(CHARCLASS_CP.match(x).group(1), 16) for x in ends]
+			return cls.span(ends[0], ends[-1])
+		
+		# field=value
+		if '=' in text:
+			key, value = text.split('=', 1)
+			field = CHARCLASS_FIELDS.get(key)
+			if not field:
+				raise ValueError("err-charclass-field", xdata(item=text,
+						fields=sorted(CHARCLASS_FIELDS)))
+			if field == 'cat':
+				return cls.item(value)
+			if field == 'block':
+				value = value.replace('_', ' ')
+			if value not in pt.values(field):
+				raise ValueError("err-charclass-value", xdata(item=text))
+			return cls.field(field, lambda v: v == value)
+		
+		# categories
+		cats = pt.values('cat')
+		if text in cats:
+			return cls.field('cat', lambda v: v == text)
+		if (len(text) == 1) and any(c[0] == text for c in cats):
+			return cls.field('cat', lambda v: v[0] == text)
+		
+		# binary properties
+		try:
+			bit = pt.bit(text)
+			return cls.field('props', lambda v: v & bit)
+		except KeyError:
+			pass
+		
+		# charinfo properties
+		if text in CHARCLASS_NAMES:
+			return cls(CHARCLASS_NAMES[text]).bitmap()
+		if isinstance(getattr(charinfo, text, None), property):
+			return cls.evaluate(text)
+		
+		raise ValueError("err-charclass-item", xdata(item=text))
+	
+	
+	@classmethod
+	def chars(cls, chars):
+		"""Return the bitmap of the given `chars`."""
+		bitmap = bytearray(CODEPOINTS)
+		for c in chars:
+			bitmap[ord(c)] = 1
+		return bytes(bitmap)
+	
+	
+	@classmethod
+	def span(cls, first, last):
+		"""Return the bitmap of codepoints `first` through `last`."""
+		bitmap = bytearray(CODEPOINTS)
+		bitmap[first:last+1] = b'\x01' * max(0, last+1-first)
+		return bytes(bitmap)
+	
+	
+	@classmethod
+	def field(cls, field, test):
+		"""
+		Return the bitmap of codepoints whose proptable `field` value
+		passes callable `test`. Each distinct page is checked once.
+		"""
+		pt = udata.proptable()
+		x, p = pt.table(field)
+		codes = [1 if test(v) else 0 for v in pt.values(field)]
+		pages = {}
+		result = []
+		for page in x:
+			try:
+				result.append(pages[page])
+			except KeyError:
+				b = pages[page] = bytes([codes[v] for v in p[page<<8:(page+1)<<8]])
+				result.append(b)
+		return b''.join(result)
+	
+	
+	@classmethod
+	def evaluate(cls, propname):
+		"""
+		Return the bitmap of assigned codepoints for which charinfo
+		property `propname` is true. This is slow, so results are kept.
+		"""
+		try:
+			return cls.__evaluated[propname]
+		except AttributeError:
+			cls.__evaluated = {}
+		except KeyError:
+			pass
+		
+		assigned = cls('!(Cn | Cs | Co)').bitmap()
+		ci = charinfo('')
+		bitmap = bytearray(CODEPOINTS)
+		for m in re.finditer(b'\x01+', assigned):
+			for i in range(m.start(), m.end()):
+				ci.c = chr(i)
+				if getattr(ci, propname):
+					bitmap[i] = 1
+		bitmap = cls.__evaluated[propname] = bytes(bitmap)
+		return bitmap
+	
+	
+	def bitmap(self):
+		"""Return this set's bitmap."""
+		bitmap = bytearray(CODEPOINTS)
+		for a, b in self.__ranges:
+			bitmap[a:b+1] = b'\x01' * (b+1-a)
+		return bytes(bitmap)
+	
+	
+	#
+	# BITMAP OPERATIONS
+	#
+	@classmethod
+	def bitor(cls, a, b):
+		"""Union of bitmaps `a` and `b`."""
+		return (int.from_bytes(a, 'big') | int.from_bytes(b, 'big')).to_bytes(
+				CODEPOINTS, 'big')
+	
+	@classmethod
+	def bitand(cls, a, b):
+		"""Intersection of bitmaps `a` and `b`."""
+		return (int.from_bytes(a, 'big') & int.from_bytes(b, 'big')).to_bytes(
+				CODEPOINTS, 'big')
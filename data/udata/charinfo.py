@@ -390,9 +390,9 @@ class charinfo(xiter):
 		sped up by faster preliminary checks (for bidi=ON, and cat='Po').
 		
 		"""
-		# do the fast checks (bidi, cat) first, then do self.props
+		# do the fast checks (bidi, cat) first, then the property bit
 		return ((self.bidi=='ON') and (self.cat=='Po') and (
-			'Quotation_Mark' in self.props))
+			udata.proptable().hasprop(self.c, 'Quotation_Mark')))
 	
 	
 	#
@@ -552,9 +552,9 @@ class charinfo(xiter):
 	@property
 	def space(self):
 		"""True if the current codepoint is 'White_Space'."""
-		# do the fast checks (bidi, cat) first, then do self.props
+		# do the fast checks (bidi, cat) first, then the property bit
 		return (self.bidi=='WS') and (self.cat=='Zs') and (
-				'White_Space' in self.props
+				udata.proptable().hasprop(self.c, 'White_Space')
 			)
 	
 	
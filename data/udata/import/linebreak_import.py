@@ -11,7 +11,28 @@ from .... import *
 from ....util.xiter import *
 
 
-if __name__ == '__main__':
+#
+# COMPILE
+#  - Compile the block, bracket, linebreak and property tables into
+#    the versioned binary file that `data.udata.proptable` maps at
+#    run time. Run this after regenerating any of those tables:
+#      python3 -m trix.data.udata.import.linebreak_import compile
+#
+def compile_tables(path=None):
+	"""Write the compiled udata tables to `path`; return the path."""
+	proptable = trix.nvalue('data.udata.proptable', 'proptable')
+	path = path or trix.nvalue('data.udata.proptable', 'UDATA_FILE')
+	head, tables = proptable.buildudata()
+	if not proptable.save(path, head, tables):
+		raise OSError("err-compile-fail", xdata(path=path))
+	return path
+
+
+if (__name__ == '__main__') and ('compile' in sys.argv[1:]):
+	print ("Compiled: %s" % compile_tables())
+
+
+elif __name__ == '__main__':
 
 	
 	f = trix.path('data/unicode/UCD.zip').wrapper(
@@ -79,5 +100,8 @@ if __name__ == '__main__':
 	
 	# close the dict
 	w.write( ("\n}\n\n") )
+	
+	print ("Run again with the `compile` argument after updating the")
+	print ("LINEBREAK table to rebuild the compiled udata tables.")
 
 
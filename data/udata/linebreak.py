@@ -51,24 +51,115 @@ LINEBREAK = {
 
 
 
+#
+# LINEBREAK INTERVALS
+#  - LINEBREAK merged into one sorted interval table. Interval k runs
+#    from starts[k] up to (not including) starts[k+1], and has class
+#    LB_NAMES[codes[k]]. Code zero ('') marks codepoints that have no
+#    linebreak class. Lookups are a bisect on `starts`.
+#  - For BMP characters, a flat 64K table of codes (one per codepoint)
+#    is built on the first bulk lookup.
+#
+import array, bisect, re
+
+LB_NAMES = [''] + sorted(LINEBREAK.keys())
+LB_TABLES = {}
+LB_ASTRAL = re.compile('[\U00010000-\U0010FFFF]')
+
+
+def linebreak_intervals():
+	"""
+	Return the merged (starts, codes) arrays; adjacent ranges with the
+	same class are joined.
+	"""
+	try:
+		return LB_TABLES['intervals']
+	except KeyError:
+		pass
+	
+	ranges = []
+	for code, name in enumerate(LB_NAMES[1:], 1):
+		for item in LINEBREAK[name]:
+			if isinstance(item, int):
+				ranges.append((item, item, code))
+			else:
+				ranges.append((item[0], item[1], code))
+	ranges.sort()
+	
+	# interval boundaries, including those of unclassed gaps
+	bounds = []
+	end = 0
+	for first, last, code in ranges:
+		if first > end:
+			bounds.append((end, 0))
+		bounds.append((first, code))
+		end = last + 1
+	bounds.append((end, 0))
+	
+	starts = array.array('L')
+	codes = array.array('B')
+	for start, code in bounds:
+		if (not codes) or (code != codes[-1]):
+			starts.append(start)
+			codes.append(code)
+	
+	LB_TABLES['intervals'] = (starts, codes)
+	return LB_TABLES['intervals']
+
+
+def linebreak_bmp():
+	"""
+	Return a str mapping each BMP codepoint to the character whose
+	ordinal is its linebreak code, as a `str.translate` table.
+	"""
+	try:
+		return LB_TABLES['bmp']
+	except KeyError:
+		pass
+	
+	starts, codes = linebreak_intervals()
+	bmp = bytearray(0x10000)
+	for k in range(len(starts)):
+		if starts[k] >= 0x10000:
+			break
+		end = min(starts[k+1] if k+1 < len(starts) else 0x10000, 0x10000)
+		bmp[starts[k]:end] = bytes([codes[k]]) * (end-starts[k])
+	
+	LB_TABLES['bmp'] = bmp.decode('latin_1')
+	return LB_TABLES['bmp']
+
+
 def find_linebreak_property(char_code):
 	"""Return the linebreak property for the given char_code (int)."""
-	
+	starts, codes = linebreak_intervals()
+	return LB_NAMES[codes[bisect.bisect_right(starts, char_code)-1]]
+
+
+def linebreak_classes(text):
 	"""
-	if char_code >= 0x10FFFE:
-		return ''
-	if char_code >= 0xF0000:
-		return 'XX'
-	elif char_code >= 0xE0020:
-		return 'CN'
+	Return bytes holding the linebreak code of each character in
+	`text`; LB_NAMES[code] is the class name (or '' for none).
+	
+	>>> linebreak_classes('a "b"')
+	b'\\x02$ \\x02 '
+	>>> [LB_NAMES[x] for x in linebreak_classes('a "b"')]
+	['AL', 'SP', 'QU', 'AL', 'QU']
 	"""
+	#
+	# Translating with the BMP table maps each BMP character to its
+	# code (all codes are ascii); characters beyond the BMP are left
+	# as they are, so any that remain are looked up in the interval
+	# table and replaced in a second pass.
+	#
+	codes = text.translate(linebreak_bmp())
+	if not codes.isascii():
+		starts, lbcodes = linebreak_intervals()
+		astral = {}
+		for c in set(LB_ASTRAL.findall(codes)):
+			astral[c] = chr(lbcodes[bisect.bisect_right(starts, ord(c))-1])
+		codes = LB_ASTRAL.sub(lambda m: astral[m.group()], codes)
 	
-	for k in LINEBREAK.keys():
-		range_list = LINEBREAK[k]
-		if is_in_unicode_range_list(char_code, range_list):
-			return k
-		
-	return ''
+	return codes.encode('latin_1')
 
 
 
@@ -0,0 +1,399 @@
+#
+# Copyright 2018-2020 justworx
+# This file is part of the trix project, distributed under
+# the terms of the GNU Affero General Public License.
+#
+
+from .linebreak import *
+import re
+
+
+#
+# LINE BREAKING (UAX #14)
+#  - Text is converted to linebreak class codes in bulk (see
+#    `linebreak_classes`), then classes are resolved as LB1 directs:
+#    AI, SA, SG, XX, and unclassed codepoints become AL; CJ becomes NS.
+#  - The pair table gives, for each (before, after) pair of classes,
+#    whether a break is DIRECT (always allowed), INDIRECT (allowed
+#    only if spaces separate them), or PROHIBITED (never allowed, even
+#    across spaces). It's derived from rules LB8 - LB30a below.
+#  - The break table folds mandatory breaks (LB4 - LB6) and spaces
+#    (LB7, LB18) into the pair table, so each pair of adjacent classes
+#    is looked up in bulk. Combining marks (LB9, LB10) are removed
+#    first; the few rules that look further than one pair (LB8 and
+#    LB14 - LB17 across spaces, LB21a) are matched as exceptions.
+#  - Regional indicators (LB30a) pair up from the start of each run
+#    of them, so each run is found and every other pair is joined.
+#
+LB = {n:i for i,n in enumerate(LB_NAMES)}
+
+LB_DIRECT = 0
+LB_INDIRECT = 1
+LB_PROHIBITED = 2
+
+LB_ENDS = '\r\n\x0b\x0c\x85\u2028\u2029'
+
+
+def lb_resolve():
+	"""Return a bytes.translate table for LB1 class resolution."""
+	table = bytearray(range(256))
+	for name in ('', 'AI', 'SA', 'SG', 'XX'):
+		table[LB[name]] = LB['AL']
+	table[LB['CJ']] = LB['NS']
+	return bytes(table)
+
+
+def lb_rule(b, a):
+	"""
+	Return LB_DIRECT, LB_INDIRECT, or LB_PROHIBITED for a break
+	between a char of class `b` and one of class `a` (class names).
+	"""
+	if b == 'ZW':                                               # LB8
+		return LB_DIRECT
+	if a == 'WJ':                                               # LB11
+		return LB_PROHIBITED
+	if a in ('CL', 'CP', 'EX', 'IS', 'SY'):                     # LB13
+		return LB_PROHIBITED
+	if b == 'OP':                                               # LB14
+		return LB_PROHIBITED
+	if (b, a) in (('QU','OP'), ('CL','NS'), ('CP','NS'), ('B2','B2')):
+		return LB_PROHIBITED                                      # LB15-17
+	if b == 'WJ':                                               # LB11
+		return LB_INDIRECT
+	if b == 'GL':                                               # LB12
+		return LB_INDIRECT
+	if (a == 'GL') and (b not in ('BA', 'HY')):                 # LB12a
+		return LB_INDIRECT
+	if 'QU' in (a, b):                                          # LB19
+		return LB_INDIRECT
+	if 'CB' in (a, b):                                          # LB20
+		return LB_DIRECT
+	if (a in ('BA', 'HY', 'NS')) or (b == 'BB'):                # LB21
+		return LB_INDIRECT
+	if (b, a) == ('SY', 'HL'):                                  # LB21b
+		return LB_INDIRECT
+	if (a == 'IN') and (b in ('AL','HL','EX','ID','IN','NU')):  # LB22
+		return LB_INDIRECT
+	
+	AH = ('AL', 'HL')
+	JAMO = ('JL', 'JV', 'JT', 'H2', 'H3')
+	if ((b in AH) and (a == 'NU')) or ((b == 'NU') and (a in AH)):
+		return LB_INDIRECT                                        # LB23
+	if ((b == 'PR') and (a in ('ID',)+AH)) or (
+			(b == 'PO') and (a in AH)):                             # LB24
+		return LB_INDIRECT
+	if ((b in ('CL','CP','NU')) and (a in ('PO','PR'))) or (
+			(b in ('PO','PR')) and (a in ('OP','NU'))) or (
+			(b in ('HY','IS','NU','SY')) and (a == 'NU')):          # LB25
+		return LB_INDIRECT
+	if ((b == 'JL') and (a in ('JL','JV','H2','H3'))) or (
+			(b in ('JV','H2')) and (a in ('JV','JT'))) or (
+			(b in ('JT','H3')) and (a == 'JT')):                    # LB26
+		return LB_INDIRECT
+	if ((b in JAMO) and (a in ('IN','PO'))) or (
+			(b == 'PR') and (a in JAMO)):                           # LB27
+		return LB_INDIRECT
+	if (b in AH) and (a in AH):                                 # LB28
+		return LB_INDIRECT
+	if (b == 'IS') and (a in AH):                               # LB29
+		return LB_INDIRECT
+	if ((b in AH+('NU',)) and (a == 'OP')) or (
+			(b == 'CP') and (a in AH+('NU',))):                     # LB30
+		return LB_INDIRECT
+	# LB30a (RI x RI, for every other pair in a run) is applied to
+	# each run of regional indicators by `linebreaker.breaks`
+	return LB_DIRECT                                            # LB31
+
+
+LB_RESOLVE = lb_resolve()
+LB_PAIRS = [
+		bytes([lb_rule(b, a) for a in LB_NAMES]) for b in LB_NAMES
+	]
+
+# classes never broken before (LB6, LB7), and mandatory breaks (LB4)
+LB_NOBREAK = bytes([LB[n] for n in ('BK', 'CR', 'LF', 'NL', 'SP', 'ZW')])
+LB_MANDATORY = bytes([LB[n] for n in ('BK', 'CR', 'LF', 'NL')])
+
+
+def lb_breaks():
+	"""
+	Return a str.translate table mapping each pair of adjacent class
+	codes, `chr(before<<8 | after)`, to '\x01' where a break may fall
+	between them, else to '\x00'.
+	
+	After a space, a break is allowed unless the next char is never
+	broken before (LB11, LB13); the exceptions that depend on the char
+	before the spaces are found by the LB_EXCEPT regex.
+	"""
+	N = range(len(LB_NAMES))
+	spaced = [a for a in N if (a not in LB_NOBREAK) and (
+			LB_NAMES[a] not in ('CL', 'CP', 'EX', 'IS', 'SY', 'WJ'))]
+	
+	def rule(b, a):
+		if b in LB_MANDATORY:                                   # LB4, LB5
+			return (b != LB['CR']) or (a != LB['LF'])
+		if b == LB['SP']:                                       # LB18
+			return a in spaced
+		if a in LB_NOBREAK:                                     # LB6, LB7
+			return False
+		return LB_PAIRS[b][a] == LB_DIRECT
+	
+	table = ['\x00'] * (len(LB_NAMES) << 8)
+	for b in N:
+		for a in N:
+			if rule(b, a):
+				table[b<<8|a] = '\x01'
+	return ''.join(table)
+
+
+def lb_except():
+	"""
+	Compile a regex matching the exceptions to pair table breaks; the
+	pair ending at each match's end is PROHIBITED, or if group 1 is
+	matched, it's a DIRECT break.
+	"""
+	def cc(*names):
+		return b'[' + b''.join([re.escape(bytes([LB[n]])) for n in names]) + b']'
+	
+	SP = cc('SP') + b'+'
+	return re.compile(b'(?s)' + cc('OP','QU','CL','CP','B2','HL','ZW') + b'(?:' +
+			b'|'.join([
+				b'(?<=' + cc('OP') + b')' + SP + b'(?=.)',              # LB14
+				b'(?<=' + cc('QU') + b')' + SP + b'(?=' + cc('OP') + b')',  # LB15
+				b'(?<=' + cc('CL','CP') + b')' + SP + b'(?=' + cc('NS') + b')',  # LB16
+				b'(?<=' + cc('B2') + b')' + SP + b'(?=' + cc('B2') + b')',  # LB17
+				b'(?<=' + cc('HL') + b')' + cc('HY','BA') + b'(?=.)',   # LB21a
+				b'(?<=' + cc('ZW') + b')(' + SP + b')(?=[^' + re.escape(LB_NOBREAK) +
+						b'])'                                                   # LB8
+			]) + b')')
+
+
+LB_BREAKTABLE = lb_breaks()
+LB_EXCEPT = lb_except()
+LB_BREAK = re.compile(b'\x01')
+LB_CMRUN = re.compile(re.escape(bytes([LB['CM']])) + b'+')
+LB_RIPAIR = bytes([LB['RI']]) * 2
+LB_RIRUN = re.compile(re.escape(bytes([LB['RI']])) + b'{2,}')
+
+
+
+
+class linebreaker(object):
+	"""
+	Streaming UAX #14 line break segmenter.
+	
+	Feed text in chunks of any size; complete segments are returned as
+	(text, mandatory) tuples, each ending at a break opportunity. The
+	`mandatory` value is True when the break is required (eg, after a
+	newline). Call `close()` for the final segment.
+	
+	>>> from trix.data.udata.linebreaker import *
+	>>> lb = linebreaker()
+	>>> lb.feed("Hello, wor") + lb.feed("ld!\\nAgain") + lb.close()
+	[('Hello, ', False), ('world!\\n', True), ('Again', True)]
+	>>> list(linebreaker().wrap("The quick brown fox jumps.", 10))
+	['The quick', 'brown fox', 'jumps.']
+	
+	Widths are counted in characters; east asian wide characters are
+	not counted twice.
+	"""
+	
+	def __init__(self):
+		"""Create a segmenter; it's ready for the start of a text."""
+		self.reset()
+	
+	
+	def reset(self):
+		"""Discard any pending text; start a new text."""
+		self.__pending = ''
+		
+		# the last two classes (and a space, if spaces followed them) are
+		# prepended to the next chunk's classes
+		self.__ctx = b''
+	
+	
+	@property
+	def pending(self):
+		"""Text received since the last break opportunity."""
+		return self.__pending
+	
+	
+	#
+	# FEED
+	#
+	def feed(self, text):
+		"""Add `text`; return a list of the segments it completes."""
+		if not text:
+			return []
+		
+		breaks = self.breaks(text)
+		if not breaks:
+			self.__pending += text
+			return []
+		
+		ends = [i for i, m in breaks]
+		result = [
+				(text[a:e], m) for a, (e, m) in zip([0]+ends, breaks)
+			]
+		result[0] = (self.__pending + result[0][0], result[0][1])
+		self.__pending = text[ends[-1]:]
+		return result
+	
+	
+	def close(self):
+		"""End the text; return a list holding the final segment, if any."""
+		result = [(self.__pending, True)] if self.__pending else []
+		self.reset()
+		return result
+	
+	
+	#
+	# BREAKS
+	#
+	def breaks(self, text):
+		"""
+		Return a list of (index, mandatory) break opportunities within
+		`text`, a chunk that continues any text already given. Each
+		index is the offset (in `text`) of the char following the break.
+		"""
+		ctx = self.__ctx
+		start = len(ctx)
+		cls = ctx + linebreak_classes(text).translate(LB_RESOLVE)
+		
+		#
+		# LB9, LB10: Combining marks attach to the preceding char, so
+		# they're removed (keeping a map of positions) and never precede
+		# a break; those following spaces, line ends, or the start of
+		# text are treated as AL.
+		#
+		cmap = None
+		if LB['CM'] in cls:
+			cls, cmap = self.__attach(cls, start, not ctx)
+		
+		#
+		# Look up each adjacent pair in the break table; the pairs are
+		# formed as 16-bit chars by interleaving the class bytes. Breaks
+		# within the context were reported with the previous chunk.
+		#
+		breaks = []
+		if len(cls) > 1:
+			pairs = bytearray(2*len(cls)-2)
+			pairs[0::2] = cls[1:]
+			pairs[1::2] = cls[:-1]
+			brk = pairs.decode('utf_16_le').translate(
+					LB_BREAKTABLE).encode('latin_1')
+			
+			fix = [(m.end(), m.lastindex) for m in LB_EXCEPT.finditer(cls)]
+			runs = LB_RIRUN.finditer(cls) if LB_RIPAIR in cls else ()
+			if fix or runs:
+				brk = bytearray(brk)
+				for e, direct in fix:
+					brk[e-1] = 1 if direct else 0
+				
+				# LB30a: join the 1st and 2nd, 3rd and 4th, etc., of a run
+				for m in runs:
+					for i in range(m.start(), m.end()-1, 2):
+						brk[i] = 0
+			
+			M = LB_MANDATORY
+			breaks = [
+					(e, cls[e-1] in M) for e in [
+						m.end() for m in LB_BREAK.finditer(brk)
+					] if e >= start
+				]
+		
+		if cmap is not None:
+			breaks = [(cmap[e], m) for e, m in breaks]
+		if start:
+			breaks = [(e-start, m) for e, m in breaks]
+		
+		# save context for the next chunk
+		SP = LB['SP']
+		body = cls.rstrip(bytes([SP]))
+		self.__ctx = body[-2:] + (bytes([SP]) if len(body) < len(cls) else b'')
+		
+		#
+		# A run of regional indicators at the end may continue in the
+		# next chunk; the context keeps its parity. An odd run is kept
+		# as one RI (after the class before the run, if any).
+		#
+		if self.__ctx[-1:] == LB_RIPAIR[:1]:
+			n = len(body) - len(body.rstrip(LB_RIPAIR[:1]))
+			if (n > 1) and (n % 2):
+				self.__ctx = body[-n-1:-n] + LB_RIPAIR[:1]
+		return breaks
+	
+	
+	def __attach(self, cls, start, sot):
+		# Remove attached combining marks from `cls`; return the result
+		# and a list mapping each of its positions to those in `cls`.
+		AL = LB['AL']
+		out = bytearray(cls[:start])
+		cmap = list(range(start))
+		last = start
+		for m in LB_CMRUN.finditer(cls, start):
+			a, e = m.span()
+			if (a == 0 and sot) or (a > 0 and cls[a-1] in LB_NOBREAK):
+				out += cls[last:a] + bytes([AL]) * (e-a)
+				cmap.extend(range(last, e))
+			else:
+				out += cls[last:a]
+				cmap.extend(range(last, a))
+			last = e
+		out += cls[last:]
+		cmap.extend(range(last, len(cls)+1))
+		return bytes(out), cmap
+	
+	
+	#
+	# SEGMENTS
+	#
+	def segments(self, source, chunksize=65536):
+		"""
+		Generate (text, mandatory) segments from `source`, which may be
+		a str, a file-like object with a `read` method, or any iterable
+		of str chunks.
+		"""
+		self.reset()
+		if isinstance(source, str):
+			source = [source]
+		else:
+			try:
+				read = source.read
+				source = iter(lambda: read(chunksize), '')
+			except AttributeError:
+				pass
+		
+		for chunk in source:
+			for seg in self.feed(chunk):
+				yield seg
+		for seg in self.close():
+			yield seg
+	
+	
+	#
+	# WRAP
+	#
+	def wrap(self, source, width=79):
+		"""
+		Generate lines of at most `width` chars, breaking at the last
+		break opportunity that fits (greedy wrap). Mandatory breaks
+		always end a line. Trailing spaces and line-end characters are
+		removed; a segment wider than `width` is split.
+		
+		The `source` may be anything `segments()` accepts.
+		"""
+		line = ''
+		for text, mandatory in self.segments(source):
+			if mandatory:
+				text = text.rstrip(LB_ENDS)
+			if line and (len(line) + len(text.rstrip(' ')) > width):
+				yield line.rstrip(' ')
+				line = ''
+			line += text
+			while len(line.rstrip(' ')) > width:
+				yield line[:width]
+				line = line[width:]
+			if mandatory:
+				yield line.rstrip(' ')
+				line = ''
@@ -110,7 +110,7 @@ class mapfast(object):
 		FB = self.fblocks
 		
 		# store the dict `bprops` locally (for speed)
-		bprops = FB[cblock]
+		bprops = FB.get(cblock, {})
 		
 		# gotta use int, not chr
 		x = ord(c)
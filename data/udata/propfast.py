@@ -5,6 +5,7 @@
 #
 
 from .mapfast import *
+from .proplist import PROPERTIES
 
 
 #
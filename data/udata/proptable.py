@@ -0,0 +1,454 @@
+#
+# Copyright 2018-2020 justworx
+# This file is part of the trix project, distributed under
+# the terms of the GNU Affero General Public License.
+#
+
+from . import *
+import unicodedata, array, json, mmap, os, sys
+
+
+#
+# PROP-TABLE
+#  - Two-stage codepoint tables. A codepoint's high bits (cp >> 8)
+#    select a page number from the `index` array, and its low byte
+#    selects a code within that 256-entry page of the `pages` array.
+#    The code indexes the field's list of values. Identical pages are
+#    stored only once, so the tables are small and every lookup is
+#    two indexed loads.
+#
+#  - Block, bracket, linebreak and property tables come from this
+#    package's data tables. They're compiled offline into UDATA_FILE
+#    (see import/linebreak_import.py) and memory-mapped when loaded,
+#    so none of the large literal tables need be imported.
+#
+#  - Category and bidi tables come from the running python's
+#    `unicodedata`, so they're built on first use and cached under
+#    DEF_CACHE, once per unicode version.
+#
+PROPTABLE_VERSION = 2
+PROPTABLE_MAGIC = b'TRIXUPT\x00'
+PROPTABLE_SHIFT = 8
+PROPTABLE_CACHE = '%s/udata' % DEF_CACHE
+
+CODEPOINTS = 0x110000
+
+UDATA_FILE = os.path.join(os.path.dirname(__file__), 'udata.bin')
+UDATA_FIELDS = ('block', 'bracket', 'linebreak', 'props')
+UCD_FIELDS = ('cat', 'bidi')
+
+
+class proptable(object):
+	"""
+	Array-backed codepoint property lookup.
+	
+	Holds, for every codepoint, the general category, the bidi class,
+	the block, bracket pairing, linebreak class, and binary properties
+	(as listed in PROPERTIES).
+	
+	>>> from trix.data.udata.proptable import *
+	>>> pt = proptable()
+	>>> pt.cat('a'), pt.bidi('a'), pt.linebreak('a'), pt.block('a')
+	('Ll', 'L', 'AL', 'Basic Latin')
+	>>> pt.bracket('(')
+	('o', ')')
+	>>> pt.hasprop(' ', 'White_Space')
+	True
+	"""
+	
+	Fields = UCD_FIELDS + UDATA_FIELDS
+	
+	def __init__(self, path=None):
+		"""
+		Load the compiled udata tables from `path` (default UDATA_FILE)
+		and the unicodedata tables from the cache. Tables that can't be
+		loaded are built from source and cached.
+		"""
+		self.__path = path or UDATA_FILE
+		self.__values = {}
+		self.__tables = {}
+		self.__meta = {}
+		self.__files = []
+		self.__open(
+				[self.__path, self.cachepath('udata')], UDATA_FIELDS,
+				self.buildudata
+			)
+		self.__open([self.cachepath('unicode')], UCD_FIELDS, self.buildunicode)
+		
+		T = self.__tables
+		V = self.__values
+		self.__cx, self.__cp = T['cat']
+		self.__bx, self.__bp = T['bidi']
+		self.__kx, self.__kp = T['block']
+		self.__rx, self.__rp = T['bracket']
+		self.__lx, self.__lp = T['linebreak']
+		self.__px, self.__pp = T['props']
+		self.__cv = V['cat']
+		self.__bv = V['bidi']
+		self.__kv = V['block']
+		self.__lv = V['linebreak']
+		self.__rv = [(v[0], unichr(v[1])) if v else None for v in V['bracket']]
+		
+		# property names, bits, and the name list for each props code
+		propnames = self.__meta['propnames']
+		self.__bits = {p:1<<i for i,p in enumerate(propnames)}
+		self.__pv = [
+				[n for b,n in enumerate(propnames) if m>>b&1] for m in V['props']
+			]
+	
+	
+	def __open(self, paths, fields, build):
+		# Load `fields` from the first readable file in `paths`; if none
+		# can be read, build them and cache them at the last path.
+		for path in paths:
+			try:
+				head, tables, mm = self.load(path)
+				values = {f:head['values'][f] for f in fields}
+				tables = {f:tables[f] for f in fields}
+				self.__files.append(mm)
+				break
+			except (OSError, ValueError, KeyError):
+				pass
+		else:
+			head, tables = build()
+			values = head['values']
+			self.save(paths[-1], head, tables)
+		
+		self.__values.update(values)
+		self.__tables.update(tables)
+		self.__meta.update(head.get('meta', {}))
+	
+	
+	@property
+	def path(self):
+		"""Path to the compiled udata table file."""
+		return self.__path
+	
+	@property
+	def meta(self):
+		"""Dict of extra table data (block ranges, property names)."""
+		return self.__meta
+	
+	
+	def values(self, field):
+		"""
+		List of the values for `field`, in code order. For 'props', each
+		value is a bitmask of the properties named in `meta`.
+		"""
+		return self.__values[field]
+	
+	
+	def table(self, field):
+		"""Return the (index, pages) array pair for `field`."""
+		return self.__tables[field]
+	
+	
+	def code(self, field, c):
+		"""Return the integer code stored for `field` at char `c`."""
+		i = ord(c)
+		x, p = self.__tables[field]
+		return p[(x[i>>8]<<8)|(i&0xFF)]
+	
+	
+	#
+	# LOOKUPS
+	#
+	def cat(self, c):
+		"""General category of char `c` (as `unicodedata.category`)."""
+		i = ord(c)
+		return self.__cv[self.__cp[(self.__cx[i>>8]<<8)|(i&0xFF)]]
+	
+	def bidi(self, c):
+		"""Bidi class of char `c` (as `unicodedata.bidirectional`)."""
+		i = ord(c)
+		return self.__bv[self.__bp[(self.__bx[i>>8]<<8)|(i&0xFF)]]
+	
+	def block(self, c):
+		"""Name of the block containing char `c`, or None."""
+		i = ord(c)
+		return self.__kv[self.__kp[(self.__kx[i>>8]<<8)|(i&0xFF)]]
+	
+	def bracket(self, c):
+		"""Tuple with open/close indicator and matching bracket, or None."""
+		i = ord(c)
+		return self.__rv[self.__rp[(self.__rx[i>>8]<<8)|(i&0xFF)]]
+	
+	def linebreak(self, c):
+		"""Linebreak class of char `c`, or None."""
+		i = ord(c)
+		return self.__lv[self.__lp[(self.__lx[i>>8]<<8)|(i&0xFF)]]
+	
+	def props(self, c):
+		"""Sorted list of binary property names of char `c`."""
+		i = ord(c)
+		return list(self.__pv[self.__pp[(self.__px[i>>8]<<8)|(i&0xFF)]])
+	
+	def mask(self, c):
+		"""Binary property bitmask of char `c`."""
+		i = ord(c)
+		return self.__values['props'][
+				self.__pp[(self.__px[i>>8]<<8)|(i&0xFF)]
+			]
+	
+	def bit(self, propname):
+		"""The mask bit for property `propname`; KeyError if unknown."""
+		return self.__bits[propname]
+	
+	def hasprop(self, c, propname):
+		"""True if char `c` has binary property `propname`."""
+		i = ord(c)
+		return propname in self.__pv[self.__pp[(self.__px[i>>8]<<8)|(i&0xFF)]]
+	
+	
+	#
+	# BUILD
+	#  - Each build method returns a (head, tables) tuple. The `head`
+	#    dict holds each field's value list (key 'values') and any extra
+	#    data (key 'meta'); `tables` maps each field to its (index,
+	#    pages) array pair.
+	#
+	@classmethod
+	def buildunicode(cls):
+		"""Build category and bidi tables from `unicodedata`."""
+		category = unicodedata.category
+		bidirectional = unicodedata.bidirectional
+		
+		cat = bytearray(CODEPOINTS)
+		bidi = bytearray(CODEPOINTS)
+		cv = {}
+		bv = {}
+		for i in range(CODEPOINTS):
+			c = chr(i)
+			v = category(c)
+			cat[i] = cv[v] if v in cv else cv.setdefault(v, len(cv))
+			v = bidirectional(c)
+			bidi[i] = bv[v] if v in bv else bv.setdefault(v, len(bv))
+		
+		head = dict(values=dict(
+			cat = sorted(cv, key=cv.get), bidi = sorted(bv, key=bv.get)
+		))
+		tables = dict(
+			cat = cls.paginate(array.array('B', cat)),
+			bidi = cls.paginate(array.array('B', bidi))
+		)
+		return head, tables
+	
+	
+	@classmethod
+	def buildudata(cls):
+		"""
+		Build block, bracket, linebreak and property tables from the
+		data tables in this package.
+		"""
+		BLOCKS = trix.nvalue('data.udata.blocks', 'BLOCKS')
+		BRACKETPAIRS = trix.nvalue('data.udata.brackets', 'BRACKETPAIRS')
+		LINEBREAK = trix.nvalue('data.udata.linebreak', 'LINEBREAK')
+		PROPERTIES = trix.nvalue('data.udata.proplist', 'PROPERTIES')
+		
+		# block names, with code zero meaning no block
+		blockv = [None] + [b[1] for b in BLOCKS]
+		block = array.array('H', bytes(2*CODEPOINTS))
+		for code, b in enumerate(BLOCKS, 1):
+			block[b[0][0]:b[0][1]+1] = array.array('H', [code]) * (
+					b[0][1]+1-b[0][0]
+				)
+		
+		# bracket [type, pair] lists
+		bracketv = [None]
+		bracket = bytearray(CODEPOINTS)
+		for bp in BRACKETPAIRS:
+			bracket[bp[0]] = len(bracketv)
+			bracketv.append([bp[2], bp[1]])
+		
+		# linebreak classes
+		lbv = [None] + sorted(LINEBREAK.keys())
+		lb = bytearray(CODEPOINTS)
+		for code, name in enumerate(lbv[1:], 1):
+			for a, b in cls.ranges(LINEBREAK[name]):
+				lb[a:b+1] = bytes([code]) * (b+1-a)
+		
+		# binary properties: one bit each, then one code per distinct mask
+		propnames = sorted(PROPERTIES.keys())
+		masks = array.array('Q', bytes(8*CODEPOINTS))
+		for bit, name in enumerate(propnames):
+			m = 1 << bit
+			for a, b in cls.ranges(PROPERTIES[name]):
+				for i in range(a, b+1):
+					masks[i] |= m
+		mv = {}
+		props = array.array('H', [
+				mv[m] if m in mv else mv.setdefault(m, len(mv)) for m in masks
+			])
+		
+		head = dict(
+			values = dict(
+				block = blockv,
+				bracket = bracketv,
+				linebreak = lbv,
+				props = sorted(mv, key=mv.get)
+			),
+			meta = dict(
+				propnames = propnames,
+				blocks = [[b[0][0], b[0][1], b[1]] for b in BLOCKS]
+			)
+		)
+		tables = dict(
+			block = cls.paginate(block),
+			bracket = cls.paginate(array.array('B', bracket)),
+			linebreak = cls.paginate(array.array('B', lb)),
+			props = cls.paginate(props)
+		)
+		return head, tables
+	
+	
+	@classmethod
+	def ranges(cls, items):
+		"""
+		Generate (first, last) pairs from a udata list of codepoints and
+		[first, last] ranges.
+		"""
+		for item in items:
+			if isinstance(item, int):
+				yield (item, item)
+			else:
+				yield (item[0], item[1])
+	
+	
+	@classmethod
+	def paginate(cls, flat):
+		"""
+		Split array `flat` (one code per codepoint) into 256-entry
+		pages; return an (index, pages) tuple in which each distinct
+		page is stored only once. Codes that fit are stored as bytes.
+		"""
+		if (flat.typecode != 'B') and (max(flat) < 256):
+			flat = array.array('B', flat)
+		
+		size = 1 << PROPTABLE_SHIFT
+		index = array.array('H')
+		pages = array.array(flat.typecode)
+		seen = {}
+		for p in range(0, len(flat), size):
+			page = flat[p:p+size]
+			key = page.tobytes()
+			n = seen.get(key)
+			if n is None:
+				n = seen[key] = len(seen)
+				pages.extend(page)
+			index.append(n)
+		return index, pages
+	
+	
+	#
+	# TABLE FILES
+	#  - The magic bytes, a 4-byte little-endian header length, a json
+	#    header, then the raw arrays, each starting on an 8-byte
+	#    boundary. The header holds the format version, the unicode
+	#    version (for unicodedata tables), the value lists, and each
+	#    array's typecode and byte offset/length.
+	#
+	@classmethod
+	def cachepath(cls, name):
+		"""
+		Path of cached table file `name` ('unicode' or 'udata') for this
+		python's unicode version.
+		"""
+		return os.path.join(
+				os.path.expanduser(PROPTABLE_CACHE), "%s-%s-%i.bin" % (
+					name, unicodedata.unidata_version, PROPTABLE_VERSION
+				)
+			)
+	
+	
+	@classmethod
+	def save(cls, path, head, tables):
+		"""
+		Write table file `path`; tables may be arrays or memoryviews.
+		Returns True on success; a cache that can't be written is simply
+		not used.
+		"""
+		head = dict(head, version=PROPTABLE_VERSION, byteorder=sys.byteorder,
+				unidata=unicodedata.unidata_version, tables={}
+			)
+		blobs = []
+		offset = 0
+		for field in sorted(tables):
+			entry = []
+			for a in tables[field]:
+				data = a.tobytes()
+				typecode = a.format if isinstance(a, memoryview) else a.typecode
+				entry.append([typecode, offset, len(data)])
+				blobs.append(data + bytes(-len(data) % 8))
+				offset += len(blobs[-1])
+			head['tables'][field] = entry
+		
+		jhead = json.dumps(head, sort_keys=True).encode('ascii')
+		jhead += b' ' * (-(len(jhead)+12) % 8)
+		try:
+			os.makedirs(os.path.dirname(path), exist_ok=True)
+			temp = "%s.%i" % (path, os.getpid())
+			with open(temp, 'wb') as f:
+				f.write(PROPTABLE_MAGIC)
+				f.write(len(jhead).to_bytes(4, 'little'))
+				f.write(jhead)
+				for blob in blobs:
+					f.write(blob)
+			os.replace(temp, path)
+			return True
+		except OSError:
+			return False
+	
+	
+	@classmethod
+	def load(cls, path, usemap=True):
+		"""
+		Read table file `path`; return a (head, tables, mmap) tuple.
+		
+		Arrays are memoryviews of the mapped file unless its byte order
+		differs from this machine's (or `usemap` is False), in which case
+		they're copied into arrays and mmap is None. Raises ValueError if
+		the file is not a current table file.
+		"""
+		with open(path, 'rb') as f:
+			if usemap:
+				data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+			else:
+				data = f.read()
+		
+		if data[:8] != PROPTABLE_MAGIC:
+			raise ValueError("err-proptable-format", xdata(path=path))
+		size = int.from_bytes(data[8:12], 'little')
+		head = json.loads(data[12:12+size].decode('ascii'))
+		if head['version'] != PROPTABLE_VERSION:
+			raise ValueError("err-proptable-version", xdata(
+					path=path, version=head['version']
+				))
+		if any(f in head['tables'] for f in UCD_FIELDS) and (
+				head['unidata'] != unicodedata.unidata_version
+			):
+			raise ValueError("err-proptable-unidata", xdata(
+					path=path, unidata=head['unidata']
+				))
+		
+		swap = head['byteorder'] != sys.byteorder
+		if swap and usemap:
+			data.close()
+			return cls.load(path, usemap=False)
+		
+		base = 12 + size
+		view = memoryview(data)
+		tables = {}
+		for field, entry in head['tables'].items():
+			pair = []
+			for typecode, offset, length in entry:
+				mv = view[base+offset:base+offset+length]
+				if usemap:
+					pair.append(mv.cast(typecode))
+				else:
+					a = array.array(typecode, mv.tobytes())
+					if swap:
+						a.byteswap()
+					pair.append(a)
+			tables[field] = tuple(pair)
+		
+		return head, tables, (data if usemap else None)
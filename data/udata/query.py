@@ -1,10 +1,38 @@
 #
 # Copyright 2018 justworx
-# This file is part of the trix project, distributed under the terms 
+# This file is part of the trix project, distributed under the terms
 # of the GNU Affero General Public License.
 #
 
-from ..scan import *
+from .charinfo import *
+
+
+#
+# QUERY
+#  - The select list is resolved once into accessor functions, each
+#    taking a one-char string.
+#  - Predicates on table fields (cat, bidi, block, br, props) are
+#    evaluated in bulk: each distinct page of the proptable arrays is
+#    checked once, so most of the codepoint space is never visited.
+#  - A `where` callable is then called for the remaining codepoints,
+#    with a single reused charinfo object.
+#
+QUERY_TITLES = 'block ord char bidi bracket cat num name'
+QUERY_CHUNK = 0x1000  # max codepoints in each task given to workers
+
+QUERY_ALIAS = {
+	'c' : 'char', 'bidirectional' : 'bidi', 'category' : 'cat',
+	'dec' : 'decimal', 'dig' : 'digit', 'num' : 'numeric',
+	'decomp' : 'decomposition', 'properties' : 'props',
+	'linebreak' : 'br'
+}
+
+# keyword arguments that select by proptable field
+QUERY_FIELDS = {
+	'cat' : 'cat', 'category' : 'cat', 'bidi' : 'bidi',
+	'bidirectional' : 'bidi', 'block' : 'block', 'br' : 'linebreak',
+	'linebreak' : 'linebreak', 'props' : 'props', 'properties' : 'props'
+}
 
 
 def query(**k):
@@ -14,10 +42,10 @@ def query(**k):
 	EXAMPLE:
 	>>> from trix.data.udata import *
 	>>> udata.query(
-	...   blocks=['Basic Latin', "Gothic"], 
+	...   blocks=['Basic Latin', "Gothic"],
 	...   where=lambda ci: ci.num != None
 	... )
-
+	
 	BLOCK       ORD     CHAR BIDI BRACKET CAT NUM   NAME
 	Basic Latin 0x30    '0'  EN   None    Nd  0.0   DIGIT ZERO
 	Basic Latin 0x31    '1'  EN   None    Nd  1.0   DIGIT ONE
@@ -34,6 +62,10 @@ def query(**k):
 	qtime: 0.176986
 	>>>
 	
+	Table fields may be selected by keyword, and are matched in bulk.
+	Pass a value, or a list of values to match any of them:
+	>>> udata.query(blocks='*', cat='Nl', select="ord char name")
+	
 	SEE ALSO:
 	>>> from trix.data.udata import charinfo
 	>>> help(charinfo)
@@ -44,12 +76,24 @@ def query(**k):
 
 
 
-class ScanQuery(Scanner):
+class ScanQuery(object):
 	"""
 	Select unicode data properties.
 	
 	The `ScanQuery` class is the workhorse behind the `query` function,
-	defined above.
+	defined above. Keyword arguments given to the constructor are the
+	defaults for each method.
+	
+	KWARGS:
+	 * select  : space-separated column names (default: `Titles`)
+	 * blocks  : list of block names, or '*' for all blocks
+	 * ranges  : list of [first, last] codepoint ranges, instead
+	             of blocks
+	 * text    : query the chars of a string instead of blocks
+	 * where   : callable receiving a charinfo; True to select it
+	 * limit   : skip blocks starting at or beyond this codepoint
+	 * workers : number of processes to split block queries among
+	 * cat, bidi, block, br, props : table fields to match in bulk
 	
 	EXAMPLE
 	>>> from trix.data.udata.query import *
@@ -57,169 +101,254 @@ class ScanQuery(Scanner):
 	...                where=lambda ci: ci.num != None)
 	>>> result = sq.format()
 	
-	# -----------------------------------------------------------------
+	"""
+	
+	# default fields to query
+	Titles = QUERY_TITLES
+	
+	def __init__(self, **k):
+		"""Pass query keyword arguments; see the class docstring."""
+		self.__k = k
+	
+	
 	#
+	# COLUMNS
 	#
-	# DARN. This doesn't work right. It's not limiting the
-	#       results to numbers. I can't see how it works
-	#       for `query` but not for `format`.
+	@classmethod
+	def columns(cls, select=None):
+		"""
+		Return a list of accessors, one for each column named in the
+		space-separated `select` string. Each takes a one-char string
+		and returns the column value.
+		"""
+		return [cls.column(t) for t in (select or cls.Titles).split()]
+	
+	
+	@classmethod
+	def column(cls, title):
+		"""Return the accessor for column `title`."""
+		t = title.lower()
+		t = QUERY_ALIAS.get(t, t)
+		pt = udata.proptable()
+		if t == 'char':
+			cat = unicodedata.category
+			return lambda c: "' %s'" % c if cat(c) == 'Mc' else repr(c)
+		elif t == 'ord':
+			return lambda c: "0x%X" % ord(c)
+		elif t == 'name':
+			return lambda c: unicodedata.name(c, '')
+		elif t in ('numeric', 'decimal', 'digit'):
+			fn = getattr(unicodedata, t)
+			return lambda c: fn(c, None)
+		elif t == 'props':
+			return lambda c: " ".join(pt.props(c))
+		elif t == 'br':
+			return pt.linebreak
+		elif t in ('block', 'bracket'):
+			return getattr(pt, t)
+		elif t == 'cat':
+			return unicodedata.category
+		elif t == 'bidi':
+			return unicodedata.bidirectional
+		elif t in ('decomposition', 'mirrored'):
+			return getattr(unicodedata, t)
+		elif isinstance(getattr(charinfo, t, None), property):
+			# any other charinfo property (eg, catname, brname)
+			ci = charinfo('')
+			def get(c):
+				ci.c = c
+				return getattr(ci, t)
+			return get
+		
+		raise ValueError('err-unknown-property', xdata(prop=title))
+	
+	
 	#
+	# MATCH
 	#
-	# -----------------------------------------------------------------
+	def match(self, **k):
+		"""Generate the matching chars."""
+		k = dict(self.__k, **k)
+		fields = self.fields(**k)
+		where = k.get('where')
+		if where:
+			ci = charinfo('')
+		
+		text = k.get('text')
+		if text is not None:
+			pt = udata.proptable()
+			chars = iter(text)
+			for f, codes in fields:
+				chars = self.__filter(chars, pt, f, codes)
+		else:
+			chars = self.__scan(self.ranges(**k), fields)
+		
+		for c in chars:
+			if where:
+				ci.c = c
+				if not where(ci):
+					continue
+			yield c
 	
-	"""
 	
-	# default fields to query
-	Titles = 'block ord char bidi bracket cat num name'
+	@staticmethod
+	def __filter(chars, pt, field, codes):
+		return (c for c in chars if pt.code(field, c) in codes)
 	
-	# default limit when block=='*'
-	ALimit = 0x3399
 	
-	@classmethod
-	def chargen(cls, **k):
-		limit = k.get('limit') or 0
-		blocks = udata.blocks()
-		bnames = k.get('blocks') or udata.blocknames()
+	def __scan(self, ranges, fields):
+		# Generate chars in `ranges` that match all `fields`, checking
+		# each distinct combination of table pages just once.
+		if not fields:
+			for first, last in ranges:
+				for i in range(first, last+1):
+					yield chr(i)
+			return
 		
-		#
-		# CHECK LIMIT
-		#  - Limit is a stop-gap measure to prohibit CJK (0x3400 and 
-		#    beyond).
-		#  - This makes it more practical to set the 'blocks' keyword
-		#    argument default to '*'.
-		#
-		if (bnames=='*'):
-			limit = limit or cls.ALimit
-			bnames = udata.blocknames()
-			#print (limit)
-			
-		# Loop through blocks...
-		for block in bnames:
-			rng = blocks[block]
-			try:
-				# yield all codepoints in the current block...
-				for c in range(rng[0], rng[1]+1):
-					yield (unichr(c))
+		pt = udata.proptable()
+		tables = [(pt.table(f), codes) for f, codes in fields]
+		found = {}
+		for first, last in ranges:
+			for hi in range(first>>8, (last>>8)+1):
+				key = tuple([x[hi] for (x, p), codes in tables])
+				try:
+					offsets = found[key]
+				except KeyError:
+					offsets = None
+					for (x, p), codes in tables:
+						page = p[x[hi]<<8:(x[hi]+1)<<8]
+						m = {i for i, v in enumerate(page) if v in codes}
+						offsets = m if offsets is None else offsets & m
+					offsets = found[key] = sorted(offsets)
 				
-				# ...check limit AFTER each block.
-				if limit and (c >= limit):
-					raise StopIteration()
-			
-			except ValueError:
-				if c > 0x10FFFF:
-					raise StopIteration()
-				else:
-					raise
+				base = hi << 8
+				for i in offsets:
+					if first <= base+i <= last:
+						yield chr(base+i)
 	
 	
-	def __init__(self, **k):
-		"""Pass text to query, or None (the contents of each block)."""
-		text = k.get('text') or self.chargen(**k)
-		Scanner.__init__(self, text)
+	@classmethod
+	def fields(cls, **k):
+		"""
+		Return a list of (field, codes) pairs for table field keywords
+		in `k`; `codes` is the set of field codes that match.
+		"""
+		pt = udata.proptable()
+		result = []
+		for key in k:
+			field = QUERY_FIELDS.get(key)
+			if not field:
+				continue
+			want = k[key]
+			want = [want] if isinstance(want, str) else list(want)
+			values = pt.values(field)
+			if field == 'props':
+				try:
+					mask = 0
+					for name in want:
+						mask |= pt.bit(name)
+				except KeyError:
+					raise ValueError('err-unknown-property', xdata(prop=name))
+				codes = {i for i, v in enumerate(values) if v & mask}
+			elif field == 'cat':
+				# a major class (eg, 'L') matches all its categories
+				codes = {i for i, v in enumerate(values) if v and (
+						(v in want) or (v[0] in want))}
+			else:
+				codes = {i for i, v in enumerate(values) if v in want}
+			result.append((field, codes))
+		return result
 	
 	
-	def query(self, **k):
+	def ranges(self, **k):
 		"""
-		Pass keyword args to match. Eg., category='Po', etc...
+		Return a list of [first, last] codepoint ranges for the blocks
+		selected by `k`, in the order given ('*' for all blocks). Pass
+		a `ranges` list to query codepoint ranges instead of blocks.
 		"""
+		k = dict(self.__k, **k)
+		if k.get('ranges'):
+			return [list(r) for r in k['ranges']]
 		
-		# select clause - a space-separated string listing titles
-		titles = k.get('select', self.Titles).upper()
-		
-		# where clause - a lambda or other callable
-		fn = k.get('where')
-		
-		tt = [] # title list
-		rr = [] # result lists
-		
-		# titles are taken from the select clause, but all-caps
-		rr.append(titles.split())
+		blocks = udata.blocks()
+		bnames = k.get('blocks') or '*'
+		if bnames == '*':
+			bnames = udata.blocknames()
+		elif isinstance(bnames, str):
+			bnames = [bnames]
 		
-		# fallback in case of error before being set
-		c = t = None
+		limit = k.get('limit') or 0
+		result = []
+		for name in bnames:
+			rng = blocks[name]
+			if limit and (rng[0] >= limit):
+				continue
+			result.append(list(rng))
+		return result
+	
+	
+	#
+	# ROWS
+	#
+	def rows(self, **k):
+		"""
+		Generate a result row (a list of column values) for each char
+		that matches. Pass workers=N to split block queries among N
+		processes; rows are generated in the same order either way.
+		"""
+		k = dict(self.__k, **k)
+		workers = k.get('workers') or 1
+		if (workers > 1) and (k.get('text') is None):
+			for rows in self.__parallel(workers, k):
+				for r in rows:
+					yield r
+		else:
+			cols = self.columns(k.get('select'))
+			for c in self.match(**k):
+				yield [f(c) for f in cols]
+	
+	
+	def __parallel(self, workers, k):
+		# Split the ranges into tasks; generate each task's rows in order.
+		tasks = []
+		for first, last in self.ranges(**k):
+			for i in range(first, last+1, QUERY_CHUNK):
+				tasks.append([[i, min(i+QUERY_CHUNK-1, last)]])
 		
-		titles = titles.lower().split()
+		#
+		# Forked workers inherit the query (including any `where`
+		# lambda); elsewhere, it must be picklable.
+		#
 		try:
-			while True:
-				if (self.cc and (not fn)) or fn(self.c):
-					r = []
-					
-					for t in titles:
-						#
-						# TO DO:
-						#  - There must be a better way to handle this...
-						#    ...happening every time might make it slow :-/
-						#
-						c = self.c.c
-						if t in ['char','c']:
-							if (self.c.cat=='Mc'):
-								x = "' " + str(c) + "'"
-							else:
-								x = repr(c)
-							r.append(x)
-						elif t == 'block':
-							r.append(self.c.block)
-						elif t in ['bidi', 'bidirectional']:
-							r.append(self.c.bidirectional)
-						elif t == 'bracket':
-							r.append(self.c.bracket)
-						elif t in ['cat', 'category']:
-							r.append(self.c.category)
-						elif t in ['decomp', 'decomposition']:
-							r.append(self.c.decomposition)
-						elif t in ['mirrored']:
-							r.append(self.c.mirrored)
-						
-						elif t in ['num', 'numeric']:
-							r.append(self.c.numeric)
-						elif t in ['dec', 'decimal']:
-							r.append(self.c.decimal)
-						elif t in ['dig', 'digit']:
-							r.append(self.c.digit)
-						
-						elif t == 'name':
-							if self.c.name:
-								r.append(self.c.name)
-							else:
-								r.append('')
-						elif t in ['props', 'properties']:
-							r.append(" ".join(self.c.props))
-						
-						elif t in ['br', 'linebreak']:
-							r.append(self.c.br)
-						elif t in ['brname']:
-							r.append(self.c.brname)
-						
-						elif t == 'bidiname':
-							r.append(self.c.bidiname)
-						elif t == 'catname':
-							r.append(self.c.catname)
-						
-						elif t == 'ord':
-							r.append(self.c.ord)
-						
-						else:
-							raise ValueError('err-unknown-property', xdata(
-									prop=t
-								))
-					
-					# add the row to results
-					rr.append(r)
-					
-		except StopIteration:
-			return rr
+			context = trix.module('multiprocessing').get_context('fork')
+		except ValueError:
+			context = None
 		
-		except Exception:
-			raise Exception(xdata(c=self.c.c, t=t))
+		k = {x:k[x] for x in k if x not in ('blocks','ranges','limit','workers')}
+		futures = trix.module('concurrent.futures')
+		with futures.ProcessPoolExecutor(workers, mp_context=context,
+				initializer=_query_init, initargs=(k,)) as pool:
+			for rows in pool.map(_query_rows, tasks):
+				yield rows
 	
 	
+	def query(self, **k):
+		"""
+		Return a list of result rows, the first containing the titles.
+		"""
+		k = dict(self.__k, **k)
+		titles = k.get('select', self.Titles).upper().split()
+		return [titles] + list(self.rows(**k))
+	
 	
 	def format(self, **k):
-		rr = self.query(**k)
-		return trix.ncreate('fmt.Grid').format(rr)
+		"""Return query results formatted as a grid."""
+		return trix.ncreate('fmt.Grid').format(self.query(**k))
 	
 	
 	def table(self, **k):
+		"""Print query results as a grid, then the query time."""
+		k = dict(self.__k, **k)
 		t = time.time()
 		rr = self.query(**k)
 		tt = time.time()-t
@@ -230,3 +359,17 @@ class ScanQuery(Scanner):
 		print ('qtime: %f' % tt)
 
 
+
+
+#
+# WORKER FUNCTIONS
+#  - Run within worker processes started by `ScanQuery.rows()`.
+#
+_query = None
+
+def _query_init(k):
+	global _query
+	_query = ScanQuery(**k)
+
+def _query_rows(ranges):
+	return list(_query.rows(ranges=ranges))
@@ -207,7 +207,7 @@ class HandleHttp(Handler):
 		Write an error response given `errcode` and optional `xdata`.
 		"""
 		try:
-			b = trix.ncreate('util.stream.buffer.Buffer', encoding='utf_8')
+			b = trix.nfactory('util.stream.buffer.Buffer')(encoding='utf_8')
 			w = b.writer()
 			
 			w.write("<html><head>\r\n")
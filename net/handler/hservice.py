@@ -0,0 +1,180 @@
+#
+# Copyright 2018-2020 justworx
+# This file is part of the trix project, distributed under the terms
+# of the GNU Affero General Public License.
+#
+
+from . import * # Handler
+from ...util.event import Event
+from ...util.compenc import b64
+import json
+
+
+#
+# SERVICE CODEC
+#  - Requests and replies are sent as lines of compact JSON. Bytes are
+#    sent as {"$b": "<base64>"}; tuples and sets arrive as lists.
+#
+class ServiceCodec(object):
+	"""Encode/decode remote service messages."""
+	
+	Encoder = json.JSONEncoder(separators=(',',':'),
+			default=lambda o: ServiceCodec.default(o)
+		)
+	Decoder = json.JSONDecoder(
+			object_hook=lambda d: ServiceCodec.hook(d)
+		)
+	
+	@classmethod
+	def encode(cls, message):
+		"""Return dict `message` as one line of bytes."""
+		return cls.Encoder.encode(message).encode('ascii') + b'\n'
+	
+	@classmethod
+	def decode(cls, line):
+		"""Return the dict encoded in bytes `line`."""
+		return cls.Decoder.decode(line.decode('ascii'))
+	
+	@classmethod
+	def default(cls, o):
+		if isinstance(o, (bytes, bytearray)):
+			return {"$b" : b64.encode(bytes(o)).decode('ascii')}
+		if isinstance(o, (set, frozenset)):
+			return list(o)
+		raise TypeError("err-encode-fail", type(o).__name__)
+	
+	@classmethod
+	def hook(cls, d):
+		if (len(d) == 1) and ("$b" in d):
+			return b64.decode(d["$b"].encode('ascii'))
+		return d
+	
+	@classmethod
+	def safe(cls, o):
+		"""
+		Return `o` as a value that can be encoded, replacing anything
+		that can't with its representation. Used for error data.
+		"""
+		return json.loads(json.dumps(o, default=repr))
+
+
+
+
+#
+# HANDLE SERVICE
+#
+class HandleService(Handler):
+	"""
+	Server-side handler for remote service connections.
+	
+	This handler is used by the Server created by `Services.serve()`.
+	It reads request lines, passes each request to the named service
+	through a ServiceConnect, and writes each reply as soon as it's
+	ready. Many requests may be in progress at once; replies are
+	written in the order they complete, each with its request's id.
+	
+	REQUEST: {"id":1, "sid":"enc", "a":["validate","utf8"], "k":{}}
+	REPLY  : {"id":1, "r":"utf_8"}
+	ERROR  : {"id":1, "x":{...error data...}}
+	
+	"""
+	
+	def __init__(self, sock, **k):
+		"""
+		Receives the socket and the Server's "handlerk" dict, which must
+		contain the `Services` object as key "services".
+		"""
+		Handler.__init__(self, sock, **k)
+		self.__services = k['services']
+		self.__connects = {}
+		self.__futures = []
+		self.__fragment = b''
+	
+	
+	#
+	# HANDLE
+	#
+	def handle(self):
+		"""Receive requests; send any replies that are ready."""
+		Handler.handle(self)
+		if self.__futures:
+			self.replies()
+	
+	
+	#
+	# HANDLE DATA
+	#
+	def handledata(self, data):
+		"""Split received data into lines; submit each request."""
+		lines = (self.__fragment + data).split(b'\n')
+		self.__fragment = lines.pop()
+		for line in lines:
+			if line.strip():
+				self.request(line)
+	
+	
+	#
+	# REQUEST
+	#
+	def request(self, line):
+		"""Submit the request encoded in `line` to its service."""
+		m = {}
+		try:
+			m = ServiceCodec.decode(line)
+			sid = m['sid']
+			if sid not in self.__connects:
+				self.__connects[sid] = self.__services.connect(sid)
+			c = self.__connects[sid]
+			e = Event(*m.get('a', []), **m.get('k', {}))
+			self.__futures.append(
+					[m['id'], c.request(e), time.time() + c.CallTimeout]
+				)
+		except Exception as ex:
+			self.reply(dict(id=m.get('id'), x=ServiceCodec.safe(xdata(
+					error="err-request-fail", line=line
+				))))
+	
+	
+	#
+	# REPLIES
+	#
+	def replies(self):
+		"""Send replies for completed requests."""
+		pending = []
+		for item in self.__futures:
+			wid, f, tout = item
+			if f.done():
+				e = f.result()
+				if e.error is not None:
+					self.reply(dict(id=wid, x=ServiceCodec.safe(e.error)))
+				else:
+					self.reply(dict(id=wid, r=e.reply))
+			elif time.time() > tout:
+				self.reply(dict(id=wid, x=dict(
+						error="err-request-fail", reason="service-timeout"
+					)))
+			else:
+				pending.append(item)
+		self.__futures = pending
+	
+	
+	#
+	# REPLY
+	#
+	def reply(self, message):
+		"""Encode and send `message`."""
+		try:
+			data = ServiceCodec.encode(message)
+		except (TypeError, ValueError) as ex:
+			data = ServiceCodec.encode(dict(id=message.get('id'), x=dict(
+					error="err-reply-fail", reason="reply-not-serializable",
+					python=str(ex)
+				)))
+		
+		# the socket has a tiny timeout, so wait to send what won't fit
+		s = self.socket
+		while data:
+			try:
+				data = data[s.send(data):]
+			except socket.timeout:
+				select.select([], [s], [], SOCK_CTIMEOUT)
@@ -4,6 +4,6 @@
 # of the GNU Affero General Public License.
 #
 
+from . import service
 from .process import *
 
-
@@ -0,0 +1,208 @@
+#
+# Copyright 2018-2020 justworx
+# This file is part of the trix project, distributed under the terms 
+# of the GNU Affero General Public License.
+#
+
+from .. import *
+from ...app.service import *
+
+
+#
+# Each executor mode must deliver replies to the right connection.
+#
+for executor in ["serial", "threads:2", "process:2"]:
+	s = Services({"services" : {"enc" : {
+			"ncreate"  : "util.enchelp.EncodingHelper",
+			"executor" : executor
+		}}})
+	
+	try:
+		c1 = s.connect('enc')
+		c2 = s.connect('enc')
+		
+		assert(c1('validate', 'utf8').reply == 'utf_8')
+		assert(c2.validate('latin_1').reply == 'latin_1')
+		
+		# errors are reported in the event, not raised
+		assert(c2('no-such-method').error)
+		
+		# futures; replies matched by correlation id
+		f1 = c1.validate('utf8')
+		f2 = c1.validate('latin_1')
+		assert(f2.result().reply == 'latin_1')
+		assert(f1.result().reply == 'utf_8')
+		assert(f1.done() and (f1.cid != f2.cid))
+		
+		# private names are never read from the reply
+		assert(not hasattr(f1, '__deepcopy__'))
+		
+		# batch
+		ee = c2.batch([['validate', 'utf8'], ['validate', 'latin_1']])
+		assert([e.reply for e in ee] == ['utf_8', 'latin_1'])
+		
+		# async
+		async def acall():
+			return await c1.validate('utf8')
+		
+		assert(trix.module('asyncio').run(acall()).reply == 'utf_8')
+	
+	finally:
+		s.shutdown()
+
+
+
+# a timeout is raised, not hidden as a missing attribute
+qout, qin = Queue(), Queue()
+c = ServiceConnect('x', [qout, qin])
+f = c.request(Event('m'), 0.01)
+try:
+	getattr(f, 'reply', None)
+	raise Exception("WaitTimeout expected")
+except WaitTimeout:
+	assert(qout.get().cid == f.cid)
+
+# replies to requests that are never waited on aren't kept
+for i in range(3):
+	c.request(Event('m'))
+
+for i in range(3):
+	e = qout.get()
+	e.reply = i
+	qin.put(e)
+
+f = c.request(Event('m'))
+e = qout.get()
+e.reply = 'x'
+qin.put(e)
+assert(f.reply == 'x')
+del f
+assert(c.pending == 0)
+
+# an out-queue that holds requests (as RemoteQueue does) is told when
+# one times out
+class ExpiringQueue(Queue):
+	def expire(self, e):
+		self.expired = e.cid
+
+qout = ExpiringQueue()
+c = ServiceConnect('x', [qout, Queue()])
+f = c.request(Event('m'), 0.01)
+assert(not f.done())
+try:
+	f.result()
+except WaitTimeout:
+	assert(qout.expired == f.cid)
+
+
+report("Services: OK")
+
+
+#
+# Cached replies, invalidation, and hit/miss counts.
+#
+s = Services({"services" : {"enc" : {
+		"ncreate" : "util.enchelp.EncodingHelper",
+		"cache"   : {"size" : 2, "methods" : {"validate" : 60}}
+	}}})
+
+try:
+	c = s.connect('enc')
+	assert(c.validate('utf8').reply == 'utf_8')
+	assert(c.validate('utf8').reply == 'utf_8')
+	assert(c.validate('latin_1').reply == 'latin_1')
+	assert(c(CACHE_INVALIDATE, 'validate').reply == 2)
+	assert(c.validate('utf8').reply == 'utf_8')
+	
+	status = c.request(Event()).reply['cache']
+	assert((status['hits'], status['misses'], status['size']) == (1,3,1))
+
+finally:
+	s.shutdown()
+
+
+# each caller gets its own copy of a cached reply
+sc = ServiceCache(methods=['m'])
+e = Event('m')
+assert(not sc.lookup(e))
+e.reply = [1]
+sc.store(e)
+e.reply.append(2)
+for i in range(2):
+	e = Event('m')
+	assert(sc.lookup(e) and (e.reply == [1]))
+	e.reply.append(3)
+
+# a discarded miss is not cached
+e = Event('m', 2)
+assert(not sc.lookup(e))
+sc.discard(e)
+e.reply = [2]
+sc.store(e)
+assert(not sc.lookup(Event('m', 2)))
+
+
+# a ttl of 0 means "don't cache"; a default ttl of None, "forever"
+sc = ServiceCache(methods={'m':0, 'n':None}, ttl=None)
+assert(sc.methods == {'n':None})
+for m in 'mn':
+	e = Event(m)
+	assert(not sc.lookup(e))
+	e.reply = 1
+	sc.store(e)
+
+assert(not sc.lookup(Event('m')))
+assert(sc.lookup(Event('n')))
+
+
+report("Service Cache: OK")
+
+
+#
+# Remote services - a Services object in another process.
+#
+def remote_services(qport, qstop):
+	s = Services({"services" : {"enc" : {
+			"ncreate"  : "util.enchelp.EncodingHelper",
+			"executor" : "threads:2"
+		}}}, sleep=0.01)
+	try:
+		qport.put(s.serve(0).port)
+		qstop.get(timeout=30)
+	finally:
+		s.shutdown()
+
+
+mp = trix.module('multiprocessing').get_context('fork')
+qport, qstop = mp.Queue(), mp.Queue()
+p = mp.Process(target=remote_services, args=(qport, qstop))
+p.start()
+
+try:
+	port = qport.get(timeout=30)
+	c = RemoteServiceConnect(port, 'enc')
+	assert(c.validate('utf8').reply == 'utf_8')
+	assert(c.encode('abc').reply == b'abc')
+	assert(c.decode(b'abc').reply == 'abc')
+	assert(c('no-such-method').error)
+	
+	ee = c.batch([['validate', 'utf8'], ['validate', 'latin_1']]*10)
+	assert([e.reply for e in ee] == ['utf_8', 'latin_1']*10)
+	
+	status = c.request(Event()).reply
+	assert(status['service'] == 'enc')
+	
+	# pools are shared only by connects given the same kwargs
+	pool = RemotePool.pool(port)
+	assert(RemotePool.pool(port, size=8) is not pool)
+	assert(RemotePool.pool(port, size=8).size == 8)
+	assert(RemotePool.pool(port) is pool)
+	assert(sum([x.pending for x in pool.links]) == 0)
+
+finally:
+	qstop.put(1)
+	p.join(30)
+	RemotePool.closeall()
+
+
+report("Remote Services: OK")
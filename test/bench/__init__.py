@@ -0,0 +1,24 @@
+#
+# Copyright 2019-2020 justworx
+# This file is part of the trix project, distributed under the terms 
+# of the GNU Affero General Public License.
+#
+
+#
+# BENCHMARKS
+#  - Micro-benchmarks are not part of the test suite. Run each one
+#    as a module; eg, `python3 -m trix.test.bench.create`
+#
+
+from .. import *
+import timeit
+
+
+def bench(label, fn, number=100000, repeat=5):
+	"""
+	Time `number` calls to `fn`, `repeat` times; print and return the
+	best time, in ns per call.
+	"""
+	ns = min(timeit.repeat(fn, number=number, repeat=repeat)) / number * 1e9
+	print ("  * %-24s %8.0f ns" % (label, ns))
+	return ns
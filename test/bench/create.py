@@ -0,0 +1,37 @@
+#
+# Copyright 2019-2020 justworx
+# This file is part of the trix project, distributed under the terms 
+# of the GNU Affero General Public License.
+#
+
+#
+# BENCH CREATE
+#  - Compare the per-call overhead of object creation by path. The
+#    "uncached" case repeats the resolution that create/ncreate did
+#    on every call before resolved paths were cached.
+#
+
+from . import *
+
+PATH = "util.event.Event"
+ARGS = ("cmd",)
+
+
+def uncached(innerPath, *a, **k):
+	p = trix.innerpath(innerPath).split(".")
+	T = trix.module(".".join(p[:-1])).__dict__[p[-1]]
+	return T(*a, **k)
+
+
+banner("create/ncreate overhead")
+
+T = trix.nfactory(PATH)
+base = bench("direct constructor", lambda: T(*ARGS))
+old = bench("uncached resolution", lambda: uncached(PATH, *ARGS))
+new = bench("trix.ncreate", lambda: trix.ncreate(PATH, *ARGS))
+bench("trix.nfactory(path)()", lambda: trix.nfactory(PATH)(*ARGS))
+bench("trix.proxify", lambda: trix.proxify(T))
+
+report("path overhead: %.0f ns -> %.0f ns per call" % (
+		old-base, new-base
+	))
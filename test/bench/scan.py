@@ -0,0 +1,120 @@
+#
+# Copyright 2019-2020 justworx
+# This file is part of the trix project, distributed under the terms 
+# of the GNU Affero General Public License.
+#
+
+#
+# BENCH SCAN
+#  - Compare Scanner (one charinfo step per character) with FastScanner
+#    (str indices and slices) splitting config/log-like text.
+#
+
+from . import *
+from ...data.scan import *
+
+
+LINE = 'INFO 2020-03-01 12:00:01 host=alpha msg="a b c" [1, 2, (3, 4)] ok\n'
+TEXT = LINE * 200   # ~13K characters
+
+
+banner("Scanner vs FastScanner: split %i chars" % len(TEXT))
+
+assert(Scanner(TEXT).split() == FastScanner(TEXT).split())
+
+old = bench("Scanner.split", lambda: Scanner(TEXT).split(), 1, 3)
+new = bench("FastScanner.split", lambda: FastScanner(TEXT).split(), 5, 3)
+
+report("split: %.1f ms -> %.2f ms (%.0fx)" % (old/1e6, new/1e6, old/new))
+
+
+#
+# Streamed input (from a file-like object, one chunk at a time) should
+# cost little more than scanning a str.
+#
+import io
+DATA = (TEXT * 20).encode('utf_8')
+banner("FastScanner: split str vs stream of %i bytes" % len(DATA))
+
+fstr = lambda: FastScanner(DATA.decode('utf_8')).split()
+fstream = lambda: FastScanner(io.BytesIO(DATA), encoding='utf_8').split()
+assert(fstr() == fstream())
+
+old = bench("FastScanner.split (str)", fstr, 1, 3)
+new = bench("FastScanner.split (stream)", fstream, 1, 3)
+
+report("stream: %.1f ms -> %.1f ms" % (old/1e6, new/1e6))
+
+
+#
+# psplit divides the text among worker processes; with a single CPU
+# it can only add overhead.
+#
+BIG = TEXT * 100
+workers = max(trix.module('os').cpu_count() or 1, 2)
+banner("FastScanner: split vs psplit(workers=%i), %i chars" % (
+		workers, len(BIG)))
+
+assert(FastScanner(BIG).split() == FastScanner(BIG).psplit(workers))
+
+old = bench("FastScanner.split", lambda: FastScanner(BIG).split(), 1, 3)
+new = bench("FastScanner.psplit", 
+		lambda: FastScanner(BIG).psplit(workers), 1, 3)
+
+report("psplit: %.1f ms -> %.1f ms" % (old/1e6, new/1e6))
+
+
+#
+# A predicate expression (compiled to a regex character class) lets
+# collect/ignore consume whole runs, rather than calling a lambda for
+# each character.
+#
+WORDS = "Alpha-Beta-Gamma-Delta 2 Epsilon-Zeta-Eta-Theta\n" * 2000
+udata.charclass("alpha | '-'")
+banner("FastScanner: collect words by lambda vs expression")
+
+def words(fn, ws):
+	s = FastScanner(WORDS)
+	r = []
+	try:
+		while True:
+			r.append(s.collect(fn))
+			s.ignore(ws)
+	except StopIteration:
+		pass
+	return r
+
+fl = lambda: words(lambda ci: ci.alpha or ci.c=='-', lambda ci: not (
+		ci.alpha or ci.c=='-'))
+fx = lambda: words("alpha | '-'", "!(alpha | '-')")
+assert(fl() == fx())
+
+old = bench("collect (lambda)", fl, 1, 3)
+new = bench("collect (expression)", fx, 1, 3)
+
+report("collect: %.1f ms -> %.2f ms (%.0fx)" % (old/1e6, new/1e6, old/new))
+
+
+#
+# Bracket pairs are found in one pass over just the bracket, quote,
+# and escape chars, rather than by looking up each char's bracket
+# property.
+#
+BRACKETS = '{"a": [1, (2, 3)], "b": "x(y"} [[1, 2], [3, [4, 5]]] word\n' * 2000
+banner("Bracket pairs: per-char lookup vs BracketMatch")
+
+def lookup(text):
+	stack, r = [], []
+	for i, c in enumerate(text):
+		b = udata.bracket(c)
+		if b:
+			if b[0] == 'o':
+				stack.append(i)
+			elif stack:
+				r.append((stack.pop(), i+1))
+	return sorted(r)
+
+old = bench("udata.bracket (each char)", lambda: lookup(BRACKETS), 1, 3)
+new = bench("BracketMatch.spans", lambda: BracketMatch().spans(BRACKETS), 1, 3)
+
+report("brackets: %.1f ms -> %.2f ms (%.0fx)" % (old/1e6, new/1e6, old/new))
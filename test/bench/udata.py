@@ -0,0 +1,43 @@
+#
+# Copyright 2019-2020 justworx
+# This file is part of the trix project, distributed under the terms 
+# of the GNU Affero General Public License.
+#
+
+#
+# BENCH UDATA
+#  - Compare the block-indexed range searches (propfast, breakfast)
+#    with the two-stage proptable arrays.
+#
+
+from . import *
+from ...data.udata import *
+
+
+pt = udata.proptable()
+pf = udata.propfast()
+bf = udata.breakfast()
+
+
+banner("udata lookups: range search vs proptable")
+
+bench("propfast.get", lambda: pf.get('x'), 10000, 3)
+bench("proptable.props", lambda: pt.props('x'), 100000, 3)
+bench("breakfast.get", lambda: bf.get('x'), 10000, 3)
+bench("proptable.linebreak", lambda: pt.linebreak('x'), 100000, 3)
+bench("proptable.hasprop", lambda: pt.hasprop(' ', 'White_Space'), 100000, 3)
+
+
+TEXT = 'The "quick" brown fox (jumps) \u2014 \u00fcber \u65e5\u672c.\n' * 500
+banner("linebreak classes: %i chars" % len(TEXT))
+bench("proptable.linebreak x N", lambda: [pt.linebreak(c) for c in TEXT], 3, 3)
+bench("linebreak_classes", lambda: udata.linebreak_classes(TEXT), 100, 3)
+
+lb = udata.linebreaker()
+bench("linebreaker.feed", lambda: lb.feed(TEXT), 100, 3)
+bench("linebreaker.wrap", lambda: list(lb.wrap(TEXT, 40)), 100, 3)
+
+banner("udata.query: all blocks")
+sq = trix.ncreate('data.udata.query.ScanQuery', blocks='*')
+bench("query (all rows)", lambda: sq.query(), 1, 1)
+bench("query cat='Nd'", lambda: sq.query(cat='Nd'), 10, 3)
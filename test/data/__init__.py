@@ -6,5 +6,10 @@
 
 from . import cursor
 from . import database
+from . import scan
+from . import proptable
+from . import linebreaker
+from . import query
+from . import charclass
 
 
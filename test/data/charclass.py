@@ -0,0 +1,60 @@
+#
+# Copyright 2018-2020 justworx
+# This file is part of the trix project, distributed under the terms 
+# of the GNU Affero General Public License.
+#
+
+from .. import *
+from ...data.udata.charclass import *
+from ...data.scan import *
+
+
+#
+# Named sets must agree with the charinfo properties they stand for.
+#
+ci = charinfo('')
+CHARS = list(range(0, 0x800)) + [0x1680, 0x2028, 0x3000, 0xFF02, 0x1D7CE]
+for name in CHARCLASS_NAMES:
+	cc = charclass(name)
+	for i in CHARS:
+		ci.c = chr(i)
+		assert(bool(getattr(ci, name)) == (ci.c in cc))
+
+assert(charclass("a-c | 'x'").ranges == [(0x61, 0x63), (0x78, 0x78)])
+assert(charclass("U+0041-U+005A").ranges == [(0x41, 0x5A)])
+assert(charclass("!'a'").ranges == [(0, 0x60), (0x62, 0x10FFFF)])
+assert(charclass("N & block=Basic_Latin").ranges == [(0x30, 0x39)])
+assert(charclass("L & !alpha")('ª'))
+assert(charclass("br=QU")('"'))
+assert(charclass("White_Space").skip(" \t\nx") == 3)
+
+for expr in ("(L", "L |", "nosuchthing", "nosuch=field", "&"):
+	try:
+		charclass(expr)
+		assert(False)
+	except ValueError:
+		pass
+
+
+#
+# Scanners take expressions in place of callables.
+#
+TEXT = "Line-1 \\-x  tail\\"
+for expr in ("alpha | '-'", "!white", "L N '\\\\'"):
+	cc = udata.charclass(expr)
+	s1, s2 = FastScanner(TEXT), FastScanner(TEXT)
+	while not s1.eof:
+		assert(s1.collect(expr) == s2.collect(lambda ci: cc(ci)))
+		if not s1.eof:
+			s1.ignore("!(%s)" % expr)
+			s2.ignore(lambda ci: not cc(ci))
+		assert(s1.pos == s2.pos)
+	assert(s2.eof)
+
+s = Scanner("Abc 123")
+assert(s.collect("L") == 'Abc')
+s.ignore("space")
+assert(s.collect("Nd") == '123')
+
+
+report("charclass: OK")
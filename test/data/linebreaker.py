@@ -0,0 +1,67 @@
+#
+# Copyright 2018-2020 justworx
+# This file is part of the trix project, distributed under the terms 
+# of the GNU Affero General Public License.
+#
+
+from .. import *
+from ...data.udata import *
+from ...data.udata.linebreaker import *
+
+
+def segs(text):
+	return [t for t, m in udata.linebreaker().segments(text)]
+
+
+#
+# Break opportunities.
+#
+assert(segs('foo-bar baz') == ['foo-', 'bar ', 'baz'])
+assert(segs('a (b) c') == ['a ', '(b) ', 'c'])
+assert(segs('$1,000.50 USD') == ['$1,000.50 ', 'USD'])
+assert(segs('日本語。') == ['日', '本', '語。'])
+assert(segs('a b') == ['a b'])                  # LB12
+assert(segs('a​b') == ['a​', 'b'])              # LB8
+assert(segs('(  x') == ['(  x'])                # LB14
+assert(segs('é x́y') == ['é ', 'x́y']) # LB9
+assert(segs('א-x') == ['א-x'])                  # LB21a
+assert(segs('🇺🇸🇺🇸') == ['🇺🇸', '🇺🇸'])          # LB30a
+assert(segs('a🇺🇸🇫🇷🇺🇸') == ['a', '🇺🇸', '🇫🇷', '🇺🇸'])
+
+# mandatory breaks, with CR LF split across chunks
+lb = linebreaker()
+r = lb.feed('x\r') + lb.feed('\ny\n\nz') + lb.close()
+assert(r == [('x\r\n', True), ('y\n', True), ('\n', True), ('z', True)])
+
+# chunk boundaries never change the result
+text = 'He said, "(a) b—c!"   été  日本.\n' * 20
+whole = udata.linebreaker().segments(text)
+lb = udata.linebreaker()
+parts = []
+for i in range(0, len(text), 7):
+	parts += lb.feed(text[i:i+7])
+parts += lb.close()
+assert(parts == list(whole))
+assert(''.join([t for t, m in parts]) == text)
+
+# regional indicator runs split across chunks keep their pairs
+flags = 'x🇺🇸🇫🇷🇺🇸🇫🇷🇺🇸 y' * 3
+whole = list(udata.linebreaker().segments(flags))
+for n in (1, 2, 3, 5):
+	lb = udata.linebreaker()
+	parts = []
+	for i in range(0, len(flags), n):
+		parts += lb.feed(flags[i:i+n])
+	assert(parts + lb.close() == whole)
+
+
+#
+# Greedy wrap.
+#
+lines = list(udata.linebreaker().wrap(text, 20))
+assert(max([len(x) for x in lines]) <= 20)
+assert(list(linebreaker().wrap('abcdefgh ij', 4)) == ['abcd', 'efgh', 'ij'])
+assert(list(linebreaker().wrap('a\n\nb', 10)) == ['a', '', 'b'])
+
+
+report("linebreaker: OK")
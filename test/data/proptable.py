@@ -0,0 +1,77 @@
+#
+# Copyright 2018-2020 justworx
+# This file is part of the trix project, distributed under the terms 
+# of the GNU Affero General Public License.
+#
+
+from .. import *
+from ...data.udata import *
+from ...data.udata.proptable import *
+from ...data.udata.linebreak import *
+import unicodedata
+
+
+pt = udata.proptable()
+
+#
+# Table lookups must agree with the lookups they replace.
+#
+for i in list(range(0, 0x800)) + [0x2028, 0x3000, 0xFFFD, 0x1F600, 0x20000]:
+	c = chr(i)
+	assert(pt.cat(c) == unicodedata.category(c))
+	assert(pt.bidi(c) == unicodedata.bidirectional(c))
+	assert(pt.linebreak(c) == (find_linebreak_property(i) or None))
+
+assert(pt.props(' ') == ['Pattern_White_Space', 'White_Space'])
+assert(pt.hasprop('"', 'Quotation_Mark'))
+assert(not pt.hasprop('a', 'Quotation_Mark'))
+assert(udata.linebreak('a') == 'AL')
+assert(udata.properties('x') == [])
+
+
+assert(pt.block('a') == 'Basic Latin')
+assert(pt.block(chr(0x2FE0)) is None)
+assert(pt.bracket('[') == ('o', ']'))
+assert(pt.bracket('a') is None)
+assert(udata.blocks()['Basic Latin'] == [0, 127])
+
+
+#
+# Linebreak intervals and bulk lookup.
+#
+starts, codes = linebreak_intervals()
+assert(starts[0] == 0)
+assert(list(starts) == sorted(starts))
+assert(find_linebreak_property(0x1F600) == pt.linebreak(chr(0x1F600)))
+assert(find_linebreak_property(0x10FFFF) == '')
+
+text = 'a "b" \u3000\U0001F600 (c)\n'
+lbc = udata.linebreak_classes(text)
+assert(len(lbc) == len(text))
+assert([LB_NAMES[x] for x in lbc] == [
+		find_linebreak_property(ord(c)) for c in text
+	])
+assert(linebreak_classes('') == b'')
+
+
+#
+# Table file round trip; mapped and copied loads must match.
+#
+path = testpath("proptable.bin")
+head = dict(values={f:pt.values(f) for f in proptable.Fields}, meta=pt.meta)
+tables = {f:pt.table(f) for f in proptable.Fields}
+assert(proptable.save(path, head, tables))
+h2, t2, mm = proptable.load(path)
+h3, t3, none = proptable.load(path, usemap=False)
+assert(h2['values'] == head['values'])
+assert(h2['meta'] == pt.meta)
+assert(none is None)
+for f in proptable.Fields:
+	assert([list(a) for a in t2[f]] == [list(a) for a in t3[f]])
+	assert([list(a) for a in t2[f]] == [list(a) for a in tables[f]])
+
+t2 = None
+mm.close()
+
+
+report("proptable: OK")
@@ -0,0 +1,37 @@
+#
+# Copyright 2018-2020 justworx
+# This file is part of the trix project, distributed under the terms 
+# of the GNU Affero General Public License.
+#
+
+from .. import *
+from ...data.udata.query import *
+
+
+#
+# Bulk field matches must agree with a `where` callable.
+#
+sq = ScanQuery(blocks=['Basic Latin', 'Gothic'], select="ord char cat")
+rows = sq.query(cat='Nd')
+assert(rows[0] == ['ORD', 'CHAR', 'CAT'])
+assert(rows[1] == ['0x30', "'0'", 'Nd'])
+assert(rows[1:] == sq.query(where=lambda ci: ci.cat == 'Nd')[1:])
+assert(len(sq.query(cat='N')) == 13)
+
+sq = ScanQuery(ranges=[[0, 0x3FFF]], select="ord")
+ws = sq.query(props='White_Space')
+assert(['0x3000'] in ws)
+assert(ws == sq.query(where=lambda ci: 'White_Space' in ci.props))
+
+# text queries; catname comes from charinfo
+rows = ScanQuery(text='a1', select="char br catname").query()
+assert(rows[1:] == [["'a'", 'AL', 'Lowercase_Letter'], ["'1'", 'NU', 'Decimal_Number']])
+
+try:
+	sq.query(select="char nosuchproperty")
+	raise Exception("unknown property should fail")
+except ValueError:
+	pass
+
+
+report("query: OK")
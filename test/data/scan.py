@@ -0,0 +1,112 @@
+#
+# Copyright 2018-2020 justworx
+# This file is part of the trix project, distributed under the terms 
+# of the GNU Affero General Public License.
+#
+
+from .. import *
+from ...data.scan import *
+
+
+#
+# FastScanner must produce what Scanner produces.
+#
+TEXT = [
+	'[1,2,3] frog {"x":"stream"}', "a 'b c' (d [e] f) \\ g", "a　b\tc",
+	'aa_DJ.iso88591.json', '%m/%d/%y %H', '"unclosed quote',
+	'{"a": "}"} z', "(don't [x) y] z", "(a \\) b) c (d"
+]
+
+for text in TEXT:
+	assert(FastScanner(text).split() == Scanner(text).split())
+	assert(FastScanner(text).split_escape() == Scanner(text).split_escape())
+	
+	s1, s2 = Scanner(text), FastScanner(text)
+	assert(s1.splits("_..", True) == s2.splits("_..", True))
+
+s = FastScanner("Abc 123")
+assert(s.collect(lambda ci: ci.alpha) == 'Abc')
+s.ignore(lambda ci: ci.white)
+assert(s.char == '1')
+assert(s.scandigits() == '123')
+assert(s.eof)
+
+assert(trix.scan("x y").split() == ['x', 'y'])
+
+
+#
+# Streamed input must scan the same as a str, even when chunks split
+# items, escapes, and multi-byte characters.
+#
+import io
+text = "\n".join(TEXT + ['é€𐍁 [x "]" (y)]', "a\\ b 'c\\' d'"]) * 20
+for size in (1, 3, 64):
+	k = dict(chunksize=size, bufsz=2, encoding='utf_8')
+	s = FastScanner(io.BytesIO(text.encode('utf_8')), **k)
+	assert(s.split() == FastScanner(text).split())
+	assert(s.eof)
+	s = FastScanner(io.StringIO(text), **k)
+	assert(s.split_escape() == FastScanner(text).split_escape())
+	s = FastScanner(iter(text), **k)
+	assert(s.splits("_..", True) == FastScanner(text).splits("_..", True))
+	
+	# RScan reads a seekable file backward, in blocks
+	r = RScan(io.BytesIO(text.encode('utf_8')), **k)
+	assert(r.split() == RScan(text).split())
+
+assert(RScan(io.BytesIO(b"a b\nc d\n"), encoding='utf_8').rsplits("\n\n") == [
+		'c d', ''
+	])
+
+
+
+#
+# psplit must produce what split produces, even where partitions are
+# cut within items, quotes, or escapes.
+#
+text = "\n".join(TEXT + ['"a \\" b" [1, "]"] (2 (3)) x'])
+for cuts in ([5], [1, 9, 30], [27, 28, 60, 61], list(range(1, len(text), 7))):
+	bounds = list(zip([0] + cuts, cuts + [len(text)]))
+	results = [pscan(text, a, b) for a, b in bounds]
+	assert(pmerge(text, bounds, results) == FastScanner(text).split())
+
+text = " ".join(TEXT) + "\n"
+text = text * (PSPLIT_MIN // len(text) + 1)
+assert(FastScanner(text).psplit(workers=2) == FastScanner(text).split())
+
+
+
+#
+# Brackets within quotes don't count; a close bracket closes the
+# nearest open bracket it matches. Spans are the same whether text
+# is matched all at once or in pieces.
+#
+assert(FastScanner('{"a": "}"} z').split() == ['{"a": "}"}', 'z'])
+assert(FastScanner("(don't [x) y] z").split() == ["(don't [x)", 'y]', 'z'])
+assert(RScan("x (a b) y").split() == ['y', ')b a(', 'x'])
+
+# in reversed text, the escape follows the char it escapes; RScan
+# gives the forward items, reversed, even when read in blocks
+for text in ['x (a \\) b) y', 'p "q\\"r" s', 'z (\\\\\\( q) [w \\] e]']:
+	r = RScan(text).split()
+	assert([x[::-1] for x in reversed(r)] == FastScanner(text).split())
+	for size in (1, 2, 5):
+		f = io.BytesIO(text.encode('utf_8'))
+		assert(RScan(f, chunksize=size, encoding='utf_8').split() == r)
+
+assert(RScan('x (a \\) b) y').split() == ['y', ')b )\\ a(', 'x'])
+assert(RScan('p "q\\"r" s').split() == ['s', '"r"q"', 'p'])
+
+text = 'f(a, [b], "c)") [\\]] {\'}\'} ({[(] x'
+bm = BracketMatch()
+spans = bm.spans(text)
+assert(spans == [(1, 15), (5, 8), (16, 20), (21, 26), (29, 32)])
+for size in (1, 2, 5):
+	bm.reset()
+	r = []
+	for i in range(0, len(text), size):
+		r.extend(bm.feed(text, i, i+size))
+	assert(sorted(r) == spans)
+
+
+report("FastScanner: OK")
@@ -26,6 +26,14 @@ match = "<trix.util.enchelp.EncodingHelper"
 assert(repr(test)[:33] == match)
 
 
+# Test nfactory() [ + factory() ]
+EH = trix.nfactory('util.enchelp.EncodingHelper')
+assert(EH is trix.nvalue('util.enchelp', 'EncodingHelper'))
+assert(EH is trix.factory(trix.innerpath('util.enchelp.EncodingHelper')))
+EH8 = trix.nfactory('util.enchelp.EncodingHelper', encoding='utf_8')
+assert(EH8().encoding == 'utf_8')
+
+
 # Test proxify()
 class TestP(object):
 	def __init__(self, v):
@@ -41,3 +49,69 @@ assert(trix.kpop(dict(a=1,b=9,c=4), ['a', 'c']) == dict(a=1,c=4))
 assert(trix.kcopy(dict(a=1,b=9,c=4), 'b') == dict(b=9))
 assert(trix.kcopy(dict(a=1,b=9,c=4), ['b']) == dict(b=9))
 
+
+
+# Test xdata - traceback is built when first read; lean mode skips it
+try:
+	raise ValueError("test")
+except ValueError:
+	xd = trix.xdata(a=1)
+
+assert(xd['xdata'] == dict(a=1))
+assert(xd['xargs'] == ("test",))
+assert(xd['xtracebk'][-1].lineno > 0)
+
+XD = type(xd)
+XD.Lean = True
+try:
+	try:
+		raise ValueError("test")
+	except ValueError:
+		xd = trix.xdata(a=1)
+finally:
+	XD.Lean = False
+
+assert(xd['xargs'] == ("test",))
+assert('xtracebk' not in xd)
+
+
+# Test config() - parsed files are cached until they change
+import os
+cpath = testpath('config-cache.conf')
+os.makedirs(os.path.dirname(cpath), exist_ok=True)
+with open(cpath, 'w') as f:
+	f.write('{"a": [1, 2]}')
+
+trix.config.invalidate()
+conf = trix.config(cpath)
+conf['a'].append(3)
+assert(trix.config(cpath) == {'a': [1, 2]})
+
+with open(cpath, 'w') as f:
+	f.write('{"a": [1, 2], "b": 9}')
+
+assert(trix.config(cpath)['b'] == 9)
+assert(trix.config.invalidate(cpath) == 1)
+
+# relative paths follow the cwd; a retargeted symlink is seen
+cdir = os.path.dirname(cpath)
+for name, text in (('one', '{"n": 1}'), ('two', '{"n": 2}')):
+	os.makedirs(os.path.join(cdir, name), exist_ok=True)
+	with open(os.path.join(cdir, name, 'c.conf'), 'w') as f:
+		f.write(text)
+
+cwd = os.getcwd()
+try:
+	os.chdir(os.path.join(cdir, 'one'))
+	assert(trix.config('c.conf')['n'] == 1)
+	os.chdir(os.path.join(cdir, 'two'))
+	assert(trix.config('c.conf')['n'] == 2)
+finally:
+	os.chdir(cwd)
+
+link = os.path.join(cdir, 'link.conf')
+for name in ('one', 'two'):
+	if os.path.lexists(link):
+		os.remove(link)
+	os.symlink(os.path.join(cdir, name, 'c.conf'), link)
+	assert(trix.config(link)['n'] == (1 if name == 'one' else 2))
@@ -17,6 +17,7 @@ from .. import *
 #
 #from . import bag     # removed. buggy.
 from . import bom
+from .callx import * # (`from . import callx` would find trix.callx)
 from . import compenc
 from . import convert
 from . import dq
@@ -36,8 +37,12 @@ from ...util import form, jenc, linedbg
 # back to actual tests...
 #
 from . import lineq
+from .loc import * # (`from . import loc` would find trix.loc)
+from . import loglet
 from . import matheval
 from . import mime
+from . import output
+from . import parse
 from . import runner
 from . import urlinfo
 
@@ -70,11 +75,6 @@ assert (ii.next()==1)
 # sure there are no compile errors.
 #
 
-#
-# UTIL.LOGLET
-#
-from ...util import loglet
-
 #
 # UTIL.FORM
 # - I can't think of a way to automatically test Form.
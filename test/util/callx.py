@@ -0,0 +1,50 @@
+#
+# Copyright 2020 justworx
+# This file is part of the trix project, distributed under the terms 
+# of the GNU Affero General Public License.
+#
+
+from .. import *
+from ...util.callx import *
+
+
+def pycmd(code):
+	return [sys.executable, '-c', code]
+
+
+#
+# STREAM - stdout and stderr together; large stderr can't stall
+#
+cx = callx(pycmd(
+		"import sys; print('a'); sys.stderr.write('e'*200000); print('b')"
+	))
+assert(list(cx.stream()) == ['a', 'b'])
+assert(len(cx.stderr) == 200000)
+assert(cx.returncode == 0)
+
+cx = callx(pycmd("import sys; print('a'); sys.stderr.write('e')"))
+d = {}
+for name, text in cx.stream(stderr=True, lines=False):
+	d[name] = d.get(name, '') + text
+assert(d == {'stdout':'a\n', 'stderr':'e'})
+
+
+#
+# TIMEOUT
+#
+try:
+	callx(pycmd("import time; time.sleep(5)"), timeout=0.2).text()
+	raise Exception("timeout-expected")
+except TimeoutError:
+	pass
+
+
+#
+# BATCH
+#
+cc = callx.batch([pycmd("print(%i)" % i) for i in range(4)], concurrency=2)
+assert([c.text().strip() for c in cc] == ['0', '1', '2', '3'])
+assert([c.error for c in cc] == [None]*4)
+
+
+report("Callx: OK")
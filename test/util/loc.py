@@ -0,0 +1,42 @@
+#
+# Copyright 2020 justworx
+# This file is part of the trix project, distributed under the terms 
+# of the GNU Affero General Public License.
+#
+
+from .. import *
+from ...util.loc import *
+
+
+#
+# QUERY CACHE
+#  - Use a test cache directory and locales that every system has.
+#
+CachePath = Locale.CachePath
+Locale.CachePath = testpath("locale")
+try:
+	Locale.clearcache(disk=True)
+	
+	dd = Locale.query_locale_dicts(["C", "POSIX"])
+	assert(sorted(dd.keys()) == ["C", "POSIX"])
+	assert(dd["C"]["locale"] == "C")
+	
+	# in memory
+	assert(Locale.query_locale_dict("POSIX") == dd["POSIX"])
+	
+	# each caller gets its own copy
+	Locale.query_locale_dict("C")['day'].append('BOGUS')
+	dd["POSIX"]['day'].append('BOGUS')
+	assert('BOGUS' not in Locale.query_locale_dict("C")['day'])
+	assert('BOGUS' not in Locale.query_locale_dicts(["POSIX"])["POSIX"]['day'])
+	
+	# on disk
+	Locale.clearcache()
+	assert(Locale.query_locale_dict("C") == dd["C"])
+	
+	Locale.clearcache(disk=True)
+finally:
+	Locale.CachePath = CachePath
+
+
+report("Locale: OK")
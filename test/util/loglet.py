@@ -0,0 +1,124 @@
+#
+# Copyright 2018-2020 justworx
+# This file is part of the trix project, distributed under the terms 
+# of the GNU Affero General Public License.
+#
+
+from .. import *
+from ...util.loglet import *
+import os, json
+
+test.path()
+path = testpath('loglet')
+for fname in os.listdir(os.path.dirname(path)):
+	if fname.startswith('loglet.test'):
+		os.remove(os.path.join(os.path.dirname(path), fname))
+
+
+#
+# ENTRIES ARE QUEUED, THEN WRITTEN AS COMPACT JSON LINES
+#
+lg = Loglet(path, tag='test', interval=60)
+for i in range(10):
+	lg('entry', i, x=i)
+
+assert(lg.pending == 10)
+lg.flush()
+assert(lg.pending == 0)
+
+with open(lg.path) as f:
+	lines = [json.loads(l) for l in f if l.startswith('{')]
+
+assert(len(lines) == 10)
+assert(lines[3]['a'] == ['entry', 3])
+assert(lines[3]['k'] == {'x':3})
+assert(lines[3]['pid'] == trix.pid())
+
+# entries are formatted when logged, not when written
+d = {'step':1}
+lg(d)
+d['step'] = 2
+lg.flush()
+with open(lg.path) as f:
+	lines = [json.loads(l) for l in f if l.startswith('{')]
+
+assert(lines[-1]['a'] == [{'step':1}])
+
+
+#
+# THE BACKGROUND WRITER
+#
+lg2 = Loglet(path, tag='test2', interval=0.05)
+lg2('background')
+time.sleep(0.3)
+assert(lg2.pending == 0)
+assert(lg2.status()['written'] == 1)
+lg2.close()
+
+
+#
+# OVERFLOW - entries past `qsize` are dropped and counted
+#
+lg3 = Loglet(path, tag='test3', interval=60, qsize=5)
+for i in range(8):
+	lg3(i)
+
+assert(lg3.pending == 5)
+assert(lg3.dropped == 3)
+lg3.close()
+
+
+# entries that can't be written are counted, not lost without a trace
+class BadFile(object):
+	def write(self, text):
+		raise IOError("disk full")
+	def close(self):
+		pass
+
+lg3 = Loglet(path, tag='test3b', interval=60)
+logf, lg3.logf = lg3.logf, BadFile()
+lg3('lost', 1)
+lg3('lost', 2)
+try:
+	lg3.flush()
+	raise Exception("flush should fail")
+except IOError:
+	pass
+
+assert(lg3.dropped == 2)
+assert('disk full' in lg3.status()['error'])
+logf.close()
+lg3.close()
+
+
+#
+# ROTATION
+#
+lg.close()
+lg4 = Loglet(path, tag='test4', interval=60, maxbytes=200, backups=2)
+for i in range(40):
+	lg4('rotate', i)
+
+lg4.flush()
+assert(lg4.status()['rotations'] > 0)
+assert(os.path.exists(lg4.path + '.1'))
+assert(os.path.exists(lg4.path + '.2'))
+assert(not os.path.exists(lg4.path + '.3'))
+lg4.close()
+
+
+
+#
+# ONE EXIT HOOK CLOSES OPEN LOGLETS; IT DOESN'T KEEP THEM ALIVE
+#
+import gc
+lg5 = Loglet(path, tag='test5', interval=60)
+assert(lg5 in LOGLETS)
+lg5('closed at exit')
+close_all()
+assert(lg5.pending == 0)
+del lg5
+gc.collect()
+assert(len([x for x in LOGLETS if x.path.endswith('test5')]) == 0)
+
+report("Loglet: OK")
@@ -5,3 +5,21 @@ from ...util.matheval import *
 assert(matheval("1+2") == 3)
 
 
+assert(matheval("a*2+sqrt(b)", {'a':1, 'b':16}) == 6)
+
+f = compile_expr("x*y")
+assert(f is compile_expr("x*y"))
+assert(f({'x':2, 'y':3}) == 6)
+assert(evaluate_many("x*y", {'x':[1,2], 'y':[3,4]}) == [3, 8])
+assert(evaluate_many("x+1", [{'x':1}, {'x':2}]) == [2, 3])
+
+# the same types, with or without numpy
+big = 10**17 + 1
+assert(evaluate_many("x*y", {'x':[big], 'y':[1]}) == [big])
+assert(evaluate_many("x*2", {'x':[1.5, 2.5]}) == [3.0, 5.0])
+r = evaluate_many("x*y", {'x':[1,2,3], 'y':[4,5,6]})
+assert((r == [4, 10, 18]) and (type(r[0]) is int))
+
+# fn functions the expression doesn't call are no matter
+assert(evaluate_many("sqrt(x)", {'x':[4.0]}, {'floor':math.floor}) == [2.0])
+assert(evaluate_many("sqrt(x)", {'x':[4.0]}, {'sqrt':lambda v: -v}) == [-4.0])
@@ -0,0 +1,79 @@
+#
+# Copyright 2018-2020 justworx
+# This file is part of the trix project, distributed under the terms 
+# of the GNU Affero General Public License.
+#
+
+from .. import *
+from ...util.output import *
+import io
+
+
+#
+# BUFFER WHILE PAUSED; WRITE ON RESUME
+#
+s = io.StringIO()
+o = Output(output=s, maxbuf=10)
+o.output("a")
+assert(s.getvalue() == "a\r\n")
+
+Output.pause()
+try:
+	o.output("12345678")
+	o.output("xyz")
+	assert(s.getvalue() == "a\r\n")
+	assert(o.buffer.read() == "xyz\r\n")   # oldest text was discarded
+	assert(o.buffer.dropped == 10)
+finally:
+	Output.resume()
+
+o.output("z")
+assert(s.getvalue() == "a\r\nxyz\r\nz\r\n")
+assert(o.drain() == None)
+
+
+#
+# OVERFLOW POLICY "newest"
+#
+o = Output(output=io.StringIO(), maxbuf=10, overflow="newest")
+Output.pause()
+try:
+	o.output("12345678")
+	o.output("xyz")
+	assert(o.buffer.read() == "12345678\r\n")
+	assert(o.drain() == "12345678\r\n")
+finally:
+	Output.resume()
+
+
+#
+# BACKGROUND FLUSHER
+#
+s = io.StringIO()
+o = Output(output=s, flushint=0.02)
+o.output("q")
+time.sleep(0.1)
+assert(s.getvalue() == "q\r\n")
+o.flusher(None)
+
+# unpaused text that won't fit the buffer is written, not discarded
+s = io.StringIO()
+o = Output(output=s, flushint=60, maxbuf=10)
+for i in range(5):
+	o.output("line%i" % i)
+
+assert(o.buffer.dropped == 0)
+assert(s.getvalue() + o.drain() == "".join(
+		["line%i\r\n" % i for i in range(5)]
+	))
+
+# buffered text is written at exit
+s = io.StringIO()
+o = Output(output=s, flushint=60)
+o.output("last words")
+Output._at_exit()
+assert(s.getvalue() == "last words\r\n")
+o.flusher(None)
+
+
+report("Output: OK")
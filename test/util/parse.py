@@ -0,0 +1,49 @@
+#
+# Copyright 2020 justworx
+# This file is part of the trix project, distributed under the terms 
+# of the GNU Affero General Public License.
+#
+
+from .. import *
+from ...util.parse import *
+import io
+
+
+p = Parser()
+
+# sniffing - each result records the parser that succeeded
+assert(p.parse("['1', 2, None]") == ['1', 2, None])
+assert(p.lastformat == 'ast')
+assert(p.parse('{"a": true, "b": null}') == {'a': True, 'b': None})
+assert(p.lastformat == 'json')
+assert(p.parse(b'[1, 2]') == [1, 2])
+
+# a wrong guess still parses
+assert(p.parse('{"a": "don\'t"}') == {'a': "don't"})
+
+# format override
+try:
+	p.parse("['1']", format='json')
+	raise AssertionError("format override ignored")
+except Exception as ex:
+	assert(ex.args[0] == 'parse-error')
+
+assert(Parser(format='ast').parse("(1, 2)") == (1, 2))
+
+# unknown kwargs are not accepted
+try:
+	p.parse("[1]", fromat='json')
+	raise AssertionError("unknown kwarg accepted")
+except TypeError:
+	pass
+
+# streaming json
+chunks = ['{"a":1} [2', ',3] 12', '3 "x"']
+assert(list(p.iterjson(chunks)) == [{'a':1}, [2,3], 123, 'x'])
+
+lines = '\n'.join(['{"i": %i}' % i for i in range(100)]).encode('utf_8')
+items = list(p.iterjson(io.BytesIO(lines), chunksize=7))
+assert(len(items) == 100)
+assert(items[99] == {'i': 99})
+
+report("Parser: OK")
@@ -33,3 +33,37 @@ assert(u.port==443)
 assert(u.password=='Jelly')
 
 
+
+
+# cached parse results are copies
+u1 = urlinfo("http://example.com:9999/test?foo=bar")
+u1['path'] = '/changed'
+u2 = urlinfo("http://example.com:9999/test?foo=bar")
+assert(u2.path == '/test')
+assert(u2.port == 9999)
+
+# addrinfo cache
+addrcache.flush()
+a = urlinfo(('localhost', 80)).addrinfo()
+assert(urlinfo(('localhost', 80)).addrinfo() == a)
+assert(addrcache.status()['hits'] == 1)
+assert(addrcache.flush('localhost') == 1)
+
+# only failures that are not temporary are remembered
+import socket
+def fail(*a):
+	raise socket.gaierror(fail.code, "test")
+
+getaddrinfo = socket.getaddrinfo
+socket.getaddrinfo = fail
+try:
+	for fail.code, cached in [(socket.EAI_AGAIN, 0), (socket.EAI_NONAME, 1)]:
+		addrcache.flush()
+		try:
+			addrcache.getaddrinfo('nowhere.test', 80)
+		except socket.gaierror:
+			pass
+		assert(addrcache.status()['size'] == cached)
+finally:
+	socket.getaddrinfo = getaddrinfo
+	addrcache.flush()
@@ -9,6 +9,9 @@ from .tbase import * # trix, EncodingHelper, TBase
 import shlex
 
 
+CALLX_CHUNK = 65536  # max bytes read from a pipe at once
+
+
 class callx(TBase):
 	"""
 	Creates and handles Popen calls.
@@ -30,6 +33,10 @@ class callx(TBase):
 	 * version
 	 
 	
+	STREAMING:
+	Call `stream()` to receive output lines (or chunks) as they arrive,
+	or `callx.batch()` to run many commands in parallel.
+	
 	SEE ALSO:
 	 * the `cline` classmethod, below.
 	 
@@ -72,6 +79,49 @@ class callx(TBase):
 		return cls(args, **k)
 	
 	
+	#
+	#
+	# BATCH
+	#
+	#
+	@classmethod
+	def batch(cls, cmds, concurrency=4, timeout=None, **k):
+		"""
+		Run each command in list `cmds`, up to `concurrency` at a time,
+		and return a list of their callx objects, in the same order.
+		
+		Each process is complete when `batch` returns, so `text()`,
+		`stderr`, and `returncode` are ready to read. A command that 
+		can't be run (or that runs longer than `timeout` seconds) does 
+		not stop the others; its error is stored in the `error` property.
+		
+		Keyword arguments are passed to each callx object.
+		
+		EXAMPLE
+		>>> from trix.util.callx import *
+		>>> cc = callx.batch(["uname", "hostname", "whoami"])
+		>>> [c.text().strip() for c in cc]
+		['Linux', 'myhost', 'me']
+		
+		"""
+		items = [cls(cmd, **k) for cmd in cmds]
+		
+		# import now; a first import from several threads at once fails
+		trix.module("subprocess")
+		
+		def run(cx):
+			try:
+				cx.wait(timeout)
+			except Exception as ex:
+				cx.__error = xdata(error="err-callx-fail", python=repr(ex))
+		
+		futures = trix.module("concurrent.futures")
+		with futures.ThreadPoolExecutor(max(1, concurrency)) as pool:
+			list(pool.map(run, items))
+		
+		return items
+	
+	
 	#
 	#
 	# INIT
@@ -112,6 +162,10 @@ class callx(TBase):
 		ALTERNATELY:
 		Pass a keyword argument specifying a cline command. See below.
 		
+		Pass keyword argument `timeout` to limit the number of seconds
+		allowed for the process to finish; when exceeded, the process is
+		killed and TimeoutError is raised.
+		
 		"""
 		TBase.__init__(self, cmd=None, **k)
 		
@@ -119,6 +173,12 @@ class callx(TBase):
 		self.__rk = trix.kpop(k, "encoding errors mode max_size")
 		self.__rk.setdefault('encoding', DEF_ENCODE)
 		
+		self.__timeout = trix.kpop(k, "timeout").get("timeout")
+		self.__outb = []
+		self.__errb = []
+		self.__done = False
+		self.__error = None
+		
 		# remaining kwargs must be for Popen.
 		self.__k = k
 		
@@ -190,9 +250,10 @@ class callx(TBase):
 		self.__k.setdefault("stderr", m.PIPE)
 		try:
 			self.__x = m.Popen(self.__a, **self.__k)
-		except FileNotFoundError:
-			cmd = cmd.split()
-			self.__x = m.Popen(self.__a, **self.__k)
+		except FileNotFoundError as ex:
+			raise type(ex)("err-callx-fail", xdata(
+					reason="executable-not-found", args=self.__a
+				))
 		
 		return self
 	
@@ -209,14 +270,177 @@ class callx(TBase):
 		try:
 			return self.__reader
 		except:
+			self.wait(self.__timeout)
 			self.__buffer = trix.ncreate(
 				"util.stream.buffer.Buffer", 
-				self.x.stdout.read(), **self.__rk
+				b''.join(self.__outb), **self.__rk
 			)
+			self.__outb = []
 			self.__reader = self.__buffer.reader()
 			return self.__reader
 	
 	
+	#
+	#
+	# WAIT
+	#
+	#
+	def wait(self, timeout=None):
+		"""
+		Wait for the process to finish, collecting its output. Stdout
+		and stderr are read together, so neither pipe can fill and stall
+		the process. Returns self.
+		"""
+		if not self.__done:
+			for name, data in self.__iterraw(timeout):
+				if name == 'stdout':
+					self.__outb.append(data)
+		return self
+	
+	
+	#
+	#
+	# STREAM
+	#
+	#
+	def stream(self, lines=True, timeout=None, stderr=False):
+		"""
+		Generate decoded output as it arrives from the process.
+		
+		By default, each line of stdout is generated (without its line
+		ending); pass lines=False to receive each chunk of text as it's
+		read. Stderr is collected (see the `stderr` property) unless
+		`stderr` is True, in which case ("stdout", text) and 
+		("stderr", text) tuples are generated.
+		
+		If `timeout` seconds (default: the constructor's `timeout`) pass
+		before the process finishes, it's killed and TimeoutError is 
+		raised.
+		
+		Streamed stdout is not kept, so `text()` will not include it.
+		
+		EXAMPLE
+		>>> from trix.util.callx import *
+		>>> for line in callx("ping -c 3 localhost").stream(timeout=10):
+		...   print (line)
+		
+		"""
+		if timeout is None:
+			timeout = self.__timeout
+		
+		codecs = trix.module('codecs')
+		decoder = {}
+		partial = {}
+		for name in ('stdout', 'stderr'):
+			decoder[name] = codecs.getincrementaldecoder(self.encoding)(
+					self.errors
+				)
+			partial[name] = ''
+		
+		item = (lambda name, text: (name, text)) if stderr else (
+				lambda name, text: text
+			)
+		
+		for name, data in self.__iterraw(timeout):
+			if (name == 'stderr') and not stderr:
+				continue
+			
+			text = decoder[name].decode(data)
+			if not lines:
+				if text:
+					yield item(name, text)
+			else:
+				L = (partial[name] + text).split('\n')
+				partial[name] = L.pop()
+				for line in L:
+					yield item(name, line.rstrip('\r'))
+		
+		# anything left after the last line ending
+		for name in ('stdout', 'stderr') if stderr else ('stdout',):
+			text = partial[name] + decoder[name].decode(b'', True)
+			if text:
+				yield item(name, text.rstrip('\r') if lines else text)
+	
+	
+	#
+	#
+	# STDERR / RETURNCODE / ERROR
+	#
+	#
+	@property
+	def stderr(self):
+		"""Text the process wrote to stderr (once it has been read)."""
+		return self.decode(b''.join(self.__errb))
+	
+	@property
+	def returncode(self):
+		"""The process return code; None if it hasn't finished."""
+		try:
+			return self.__x.poll()
+		except AttributeError:
+			return None # not started
+	
+	@property
+	def error(self):
+		"""Error data for a command that failed within `batch()`."""
+		return self.__error
+	
+	
+	#
+	# ITER-RAW
+	#  - Read stdout and stderr together through a selector, generating
+	#    ("stdout"|"stderr", bytes) as data arrives. Stderr is kept in
+	#    `self.__errb`. When both pipes are closed, wait for the process.
+	#
+	def __iterraw(self, timeout=None):
+		x = self.x
+		read = trix.module('os').read
+		selectors = trix.module('selectors')
+		deadline = time.time() + timeout if timeout else None
+		
+		sel = selectors.DefaultSelector()
+		try:
+			for name, f in (('stdout', x.stdout), ('stderr', x.stderr)):
+				if f and not f.closed:
+					sel.register(f, selectors.EVENT_READ, name)
+			
+			while sel.get_map():
+				wait = None
+				if deadline:
+					wait = deadline - time.time()
+					if wait <= 0:
+						self.__expire(timeout)
+				
+				for key, mask in sel.select(wait):
+					data = read(key.fd, CALLX_CHUNK)
+					if not data:
+						sel.unregister(key.fileobj)
+						key.fileobj.close()
+					else:
+						if key.data == 'stderr':
+							self.__errb.append(data)
+						yield (key.data, data)
+			
+			try:
+				x.wait(max(0, deadline-time.time()) if deadline else None)
+			except trix.module("subprocess").TimeoutExpired:
+				self.__expire(timeout)
+			
+			self.__done = True
+		finally:
+			sel.close()
+	
+	
+	def __expire(self, timeout):
+		# Kill the process; raise TimeoutError.
+		self.x.kill()
+		self.x.wait()
+		self.__done = True
+		raise TimeoutError("err-callx-timeout", xdata(
+				args=self.__a, timeout=timeout
+			))
+	
+	
 	#
 	#
 	# X - The Executable Object
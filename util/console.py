@@ -108,8 +108,7 @@ class Console(BaseOutput):
 		wrapname = self.__wrap.name if self.__wrap else None # was "None"
 		
 		# formatting for textwrap
-		jc = trix.jconfig(trix.npath(self.ConsoleConfig).path)
-		self.__text = jc.obj
+		self.__text = trix.nconfig(self.ConsoleConfig)
 		
 		# constructor kwargs for textwrapping
 		tk = trix.kcopy(k, self.TextK_Updates)
@@ -122,7 +121,7 @@ class Console(BaseOutput):
 		
 		
 		# prompt
-		self.__prompt = jc.obj.get('prompt') or self.ConsolePrompt
+		self.__prompt = self.__text.get('prompt') or self.ConsolePrompt
 		#ConsoleCmdKey  = '/'
 		#ConsoleWrapKey = '!'
 		#ConsolePrompt  = "trix.Console:"
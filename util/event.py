@@ -29,8 +29,21 @@ class Event(object):
 		self.__treply = None
 		self.__reply = None
 		self.__error = None
+		self.__cid = None
 	
 	
+	@property
+	def cid(self):
+		"""
+		Correlation id; set by the requester so that a reply may be 
+		matched to its request when replies arrive out of order.
+		"""
+		return self.__cid
+	
+	@cid.setter
+	def cid(self, cid):
+		self.__cid = cid
+	
 	@property
 	def reply(self):
 		"""The reply sepecified by whatever is handling this event."""
@@ -152,7 +165,8 @@ class Event(object):
 			'argc'  : self.argc,
 			'argv'  : self.argv,
 			'reply' : self.reply,
-			'error' : self.error
+			'error' : self.error,
+			'cid'   : self.cid
 		}
 	
 	
@@ -5,7 +5,7 @@
 #
 
 
-import ast
+import ast, os
 from ..util.dq import *
 from ..util.enchelp import *
 from ..fmt.jformat import *
@@ -341,3 +341,124 @@ class JConfig(EncodingHelper):
 				NOTE="This seems to be happening when the file path" +
 				     "is invalid."
 			))
+
+
+
+
+#
+# CONFIG CACHE
+#  - Parsed config files, keyed by absolute path (and kwargs), each
+#    kept for as long as the file's (dev, ino, mtime_ns, size) stamp
+#    is unchanged.
+#  - Paths are made absolute on each call (so relative paths follow
+#    the current directory) and stat'ed through any symlink, so a
+#    retargeted link changes the stamp.
+#
+class ConfigCache(object):
+	"""
+	A process-wide cache of parsed config files, used by `trix.config`
+	and `trix.nconfig`.
+	
+	Each call to `get` stats the file; if it hasn't changed since it
+	was parsed, a copy of the cached object is returned. Copies are 
+	returned so that callers may alter their config (as many do) 
+	without affecting the cache.
+	
+	Use `trix.config.invalidate()` to clear the cache, or pass a path
+	to clear only that file.
+	"""
+	
+	def __init__(self):
+		self.__cache = {}
+		self.__lock = trix.module('threading').Lock()
+		self.__hits = 0
+		self.__misses = 0
+	
+	
+	def get(self, path, **k):
+		"""Return a copy of the config object parsed from `path`."""
+		apath = self.abspath(path)
+		key = (apath, repr(sorted(k.items()))) if k else (apath, '')
+		
+		stamp = self.stamp(apath)
+		with self.__lock:
+			item = self.__cache.get(key)
+			if item and stamp and (item[0] == stamp):
+				self.__hits += 1
+				return self.copy(item[1])
+			self.__misses += 1
+		
+		# load (and possibly create) the file; then stat it again, since
+		# loading may have created it from a default
+		obj = trix.jconfig(path, **k).obj
+		stamp = self.stamp(apath)
+		if stamp:
+			rpath = os.path.realpath(apath)
+			with self.__lock:
+				self.__cache[key] = (stamp, obj, rpath)
+		return self.copy(obj)
+	
+	
+	def invalidate(self, path=None):
+		"""
+		Remove `path` (and any other path to the same file) from the
+		cache; if no path is given, clear the entire cache. Returns the
+		number of entries removed.
+		"""
+		if path is not None:
+			apath = self.abspath(path)
+			rpath = os.path.realpath(apath)
+		
+		with self.__lock:
+			if path is None:
+				n = len(self.__cache)
+				self.__cache.clear()
+				return n
+			
+			keys = [key for key in self.__cache if (key[0] == apath) or (
+					self.__cache[key][2] == rpath)]
+			for key in keys:
+				del(self.__cache[key])
+			return len(keys)
+	
+	
+	def status(self):
+		"""Return a dict describing cache usage."""
+		with self.__lock:
+			return dict(
+				files = len(self.__cache),
+				hits = self.__hits,
+				misses = self.__misses
+			)
+	
+	
+	@classmethod
+	def abspath(cls, path):
+		"""Return the absolute path for `path` (relative to the cwd)."""
+		return os.path.abspath(os.path.expanduser(path))
+	
+	@classmethod
+	def stamp(cls, path):
+		"""
+		Return (dev, ino, mtime_ns, size) for the file at `path` (through
+		any symlinks), or None.
+		"""
+		try:
+			st = os.stat(path)
+			return (st.st_dev, st.st_ino, st.st_mtime_ns, st.st_size)
+		except OSError:
+			return None
+	
+	@classmethod
+	def copy(cls, o):
+		"""Copy the lists and dicts in a parsed config structure."""
+		if isinstance(o, dict):
+			return {k:cls.copy(v) for k,v in o.items()}
+		if isinstance(o, list):
+			return [cls.copy(v) for v in o]
+		if isinstance(o, tuple):
+			return tuple(cls.copy(v) for v in o)
+		return o
+
+
+configcache = ConfigCache()
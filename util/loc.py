@@ -6,7 +6,7 @@
 
 
 from .. import *
-import locale
+import locale, os, json
 
 
 class BaseLocale(object):
@@ -76,6 +76,16 @@ class Locale(BaseLocale):
 	
 	AssetPath = '%s/assets/locale_json.tar.gz' % DEF_CACHE
 	
+	#
+	# QUERY CACHE
+	#  - Locale dicts queried from system locale data are kept in memory
+	#    and saved as json files in a subdirectory of `CachePath` that's
+	#    named for the python and libc versions that produced them.
+	#
+	CachePath = '%s/locale' % DEF_CACHE
+	__memo = {}
+	__ctag = None
+	
 	def __init__(self, loc_str):
 		"""
 		Pass a locale description string. Returns a dict containing
@@ -186,12 +196,131 @@ class Locale(BaseLocale):
 	def query_locale_dict(cls, loc_str):
 		"""
 		Query locale dict from system locale data.
+		
+		Results are cached in memory and on disk (see `query_locale_dicts`)
+		so only the first query for each locale starts a new process.
+		Each call returns a new copy, which may be changed freely.
+		"""
+		try:
+			return trix.module('copy').deepcopy(Locale.__memo[loc_str])
+		except KeyError:
+			return cls.query_locale_dicts([loc_str])[loc_str]
+	
+	
+	
+	@classmethod
+	def query_locale_dicts(cls, loc_strs):
+		"""
+		Return a dict containing the locale dict for each locale string
+		in list `loc_strs`.
+		
+		Each locale is looked up first in memory, then in the disk cache;
+		any remaining locales are queried from system locale data all at
+		once, in a single process, then cached.
+		
+		```python3
+		from trix.util.loc import *
+		dd = Locale.query_locale_dicts(["en_US.utf8", "fr_FR.utf8"])
+		
+		```
+		"""
+		memo = Locale.__memo
+		copy = trix.module('copy').deepcopy
+		result = {}
+		missing = []
+		for loc_str in loc_strs:
+			if loc_str in memo:
+				result[loc_str] = copy(memo[loc_str])
+			else:
+				d = cls.__cacheread(loc_str)
+				if d is None:
+					missing.append(loc_str)
+				else:
+					memo[loc_str] = d
+					result[loc_str] = copy(d)
+		
+		if missing:
+			cline = [sys.executable, '-m', trix.innerfpath(), 'loc', '-c']
+			cx = trix.callx(cline + missing)
+			js = cx.reader().read()
+			try:
+				dd = trix.jparse(js)
+			except Exception as ex:
+				raise ValueError("err-locale-query", xdata(
+						signature=missing, stderr=cx.stderr[-1024:],
+						suggest="verify-locale-signature"
+					))
+			
+			if len(missing) == 1:
+				dd = {missing[0] : dd}
+			
+			for loc_str in missing:
+				d = dd.get(loc_str)
+				if (not d) or ('error' in d):
+					raise ValueError("err-unsupported-signature", xdata(
+							signature=loc_str, suggest="verify-locale-signature"
+						))
+				cls.__cachewrite(loc_str, d)
+				memo[loc_str] = d
+				result[loc_str] = copy(d)
+		
+		return result
+	
+	
+	
+	@classmethod
+	def clearcache(cls, disk=False):
+		"""
+		Clear cached locale dicts from memory; pass disk=True to remove
+		those saved on disk, too.
+		"""
+		Locale.__memo.clear()
+		if disk:
+			trix.module('shutil').rmtree(cls.cachedir(), ignore_errors=True)
+	
+	
+	
+	@classmethod
+	def cachedir(cls):
+		"""
+		Return the directory where locale dicts are cached. It's named
+		for the python and libc versions, since either may affect the
+		locale data.
 		"""
-		cline = "%s -m %s loc -c %s" % (
-				sys.executable, trix.innerfpath(), loc_str
+		if not Locale.__ctag:
+			platform = trix.module('platform')
+			libc = ''.join(platform.libc_ver()) or sys.platform
+			Locale.__ctag = "py%s-%s" % (platform.python_version(), libc)
+		
+		return os.path.join(
+				os.path.expanduser(cls.CachePath), Locale.__ctag
 			)
-		cx = trix.callx(cline)
-		js = cx.reader().read()
-		return trix.jparse(js)
+	
+	
+	
+	@classmethod
+	def __cacheread(cls, loc_str):
+		# Return the cached dict for `loc_str`, or None.
+		try:
+			path = os.path.join(cls.cachedir(), "%s.json" % loc_str)
+			with open(path, encoding='utf_8') as f:
+				return json.load(f)
+		except (OSError, ValueError):
+			return None
+	
+	
+	@classmethod
+	def __cachewrite(cls, loc_str, d):
+		# Save `d`; a cache that can't be written is simply not used.
+		try:
+			cdir = cls.cachedir()
+			os.makedirs(cdir, exist_ok=True)
+			path = os.path.join(cdir, "%s.json" % loc_str)
+			temp = "%s.%i" % (path, os.getpid())
+			with open(temp, 'w', encoding='utf_8') as f:
+				json.dump(d, f)
+			os.replace(temp, path)
+		except OSError:
+			pass
 
 
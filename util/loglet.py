@@ -5,47 +5,285 @@
 #
 
 from ..fmt import *  #trix, time
-import os
+import os, json, atexit, weakref, collections, threading
 
 
 FMT_TIME = "%Y-%m-%d %H:%M:%S"
 DEF_NAME = "./loglet"
 
+DEF_QSIZE = 8192      # max entries waiting to be written
+DEF_INTERVAL = 0.5    # seconds between writer passes
+DEF_FLUSHSIZE = 256   # wake the writer when this many entries wait
+DEF_BACKUPS = 5       # rotated files kept (path.1 ... path.N)
+
+# open loglets, closed by one exit hook; the set doesn't keep them alive
+LOGLETS = weakref.WeakSet()
+
 
 class Loglet(object):
-	"""Debugging Logger."""
+	"""
+	Debugging Logger.
+	
+	Calling a Loglet formats the entry and appends its text to a
+	bounded queue; a background thread writes queued entries in
+	batches, flushing once per batch, so logging costs callers very
+	little. Entries are formatted when logged, so later changes to
+	logged objects don't show. If the queue is full, or an entry can't
+	be written, it's dropped and counted (see `status()`).
+	
+	Each entry is written as one line of compact JSON:
+	  {"t":1541437100.123,"pid":1234,"a":["a","b"],"k":{"x":1}}
+	
+	Pass format="display" for the older, human-friendly JDisplay format.
+	
+	KWARGS:
+	 * tag       : file name suffix; default is the process id
+	 * qsize     : max queued entries (default 8192)
+	 * interval  : seconds between writes (default 0.5)
+	 * flushsize : write as soon as this many entries wait (default 256)
+	 * maxbytes  : rotate when the file reaches this size (default 0=off)
+	 * rotate    : rotate every `rotate` seconds (default 0=off)
+	 * backups   : number of rotated files to keep (default 5)
+	 * format    : "json" (default) or "display"
+	
+	Remaining kwargs are passed to `open()`.
+	"""
 	
 	def __init__(self, path=DEF_NAME, **k):
 		"""Pass the path to an output file. Default: './loglet'"""
 		tag = trix.kpop(k, 'tag')
 		path = "%s.%s" % (path, tag.get('tag', str(os.getpid())))
-		self.logf = open(path, 'a', **k)
+		
+		cfg = trix.kpop(k, ['qsize', 'interval', 'flushsize', 'maxbytes',
+				'rotate', 'backups', 'format'])
+		
+		self.__path = path
+		self.__openk = k
+		self.__qsize = cfg.get('qsize', DEF_QSIZE)
+		self.__interval = cfg.get('interval', DEF_INTERVAL)
+		self.__flushsize = cfg.get('flushsize', DEF_FLUSHSIZE)
+		self.__maxbytes = cfg.get('maxbytes', 0)
+		self.__rotate = cfg.get('rotate', 0)
+		self.__backups = cfg.get('backups', DEF_BACKUPS)
+		self.__format = cfg.get('format', 'json')
+		
+		# appending to/popping from a deque is atomic, so callers never
+		# wait on a lock; the writer holds `__wlock` while it writes
+		self.__q = collections.deque()
+		self.__wake = threading.Event()
+		self.__wlock = threading.Lock()
+		self.__dropped = 0
+		self.__written = 0
+		self.__rotations = 0
+		self.__error = None
+		self.__closed = False
+		
+		self.logf = None
+		self.__open()
 		self.logf.write('\n\n\n#\n# %s\n#\n' % time.strftime(FMT_TIME))
 		self.logf.flush()
 		
+		# the writer holds only a weak reference, so an unused loglet is
+		# still released (and closed) by __del__
+		wself = weakref.ref(self)
+		self.__thread = threading.Thread(
+				target=Loglet.__writer, args=(wself, self.__wake),
+				name="loglet-writer"
+			)
+		self.__thread.daemon = True
+		self.__thread.start()
+		LOGLETS.add(self)
+	
 	
 	def __del__(self):
 		"""Closes loglet."""
-		self.logf.flush()
-		self.logf.close()
+		try:
+			self.close()
+		except:
+			pass
+	
 	
 	def __call__(self, *a, **k):
-		tm = time.strftime(FMT_TIME)
-		entry = list(a)
-		if k:
-			entry.append(k)
-		js = self.jout(entry)
-		self.logf.write('\n"%s %f %i" = %s\n' % (
-				tm, time.time(), trix.pid(), js
-			))
-		self.logf.flush()
+		"""Queue an entry to be written."""
+		if len(self.__q) >= self.__qsize:
+			self.__dropped += 1
+		else:
+			self.__q.append(self.entry(time.time(), a, k))
+			if len(self.__q) >= self.__flushsize:
+				self.__wake.set()
+	
+	
+	@property
+	def path(self):
+		"""Path to the current log file."""
+		return self.__path
+	
+	@property
+	def dropped(self):
+		"""Count of entries dropped (queue full, or failed to write)."""
+		return self.__dropped
+	
+	@property
+	def pending(self):
+		"""Count of entries waiting to be written."""
+		return len(self.__q)
+	
+	
+	def status(self):
+		"""Return a dict describing the loglet's current state."""
+		return dict(
+			path = self.__path,
+			format = self.__format,
+			pending = len(self.__q),
+			written = self.__written,
+			dropped = self.__dropped,
+			rotations = self.__rotations,
+			error = self.__error,
+			closed = self.__closed
+		)
+	
 	
 	def jout(self, d):
 		return JDisplay().format(d)
 	
 	
+	def entry(self, t, a, k):
+		"""Return the text of one log entry, ending with a newline."""
+		if self.__format == 'display':
+			entry = list(a)
+			if k:
+				entry.append(k)
+			return '\n"%s %f %i" = %s\n' % (
+					time.strftime(FMT_TIME, time.localtime(t)), t, trix.pid(),
+					self.jout(entry)
+				)
+		
+		d = {"t":round(t, 6), "pid":trix.pid(), "a":a}
+		if k:
+			d['k'] = k
+		return json.dumps(d, separators=(',',':'), default=repr) + '\n'
+	
+	
 	def flush(self):
-		"""Debugging. So I can flush from the interpreter."""
+		"""Write all queued entries now."""
+		with self.__wlock:
+			self.__write()
+	
+	
+	def close(self):
+		"""Write any queued entries; stop the writer; close the file."""
+		if self.__closed:
+			return
+		self.__closed = True
+		self.__wake.set()
+		with self.__wlock:
+			self.__write()
+			if self.logf:
+				self.logf.close()
+				self.logf = None
+	
+	
+	#
+	# ROTATION
+	#
+	def rotate(self):
+		"""
+		Close the current file, shift older files to path.1 ... path.N,
+		and start a new file.
+		"""
+		with self.__wlock:
+			self.__rollover()
+	
+	
+	def __rollover(self):
 		if self.logf:
+			self.logf.close()
+			self.logf = None
+		if self.__backups > 0:
+			for i in range(self.__backups-1, 0, -1):
+				src = "%s.%i" % (self.__path, i)
+				if os.path.exists(src):
+					os.replace(src, "%s.%i" % (self.__path, i+1))
+			if os.path.exists(self.__path):
+				os.replace(self.__path, "%s.1" % self.__path)
+		else:
+			os.remove(self.__path)
+		self.__rotations += 1
+		self.__open()
+	
+	
+	def __open(self):
+		self.logf = open(self.__path, 'a', **self.__openk)
+		self.__size = self.logf.tell()
+		self.__rotateat = time.time()+self.__rotate if self.__rotate else 0
+	
+	
+	#
+	# WRITE
+	#  - Called with `__wlock` held. Writes everything queued as one
+	#    block (or one per file, when rotating), then flushes once.
+	#  - Entries that fail to write are counted as dropped, and the
+	#    error is kept for `status()`.
+	#
+	def __write(self):
+		q = self.__q
+		if not q or not self.logf:
+			return
+		
+		lines = []
+		while q:
+			lines.append(q.popleft())
+		
+		done = 0
+		try:
+			block = []
+			for text in lines:
+				if (self.__maxbytes and self.__size >= self.__maxbytes) or (
+						self.__rotateat and time.time() >= self.__rotateat
+					):
+					self.logf.write(''.join(block))
+					done += len(block)
+					self.__rollover()
+					block = []
+				block.append(text)
+				self.__size += len(text)
+			
+			self.logf.write(''.join(block))
 			self.logf.flush()
-	
\ No newline at end of file
+			done = len(lines)
+		except Exception as ex:
+			self.__dropped += len(lines) - done
+			self.__error = repr(ex)
+			raise
+		finally:
+			self.__written += done
+	
+	
+	@staticmethod
+	def __writer(wself, wake):
+		"""The background writer loop."""
+		while True:
+			self = wself()
+			if (self is None) or self.__closed:
+				return
+			interval = self.__interval
+			try:
+				self.flush()
+			except Exception:
+				pass
+			self = None
+			wake.wait(interval)
+			wake.clear()
+
+
+
+
+def close_all():
+	"""Close every open loglet, writing any queued entries."""
+	for lg in list(LOGLETS):
+		try:
+			lg.close()
+		except Exception:
+			pass
+
+atexit.register(close_all)
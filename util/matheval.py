@@ -5,7 +5,10 @@
 #
 
 from .. import *
-import ast, math, operator
+import ast, math, operator, functools
+
+
+MATH_CACHE_SIZE = 256  # compiled expressions kept by `compile_expr`
 
 
 #
@@ -18,9 +21,12 @@ def matheval(expr, vvars={}, fn={}):
 	Optional args `vvars` and `fn` may be given as dicts - the former
 	containing variables as key-value pairs, the later being executable
 	objects as key-value pairs.
+	
+	The expression is compiled by `compile_expr`, which caches it, so
+	repeated evaluation of the same expression is fast.
 	"""
 	 
-	r = __eval(ast.parse(expr, mode='eval'), vvars, fn)
+	r = compile_expr(expr)(vvars, fn)
 	return r
 	try:
 		if r == int(r):
@@ -73,25 +79,166 @@ except AttributeError:
 
 
 #
-# EVAL NODE
+# COMPILE EXPR
 #
-def __eval(node, vars, fn):
+def compile_expr(expr):
+	"""
+	Validate and compile math expression string `expr`, returning a
+	callable that evaluates it. Call the result passing optional dicts
+	`vvars` and `fn`, just as they're passed to `matheval`.
+	
+	The most recently used compiled expressions are cached, keyed by
+	expression text (see MATH_CACHE_SIZE).
+	
+	>>> f = compile_expr("a * 2 + sqrt(b)")
+	>>> f({'a':1, 'b':16})
+	6.0
+	"""
+	return __compile(expr)
+
+
+
+#
+# EVALUATE MANY
+#
+def evaluate_many(expr, rows, fn={}):
+	"""
+	Evaluate `expr` once for each set of variables in `rows`, returning
+	a list of results.
+	
+	Argument `rows` may be a list of dicts (each holding the variables
+	for one evaluation) or a dict of columns (each key a variable name,
+	each value a list of that variable's values).
+	
+	Results are the same as evaluating each row with `matheval`. If
+	numpy is installed and every variable value is a float, though,
+	the expression is evaluated over all rows at once, with each
+	variable a numpy float64 array (math functions are replaced by the
+	numpy functions of the same name, which may differ in the last
+	decimal place). Rows are evaluated one by one if any value is not
+	a float (so int arithmetic stays exact), if `fn` supplies any
+	function the expression calls (since it may not accept arrays),
+	or if numpy can't handle the expression or data.
+	
+	>>> evaluate_many("x*y", {'x':[1,2,3], 'y':[4,5,6]})
+	[4, 10, 18]
+	>>> evaluate_many("x*y", {'x':[1.,2.,3.], 'y':[4.,5.,6.]})
+	[4.0, 10.0, 18.0]
+	"""
+	f = compile_expr(expr)
+	
+	if isinstance(rows, dict):
+		columns = rows
+		count = len(next(iter(columns.values()))) if columns else 0
+		rows = None
+	else:
+		rows = list(rows)
+		columns = None
+		count = len(rows)
+	
+	if count and not (f.calls & set(fn)):
+		r = __vector(f, count, columns, rows)
+		if r is not None:
+			return r
+	
+	if rows is None:
+		names = list(columns.keys())
+		rows = [dict(zip(names, v)) for v in zip(*columns.values())]
+	
+	return [f(row, fn) for row in rows]
+
+
+
+#
+# VECTOR
+#  - Evaluate compiled `f` over numpy arrays, returning a list; return
+#    None if numpy isn't available or can't handle the data, so that
+#    the caller evaluates row by row (raising any errors as usual).
+#  - Only float values are evaluated this way; float64 arithmetic is
+#    python's float arithmetic, but ints would lose their exactness
+#    (and their type).
+#
+__np = None
+
+def __vector(f, count, columns, rows):
+	global __np
+	if __np is None:
+		try:
+			__np = (trix.module("numpy"),)
+		except ImportError:
+			__np = ()
+	if not __np:
+		return None
+	
+	np = __np[0]
+	try:
+		if columns is None:
+			columns = {k : [row[k] for row in rows] for k in rows[0]}
+		vars = {}
+		for k in columns:
+			if not all(type(v) is float for v in columns[k]):
+				return None
+			vars[k] = np.asarray(columns[k], dtype=float)
+			if vars[k].shape != (count,):
+				return None
+		
+		with np.errstate(all='raise'):
+			r = f(vars, __npfn(np))
+		
+		r = np.asarray(r, dtype=float)
+		return np.broadcast_to(r, (count,)).tolist()
+	except Exception:
+		return None
+
+
+@functools.lru_cache(1)
+def __npfn(np):
+	# numpy ufuncs standing in for math functions of the same name
+	return {k : getattr(np, k) for k in dir(math)
+			if isinstance(getattr(np, k, None), np.ufunc)
+		}
+
+
+
+#
+# COMPILE NODE
+#  - Compile each node into a closure taking (vars, fn). Everything
+#    that can be checked without variables is checked here, once.
+#
+@functools.lru_cache(MATH_CACHE_SIZE)
+def __compile(expr):
+	tree = ast.parse(expr, mode='eval')
+	root = __node(tree)
+	def evaluate(vvars={}, fn={}):
+		return root(vvars, fn)
+	evaluate.expr = expr
+	
+	# names of functions that `fn` may supply
+	evaluate.calls = frozenset([n.func.id for n in ast.walk(tree)
+			if isinstance(n, ast.Call) and isinstance(n.func, ast.Name)
+			and (n.func.id not in MATH_FN_GOOD)
+		])
+	return evaluate
+
+
+def __node(node):
 	
 	if isinstance(node, ast.Expression):
-		return __eval(node.body, vars, fn)
+		return __node(node.body)
 	
 	# NUMBER
 	elif isinstance(node, ast.Num):
-		return float(node.n)
+		n = float(node.n)
+		return lambda vars, fn: n
 	
 	# BINARY OP:
 	elif isinstance(node, ast.BinOp):
 		op_type = type(node.op)
 		if op_type in BOPS:
-			return BOPS[op_type](
-				__eval(node.left, vars, fn),
-				__eval(node.right, vars, fn)
-			)
+			op = BOPS[op_type]
+			left = __node(node.left)
+			right = __node(node.right)
+			return lambda vars, fn: op(left(vars, fn), right(vars, fn))
 		else:
 			raise ValueError("matheval-invalid-binary-op", xdata(
 					op=type(node.op).__name__
@@ -101,7 +248,9 @@ def __eval(node, vars, fn):
 	elif isinstance(node, ast.UnaryOp):
 		op_type = type(node.op)
 		if op_type in MATH_UOPS:
-			return MATH_UOPS[op_type](__eval(node.operand, vars, fn))
+			op = MATH_UOPS[op_type]
+			operand = __node(node.operand)
+			return lambda vars, fn: op(operand(vars, fn))
 		else:
 			raise ValueError("matheval-invalid-unary-op", xdata(
 					op=type(node.op).__name__
@@ -113,14 +262,17 @@ def __eval(node, vars, fn):
 	#   module.
 	#
 	elif isinstance(node, ast.Name):
-		if node.id in vars:
-			return vars[node.id]
-		elif node.id in MATH_NAMES:
-			return MATH_NAMES[node.id]
-		else:
-			raise ValueError("matheval-invalid-variable", xdata(
-					var=str(node.id)
-				))
+		name = node.id
+		def variable(vars, fn):
+			if name in vars:
+				return vars[name]
+			elif name in MATH_NAMES:
+				return MATH_NAMES[name]
+			else:
+				raise ValueError("matheval-invalid-variable", xdata(
+						var=str(name)
+					))
+		return variable
 	
 	#
 	# STRING:
@@ -130,12 +282,14 @@ def __eval(node, vars, fn):
 	#   I'll leave it here.
 	#
 	elif isinstance(node, ast.Str):
-		return node.s
+		s = node.s
+		return lambda vars, fn: s
 	
 	#
 	# FUNCTIONS:
 	# - Handle the functions described in the math module and relevant
-	#   builtin functions.
+	#   builtin functions. Functions from the `fn` dict are known only
+	#   when the expression is evaluated, so are looked up then.
 	#
 	elif isinstance(node, ast.Call):
 		if not isinstance(node.func, ast.Name):
@@ -143,28 +297,21 @@ def __eval(node, vars, fn):
 					name=str(ast.Name), require=str(node.func)
 				))
 		
-		if node.func.id == MATH_FN_GOOD:
-			func = MATH_FN_GOOD[node.func.id]
-		elif node.func.id in fn:
-			func = fn[node.func.id]
-		elif not node.func.id in MATH_FN_BAD:
-			func = getattr(math, node.func.id, None)
-		if func is None:
-			raise ValueError("matheval-invalid-function", xdata(
-					name=node.func.id, value=None
-				))
+		name = node.func.id
+		good = MATH_FN_GOOD.get(name)
+		mfn = None if name in MATH_FN_BAD else getattr(math, name, None)
+		args = [__node(v) for v in node.args or []]
 		
-		if node.args is not None:
-			args = [__eval(v, vars, fn) for v in node.args]
-		else:
-			args = []
-		return func(*args)
+		def call(vars, fn):
+			func = good or fn.get(name) or mfn
+			if func is None:
+				raise ValueError("matheval-invalid-function", xdata(
+						name=name, value=None
+					))
+			return func(*[a(vars, fn) for a in args])
+		return call
 	
 	else:
 		raise ValueError("matheval-invalid-node-type", xdata(
 			nodetype=type(node).__name__
 		))
-
-
-
-
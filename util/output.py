@@ -7,6 +7,7 @@
 
 from .enchelp import * # trix, sys
 from .stream.buffer import *
+import atexit, weakref
 
 
 #
@@ -54,7 +55,7 @@ class BaseOutput(EncodingHelper):
 		
 		config = config or {}
 		config.update(k)
-			
+		
 		# defaults for EncodingHelper
 		config.setdefault("encoding", DEF_ENCODE)
 		config.setdefault("errors", DEF_ERRORS)
@@ -127,7 +128,7 @@ class BaseOutput(EncodingHelper):
 	def newl(self):
 		"""Newline character(s). Given in config."""
 		return self.__newl
-
+	
 	
 	#
 	#
@@ -163,16 +164,41 @@ class BaseOutput(EncodingHelper):
 #
 # ------------------------------------------------------------------
 class Output(BaseOutput):
-	"""Management of "pausable" text output."""
+	"""
+	Management of "pausable" text output.
+	
+	Text is written to the target stream immediately unless output is
+	paused, in which case it's held in an `OutputBuffer` until output
+	resumes. The buffer is bounded; see config keys "maxbuf" and 
+	"overflow", below.
+	
+	If config key "flushint" is given, text is buffered (while it fits)
+	and a background thread writes it to the target every `flushint`
+	seconds, coalescing many small writes into one. Unpaused text that
+	won't fit is written at once, with the buffered text, rather than
+	discarded.
+	
+	Buffered text left in any Output is written when the program exits.
+	"""
 	
 	#
-	# default pause-buffer size: 16K
-	#  - This is the memory buffer max size - any additional data is
-	#    written to a temp file. All buffered data is restored after
-	#    pause state ends.
+	# default pause-buffer max size: 1M characters
+	#  - Once this much text is buffered, the `overflow` policy decides
+	#    what's kept.
 	#
-	PauseBufferSz = 2**14
-
+	PauseBufferMax = 2**20
+	
+	#
+	# OVERFLOW POLICIES
+	#  - oldest : discard the oldest buffered text (the default)
+	#  - newest : discard the text that doesn't fit
+	#  - write  : write buffered text to the target, even though paused
+	#
+	Overflow = ['oldest', 'newest', 'write']
+	
+	# live Output objects, flushed at exit
+	__outputs = weakref.WeakSet()
+	
 	
 	#
 	#
@@ -186,7 +212,7 @@ class Output(BaseOutput):
 		`pause()` and `resume()` methods to pause and resume output.
 		"""
 		trix.signals().add(signum, cls.pausetoggle)
-
+	
 	
 	#
 	#
@@ -199,9 +225,12 @@ class Output(BaseOutput):
 		Output. Optional kwargs update config values. 
 		
 		Config keys specific to this class:
-		 * bufsz : Initial pause-buffer size (default, 16K). This is NOT
-		           a maximum size, but rather the size at which the temp
-		           buffer storage will resort to writing to disk.
+		 * maxbuf   : Max number of characters held while paused
+		              (default, 1M).
+		 * overflow : What to do when text won't fit the buffer; one of
+		              "oldest" (default), "newest", or "write".
+		 * flushint : If given, seconds between writes by a background
+		              flusher thread (default: None; write immediately).
 		"""
 		
 		k.setdefault('encoding', DEF_ENCODE)
@@ -213,13 +242,28 @@ class Output(BaseOutput):
 		#
 		BaseOutput.__init__(self, config, **k) # <-- sets self.config
 		
-		# defaults for Buffer
-		self.config.setdefault("bufsz", self.PauseBufferSz)
+		overflow = self.config.get('overflow', 'oldest')
+		if overflow not in self.Overflow:
+			raise ValueError("err-invalid-overflow", xdata(
+					overflow=overflow, use1=self.Overflow
+				))
 		
-		# create buffer for paused buffering
-		self.__buffer = Buffer(**self.config)
-		self.__writer = self.buffer.writer().write
-
+		# one lock guards the buffer and all writes to the target
+		self.__lock = trix.module('threading').RLock()
+		self.__overflow = overflow
+		self.__buffer = OutputBuffer(
+				self.config.get('maxbuf', self.PauseBufferMax),
+				'newest' if overflow == 'newest' else 'oldest'
+			)
+		self.__writer = self.__buffer.write
+		
+		# optional background flusher
+		self.__flushint = None
+		if self.config.get('flushint'):
+			self.flusher(self.config['flushint'])
+		
+		Output.__outputs.add(self)
+	
 	
 	#
 	#
@@ -227,8 +271,14 @@ class Output(BaseOutput):
 	#
 	#
 	def __del__(self):
+		self.__flushint = None
+		try:
+			if not self.paused():
+				self.flush()
+		except Exception:
+			pass
 		self.__buffer = None
-
+	
 	
 	#
 	#
@@ -239,7 +289,7 @@ class Output(BaseOutput):
 	def buffer(self):
 		"""Buffered content, displayed only when pause-state is False."""
 		return self.__buffer
-
+	
 	
 	#
 	#
@@ -250,14 +300,25 @@ class Output(BaseOutput):
 	def writer(self):
 		"""For Output, writer is the buffer's writer."""
 		return self.__writer
-
+	
+	
+	#
+	#
+	# LOCK
+	#
+	#
+	@property
+	def lock(self):
+		"""The lock that guards buffered text and writes to target."""
+		return self.__lock
+	
 	
 	#
 	#
 	# OUTPUT
 	#
 	#
-	def output(self, text, newl=''):
+	def output(self, text, newl=None):
 		"""
 		Pause-aware output buffers text while paused.
 		
@@ -272,18 +333,22 @@ class Output(BaseOutput):
 		character needed. The `self.newl` can also be customized by 
 		passing keyword argument "newl" to the constructor.
 		"""
-		
-		#
-		# REM `BaseOutput.output` is writing to `self.writer`, which is
-		#     a Buffer object, so when it's called here the text is NOT
-		#     actually written to the target stream. It's only when 
-		#     `self.flushbuffer()` is called that the text is actually
-		#     written to the true output stream (self.target).
-		#
-		BaseOutput.output(self, text, newl)
-		if not self.paused():
-			self.flushbuffer()
-
+		text = "%s%s" % (text, self.newl if newl is None else newl)
+		with self.__lock:
+			B = self.__buffer
+			if self.__flushint or self.paused():
+				# unpaused text is written, not discarded, if it won't fit
+				if B.full(len(text)) and (
+						(self.__overflow == 'write') or not self.paused()
+					):
+					self.__write(B.drain() + text)
+				else:
+					B.write(text)
+			elif B.size:
+				self.__write(B.drain() + text)
+			else:
+				self.__write(text)
+	
 	
 	#
 	#
@@ -302,17 +367,10 @@ class Output(BaseOutput):
 		may need the ability to flush buffered text immediately after a 
 		change is detected in the pause status.
 		"""
-		#
-		# Maybe a thread lock here? or maybe not. Wouldn't it slow down
-		# unthreaded output? I'll just put the lock where the thread is.
-		#
-		if self.buffer.tell():
-			with thread.allocate_lock() as alock:
-				self.target.write(self.buffer.read())
-				self.target.flush()
-				self.buffer.seek(0)
-				self.buffer.truncate()
-
+		with self.__lock:
+			if self.__buffer.size:
+				self.__write(self.__buffer.drain())
+	
 	
 	#
 	#
@@ -322,7 +380,7 @@ class Output(BaseOutput):
 	def flushbuffer(self):
 		"""Alias for `flush`."""
 		return self.flush()
-
+	
 	
 	#
 	#
@@ -330,13 +388,75 @@ class Output(BaseOutput):
 	#
 	#
 	def drain(self):
-		if self.buffer.tell():
-			with thread.allocate_lock() as alock:
-				self.buffer.seek(0)
-				x = self.buffer.read()
-				self.buffer.seek(0)
-				self.buffer.truncate()
-				return x
+		"""Remove and return buffered text (or None, if there's none)."""
+		with self.__lock:
+			if self.__buffer.size:
+				return self.__buffer.drain()
+	
+	
+	#
+	#
+	# FLUSHER
+	#
+	#
+	def flusher(self, interval=None):
+		"""
+		Start a background thread that writes buffered text to the target
+		every `interval` seconds (unless paused). Pass a false value to
+		stop the thread; any buffered text is then written immediately.
+		"""
+		with self.__lock:
+			running = self.__flushint
+			self.__flushint = interval or None
+		
+		if not interval:
+			self.flush()
+		elif not running:
+			wself = trix.module('weakref').ref(self)
+			T = trix.module('threading').Thread(
+					target=Output.__flushloop, args=(wself,), name="output-flusher"
+				)
+			T.daemon = True
+			T.start()
+	
+	
+	@staticmethod
+	def __flushloop(wself):
+		# The flusher holds only a weak reference, so it ends when its
+		# Output is released (or when `flusher()` stops it).
+		while True:
+			self = wself()
+			interval = self.__flushint if self is not None else None
+			if not interval:
+				return
+			if not self.paused():
+				try:
+					self.flush()
+				except Exception:
+					pass
+			self = None
+			time.sleep(interval)
+	
+	
+	def __write(self, text):
+		# Called with the lock held.
+		self.target.write(text)
+		self.target.flush()
+	
+	
+	#
+	#
+	# AT EXIT
+	#
+	#
+	@classmethod
+	def _at_exit(cls):
+		# Write whatever is still buffered, paused or not.
+		for obj in list(cls.__outputs):
+			try:
+				obj.flusher(None)
+			except Exception:
+				pass
 	
 	
 	#
@@ -346,7 +466,7 @@ class Output(BaseOutput):
 	#
 	
 	__interrupted = False
-
+	
 	
 	#
 	#
@@ -357,7 +477,7 @@ class Output(BaseOutput):
 	def paused(cls):
 		"""Return True if paused, else False."""
 		return cls.__interrupted
-
+	
 	
 	#
 	#
@@ -372,7 +492,7 @@ class Output(BaseOutput):
 		Output will be buffered until `resume` is called. (See below.)
 		"""
 		cls.__interrupted = True
-
+	
 	
 	#
 	#
@@ -383,7 +503,7 @@ class Output(BaseOutput):
 	def resume(cls):
 		"""Resume. Display buffered output.""" 
 		cls.__interrupted = False
-
+	
 	
 	#
 	#
@@ -394,5 +514,103 @@ class Output(BaseOutput):
 	def pausetoggle(cls, *a):
 		"""Toggle pause status to it's opposite boolean value."""
 		cls.__interrupted = not cls.__interrupted
+
+
+
+
+
+
+#
+#
+#
+# OUTPUT BUFFER - Bounded, in-memory text buffer.
+#
+#
+#
+class OutputBuffer(object):
+	"""
+	A list of text chunks, held in memory, up to `maxsize` characters.
+	
+	If a write won't fit, either the oldest text is discarded to make 
+	room (overflow="oldest") or the new text is (overflow="newest").
+	The number of characters discarded is kept in `dropped`.
+	
+	OutputBuffer is not thread-safe; Output guards it with its lock.
+	"""
 	
+	def __init__(self, maxsize=None, overflow='oldest'):
+		self.__chunks = []
+		self.__size = 0
+		self.__maxsize = maxsize
+		self.__overflow = overflow
+		self.__dropped = 0
+	
+	@property
+	def size(self):
+		"""Number of characters buffered."""
+		return self.__size
+	
+	@property
+	def maxsize(self):
+		return self.__maxsize
+	
+	@property
+	def dropped(self):
+		"""Number of characters discarded on overflow."""
+		return self.__dropped
+	
+	def tell(self):
+		"""Number of characters buffered; same as `size`."""
+		return self.__size
+	
+	def full(self, n=0):
+		"""True if `n` more characters won't fit."""
+		return bool(self.__maxsize) and (self.__size+n > self.__maxsize)
+	
+	def write(self, text):
+		"""Append `text`, applying the overflow policy if needed."""
+		n = len(text)
+		if self.full(n):
+			if self.__overflow == 'newest':
+				self.__dropped += n
+				return
+			self.__discard(n)
+			if n > self.__maxsize:
+				self.__dropped += n - self.__maxsize
+				text = text[-self.__maxsize:]
+				n = len(text)
+		self.__chunks.append(text)
+		self.__size += n
+	
+	def read(self):
+		"""Return buffered text, leaving it in the buffer."""
+		if len(self.__chunks) > 1:
+			self.__chunks = [''.join(self.__chunks)]
+		return self.__chunks[0] if self.__chunks else ''
+	
+	def drain(self):
+		"""Remove and return all buffered text."""
+		text = ''.join(self.__chunks)
+		self.__chunks = []
+		self.__size = 0
+		return text
+	
+	def clear(self):
+		"""Discard all buffered text."""
+		self.__chunks = []
+		self.__size = 0
+	
+	def __discard(self, n):
+		# Drop the oldest chunks until `n` characters will fit.
+		C = self.__chunks
+		while C and (self.__size + n > self.__maxsize):
+			chunk = C.pop(0)
+			self.__size -= len(chunk)
+			self.__dropped += len(chunk)
+
 
+
+#
+# Write buffered output when the program terminates.
+#
+atexit.register(Output._at_exit)
@@ -1,6 +1,6 @@
 #
 # Copyright 2020 justworx
-# This file is part of the trix project, distributed under the terms 
+# This file is part of the trix project, distributed under the terms
 # of the GNU Affero General Public License.
 #
 
@@ -12,7 +12,23 @@
 
 
 from .enchelp import *
-import ast
+import ast, re
+
+
+PARSE_FORMATS = ('json', 'ast')
+SNIFF_SIZE = 4096
+STREAM_CHUNK = 65536
+
+#
+# SNIFFING
+#  - Only the start of the text is checked. JSON literals mean json;
+#    quotes, comments, and python literals mean ast. Anything else is
+#    tried as json first, since json.loads is much the faster parser.
+#  - Sniffing only decides which parser to try first; if it fails,
+#    the other is tried.
+#
+SNIFF_JSON = re.compile(r'\b(?:true|false|null)\b')
+SNIFF_AST = re.compile(r"'|#|\b(?:True|False|None)\b")
 
 
 class Parser(EncodingHelper):
@@ -30,25 +46,48 @@ class Parser(EncodingHelper):
 		Pass encoding (default: DEF_ENCODE),
 		and  errors   (default: DEF_ERRORS)
 		
+		Pass format="json" or format="ast" to use only that parser; by
+		default the format is guessed from the text.
+		
 		Call `parse()` passing JSON or AST parsable text.
 		
 		Returns the corresponding python object.
 		
 		"""
+		self.__format = self.checkformat(trix.kpop(k, 'format').get('format'))
+		self.__last = None
 		k.setdefault("encoding", DEF_ENCODE)
 		k.setdefault("errors", DEF_ERRORS)
 		EncodingHelper.__init__(self, **k)
 	
 	
-	def parse(self, text):
+	@property
+	def format(self):
+		"""The format given to the constructor, or None."""
+		return self.__format
+	
+	@property
+	def lastformat(self):
+		"""
+		The format ("json" or "ast") that parsed the most recent text.
+		Pass it as the `format` kwarg to skip guessing in later calls.
 		"""
-		Pass the text to parse.
+		return self.__last
+	
+	
+	def parse(self, text, format=None):
+		"""
+		Pass the text to parse. Optional `format` ("json" or "ast")
+		overrides the constructor's format for this call.
 		
 		EXAMPLE
 		>>> from trix.util.parse import *
 		>>> p = Parser()
 		>>> t = "['1','9', '10']"
 		>>> p.parse(t)
+		['1', '9', '10']
+		>>> p.lastformat
+		'ast'
 		"""
 		
 		#
@@ -56,26 +95,129 @@ class Parser(EncodingHelper):
 		#      break if the text is already unicode.
 		#
 		text = self.decode(text)
-		try:
+		
+		format = self.checkformat(format) or self.__format
+		if format:
+			order = (format,)
+		elif self.sniff(text) == 'ast':
+			order = ('ast', 'json')
+		else:
+			order = ('json', 'ast')
+		
+		errors = {}
+		for f in order:
 			try:
-				#
-				# check in python2 to see if this is necessary
-				# (and put in a try/except if it is!)
-				#
-				#txt = EncodingHelper(**k).decode()
-				#
-				return ast.literal_eval(text)
-			except:
-				# this should cause a exception that gives a line number
-				compile(text, text, 'eval')
-				raise # if not, raise anyway
+				result = json.loads(text) if f=='json' else ast.literal_eval(text)
+				self.__last = f
+				return result
+			except Exception as ex:
+				errors[f] = {"type" : type(ex), "args" : ex.args}
+		
+		raise Exception ("parse-error", xdata(text=text, **errors))
+	
+	
+	#
+	# ITER-JSON
+	#
+	def iterjson(self, source, chunksize=STREAM_CHUNK):
+		"""
+		Generate each JSON value from `source` as soon as it's complete.
+		
+		The `source` may be a file-like object (with a `read` method) or
+		any iterable of str or bytes chunks. Values may be separated by
+		whitespace or newlines (eg, JSON-lines files), so a long stream
+		can be handled without reading all of it into memory.
 		
-		except BaseException as ast_ex:
-			# ast failed - try json
+		>>> p = Parser()
+		>>> list(p.iterjson(['{"a":1} [2', ',3]']))
+		[{'a': 1}, [2, 3]]
+		"""
+		chunks = self.__chunks(source, chunksize)
+		decoder = json.JSONDecoder()
+		buf = ''
+		pos = 0
+		need = 0
+		eof = False
+		while True:
+			# skip whitespace between values
+			while pos < len(buf) and buf[pos] in ' \t\r\n':
+				pos += 1
+			
+			if pos < len(buf):
+				try:
+					obj, end = decoder.raw_decode(buf, pos)
+					
+					#
+					# A number (or literal) at the very end of the buffer may
+					# continue in the next chunk; containers and strings end
+					# with a closing character, so they're complete.
+					#
+					if eof or (end < len(buf)) or (buf[end-1] in '}]"'):
+						yield obj
+						pos = end
+						continue
+				except ValueError:
+					if eof:
+						raise
+					
+					# incomplete; read at least as much again before retrying,
+					# so a large document isn't re-scanned once per chunk
+					need = 2 * (len(buf) - pos)
+			elif eof:
+				return
+			
+			# drop what's been used and read more
+			buf = buf[pos:]
+			pos = 0
 			try:
-				return json.loads(text)
-			except BaseException as json_ex:
-				raise Exception ("parse-error", xdata(text=text, 
-					json = {"type" : type(json_ex), "args" : json_ex.args},
-					ast  = {"type" : type(ast_ex),  "args" : ast_ex.args}
+				buf += next(chunks)
+				while len(buf) < need:
+					buf += next(chunks)
+			except StopIteration:
+				eof = True
+			need = 0
+	
+	
+	def __chunks(self, source, chunksize):
+		# Generate str chunks from `source`; bytes are decoded
+		# incrementally so that multi-byte characters may be split.
+		decoder = trix.module('codecs').getincrementaldecoder(
+				self.encoding)(self.errors)
+		try:
+			read = source.read
+			source = iter(lambda: read(chunksize), source.read(0))
+		except AttributeError:
+			pass
+		
+		for chunk in source:
+			if not isinstance(chunk, str):
+				chunk = decoder.decode(chunk)
+			if chunk:
+				yield chunk
+		
+		tail = decoder.decode(b'', True)
+		if tail:
+			yield tail
+	
+	
+	@classmethod
+	def sniff(cls, text):
+		"""Return the format ("json" or "ast") to try first for `text`."""
+		head = text[:SNIFF_SIZE]
+		if SNIFF_JSON.search(head):
+			return 'json'
+		if SNIFF_AST.search(head):
+			return 'ast'
+		return 'json'
+	
+	
+	@classmethod
+	def checkformat(cls, format):
+		"""Return a valid format, or None; raise ValueError if invalid."""
+		if format in (None, 'auto'):
+			return None
+		if format not in PARSE_FORMATS:
+			raise ValueError("err-parse-format", xdata(
+					format=format, valid=PARSE_FORMATS
 				))
+		return format
@@ -425,7 +425,7 @@ class propbase(EncodingHelper):
 		try:
 			return self.__parser
 		except:
-			self.__parser = trix.ncreate("util.parse.Parser", **k)
+			self.__parser = trix.nfactory("util.parse.Parser")(**k)
 			return self.__parser
 			#
 			# I *THINK* this will be fine because the lifespan of any
@@ -490,7 +490,7 @@ class propbase(EncodingHelper):
 		This method does not return a propx object.
 		
 		"""
-		return trix.ncreate("data.cursor.Cursor", self.o, **k)
+		return trix.nfactory("data.cursor.Cursor")(self.o, **k)
 	
 	
 	#
@@ -545,7 +545,7 @@ class propbase(EncodingHelper):
 		>>>
 		 
 		"""
-		return trix.ncreate("data.pdq.Query", self.o, **k)
+		return trix.nfactory("data.pdq.Query")(self.o, **k)
 	
 	
 	#
@@ -603,7 +603,7 @@ class propbase(EncodingHelper):
 		>>> trix.display(['1', 'two'])
 		
 		"""
-		return propx(self.parser(**k).parse(self.o, **k))
+		return propx(self.parser(**k).parse(self.o))
 	
 	
 	
@@ -855,7 +855,7 @@ class propbase(EncodingHelper):
 		Returns a propstr object, converting the packaged data to its
 		string representation.
 		"""
-		return trix.ncreate("util.propx.propstr.propstr", str(self.o))
+		return trix.nfactory("util.propx.propstr.propstr")(str(self.o))
 	
 
 
@@ -888,13 +888,13 @@ def propx(o, *a, **k):
 	
 	try:
 		if o.values and o.keys:
-			return trix.ncreate("util.propx.propdict.propdict", o, *a, **k)
+			return trix.nfactory("util.propx.propdict.propdict")(o, *a, **k)
 	except AttributeError as ex:
 		pass
 		
 	try:
 		o.encode
-		return trix.ncreate("util.propx.propstr.propstr", o, *a, **k)
+		return trix.nfactory("util.propx.propstr.propstr")(o, *a, **k)
 	except AttributeError as ex:
 		pass
 	
@@ -902,7 +902,7 @@ def propx(o, *a, **k):
 		o.__setitem__
 		
 		try:
-			LIST = trix.ncreate("util.propx.proplist.proplist", o, *a, **k)
+			LIST = trix.nfactory("util.propx.proplist.proplist")(o, *a, **k)
 			ITEMS = LIST.o
 			
 			try:
@@ -927,26 +927,26 @@ def propx(o, *a, **k):
 		
 		except TypeError as ex:
 			#print (ex)
-			return trix.ncreate("util.propx.proplist.proplist", o, *a, **k)
+			return trix.nfactory("util.propx.proplist.proplist")(o, *a, **k)
 		
 		#
 		# If list items' lengths are equal, return propgrid.
 		#
-		return trix.ncreate("util.propx.proplist.propgrid", o, *a, **k)
+		return trix.nfactory("util.propx.proplist.propgrid")(o, *a, **k)
 			
 	except AttributeError as ex:
 		pass
 	
 	try:
 		o.__getitem__
-		return trix.ncreate("util.propx.propseq.propseq", o, *a, **k)
+		return trix.nfactory("util.propx.propseq.propseq")(o, *a, **k)
 	except AttributeError as ex:
 		pass
 	
 	try:
 		if o.__iter__ or (type(o).__name__ == 'generator'):
-			return trix.ncreate(
-					"util.propx.propiter.propiter", iter(o), *a ,**k
+			return trix.nfactory("util.propx.propiter.propiter")(
+					iter(o), *a ,**k
 				)
 	except AttributeError as ex:
 		pass
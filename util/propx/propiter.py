@@ -115,7 +115,7 @@ class propiter(propbase):
 		`trix.util.iter.iter` iterator is used by propiter.
 		
 		"""
-		return trix.ncreate('util.xiter.xiter', self.o)
+		return trix.nfactory('util.xiter.xiter')(self.o)
 	
 	
 	#
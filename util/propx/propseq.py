@@ -79,7 +79,7 @@ class propseq(propiter):
 		Return this object's sequence, self.o, as a list wrapped inside
 		a `proplist` object.
 		"""
-		return trix.ncreate("util.propx.proplist.proplist", list(self.o))
+		return trix.nfactory("util.propx.proplist.proplist")(list(self.o))
 	
 	
 	#
@@ -101,6 +101,6 @@ class propseq(propiter):
 					en="Grid rows must be of equal length."
 				))
 		
-		return trix.ncreate('util.propx.proplist.propgrid', list(self.o))
+		return trix.nfactory('util.propx.proplist.propgrid')(list(self.o))
 
 
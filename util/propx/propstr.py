@@ -25,7 +25,7 @@ class propstr(propseq):
 	def reader(self):
 		a = self.a
 		k = self.k
-		return trix.ncreate("util.stream.reader.Reader", self.o, *a, **k)
+		return trix.nfactory("util.stream.reader.Reader")(self.o, *a, **k)
 	
 	@property
 	def lines(self):
@@ -39,14 +39,14 @@ class propstr(propseq):
 		>>> px.lines.output()
 		
 		"""
-		return trix.ncreate(
-				"util.propx.proplist.proplist", self.o.splitlines()
+		return trix.nfactory("util.propx.proplist.proplist")(
+				self.o.splitlines()
 			)
 	
 	
 	def scan(self, **k):
 		"""
-		Return a data/Scanner object loaded with text `self.o`.
+		Return a data/FastScanner object loaded with text `self.o`.
 		
 		>>> from trix.util.propx import *
 		>>> px = propx("[1,2,3] means 'one, two, three'")
@@ -56,7 +56,7 @@ class propstr(propseq):
 		
 		"""
 		try:
-			return trix.ncreate('data.scan.Scanner', self.o, **k)
+			return trix.nfactory('data.scan.FastScanner')(self.o, **k)
 		except BaseException as ex:
 			raise type(ex)("err-propstr-scan", xdata(
 					data=self.o, k=k, python=str(ex)
@@ -85,7 +85,7 @@ class propstr(propseq):
 		>>> help(Query)
 		
 		"""
-		return trix.ncreate('data.pdq.Query', self.o, **k)
+		return trix.nfactory('data.pdq.Query')(self.o, **k)
 	
 	
 		
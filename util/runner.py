@@ -69,7 +69,7 @@ class Runner(Output):
 		self.__csock = None
 		self.__cport = None
 		self.__lineq = None
-		self.__jformat = trix.ncreate('fmt.JCompact')
+		self.__jformat = trix.nfactory('fmt.JCompact')()
 		
 		# Each subclass of Output must track its own pause status.
 		self.__pausestate = self.paused()
@@ -168,9 +168,9 @@ class Runner(Output):
 			#
 			# Set up for communication via socket connection.
 			#
-			self.__lineq = trix.ncreate('util.lineq.LineQueue')
+			self.__lineq = trix.nfactory('util.lineq.LineQueue')()
 			self.__cport = p = self.config["CPORT"]
-			self.__csock = trix.ncreate('util.sock.sockcon.sockcon', p)
+			self.__csock = trix.nfactory('util.sock.sockcon.sockcon')(p)
 			try:
 				self.__csock.writeline("%i" % trix.pid())
 			except Exception as ex:
@@ -486,7 +486,7 @@ class Runner(Output):
 			ps = self.paused()
 			if self.__pausestate != ps:
 				
-				with thread.allocate_lock() as alock:
+				with self.lock:
 					self.__pausestate = ps
 					if ps:
 						self.on_pause()
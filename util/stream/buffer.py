@@ -114,7 +114,7 @@ class Buffer(Stream):
 		self.applyEncoding(k)
 		k.setdefault('mode', self.mode or self.__defmode)
 		k.setdefault('keepopen', True)
-		return trix.ncreate('util.stream.writer.Writer', self.__f, **k)
+		return trix.nfactory('util.stream.writer.Writer')(self.__f, **k)
 	
 	# READER
 	def reader(self, **k):
@@ -122,4 +122,4 @@ class Buffer(Stream):
 		self.applyEncoding(k)
 		k.setdefault('mode', self.mode or self.__defmode)
 		k.setdefault('keepopen', True)
-		return trix.ncreate('util.stream.reader.Reader', self.__f, **k)
+		return trix.nfactory('util.stream.reader.Reader')(self.__f, **k)
@@ -7,6 +7,9 @@
 from . import *
 
 
+READ_CHUNK = 8192  # chars read at a time by the `chars` generator
+
+
 class Reader(Stream):
 	"""Reader of streams."""
 	
@@ -83,11 +86,12 @@ class Reader(Stream):
 					reason="text-mode-required"
 				))
 		
-		x = self.read(1)
+		# read a block at a time; a char at a time is very slow
+		x = self.read(READ_CHUNK)
 		while x:
-			yield x
-			x = self.read(1)
-		raise StopIteration()
+			for c in x:
+				yield c
+			x = self.read(READ_CHUNK)
 
 
 
@@ -10,6 +10,24 @@ try:
 except:
 	from urllib import parse as urlparse
 from .. import * # trix
+import collections
+
+
+#
+# CACHE DEFAULTS
+#  - URL_CACHE_SIZE : parsed url strings kept by urlinfo
+#  - ADDR_TTL       : seconds a getaddrinfo result remains valid
+#  - ADDR_NTTL      : seconds a failed lookup (gaierror) is remembered
+#  - ADDR_SIZE      : max addrinfo results kept
+#  - ADDR_NCODES    : gaierror codes that are remembered; others (such
+#                     as EAI_AGAIN) may be temporary, so aren't cached
+#
+URL_CACHE_SIZE = 512
+ADDR_TTL = 300
+ADDR_NTTL = 30
+ADDR_SIZE = 1024
+ADDR_NCODES = [getattr(socket, x) for x in ['EAI_NONAME', 'EAI_NODATA']
+		if hasattr(socket, x)]
 
 
 class urlinfo(object):
@@ -19,6 +37,14 @@ class urlinfo(object):
 				scheme username password host port path query fragment
 				""".strip().split()
 	
+	#
+	# PARSE CACHE
+	#  - Results of parsing url strings are kept, most recently used
+	#    last, keyed by url, defhost, and kwargs.
+	#
+	__lru = collections.OrderedDict()
+	__lrulock = trix.module('threading').Lock()
+	
 	def __init__(self, url=None, **k):
 		"""
 		Parse `url` (updated with k) and store member values.
@@ -36,10 +62,25 @@ class urlinfo(object):
 		
 		# get parsed url param dict
 		self.__dict = {}
-		try:
-			self.__uparsestr()
-		except:
-			self.__parse()
+		key = self.__lrukey(url, k)
+		if key is not None:
+			with urlinfo.__lrulock:
+				R = urlinfo.__lru.get(key)
+				if R is not None:
+					urlinfo.__lru.move_to_end(key)
+			if R is not None:
+				self.__dict = dict(R)
+			else:
+				try:
+					self.__uparsestr()
+					self.__lrusave(key, dict(self.__dict))
+				except:
+					self.__parse()
+		else:
+			try:
+				self.__uparsestr()
+			except:
+				self.__parse()
 		
 		# urlinfo object should behave like a dict, but have all its
 		# properties and public methods exposed.
@@ -82,11 +123,27 @@ class urlinfo(object):
 	def keys(self):
 		return self.__dict.keys()
 	
+	# CLEAR CACHE
+	@classmethod
+	def clearcache(cls, addr=True):
+		"""
+		Clear cached url parse results and, unless `addr` is False, the 
+		shared addrinfo cache.
+		"""
+		with urlinfo.__lrulock:
+			urlinfo.__lru.clear()
+		if addr:
+			addrcache.flush()
+	
 	# ADDR INFO
 	def addrinfo(self, **k):
 		"""
 		Use kwargs to narrow search to given family, type, protocol.
 		
+		Results come from the shared `addrcache`, so repeated lookups of
+		the same host don't wait on the resolver. Pass cache=False to
+		query the resolver directly.
+		
 		EXAMPLE
 		>>> ui = urlinfo("http://laptop.local")
 		>>> addr = ui.addrinfo(family="SOCK_STREAM")
@@ -117,6 +174,10 @@ class urlinfo(object):
 				)
 		
 			# return address info list
+			if k.get('cache', True):
+				return addrcache.getaddrinfo(
+						host, port, family, stype, proto, flags
+					)
 			return socket.getaddrinfo(host,port,family,stype,proto,flags)
 		except Exception as ex:
 			raise type(ex)(ex.args, xdata(error='err-addrinfo-fail',
@@ -244,6 +305,28 @@ class urlinfo(object):
 			))
 	
 	
+	#
+	# PARSE CACHE
+	#
+	def __lrukey(self, url, k):
+		# Only url strings (with hashable kwargs) are cached.
+		if isinstance(url, str):
+			try:
+				key = (url, self.__defhost, tuple(sorted(k.items())))
+				hash(key)
+				return key
+			except TypeError:
+				pass
+		return None
+	
+	
+	def __lrusave(self, key, R):
+		with urlinfo.__lrulock:
+			urlinfo.__lru[key] = R
+			if len(urlinfo.__lru) > URL_CACHE_SIZE:
+				urlinfo.__lru.popitem(last=False)
+	
+	
 	#
 	# PARSE-STRING
 	#
@@ -396,3 +479,101 @@ WRAP_PORTS = [
 ]
 	
 
+
+
+
+#
+# ADDR CACHE
+#
+class AddrCache(object):
+	"""
+	A process-wide cache of `socket.getaddrinfo` results, shared by
+	all urlinfo objects (and so by sockcon, Connect, and Client).
+	
+	Results are kept for `ttl` seconds. Lookups that fail because the
+	host is unknown (gaierror codes in ADDR_NCODES) are remembered for
+	`nttl` seconds, so an unknown host doesn't cost a resolver round
+	trip on each attempt; temporary failures are not remembered. At most `maxsize` results are
+	kept; the least recently used are dropped first.
+	
+	Use `addrcache.flush()` to clear the cache, or pass a host name to
+	clear only results for that host.
+	"""
+	
+	def __init__(self, ttl=ADDR_TTL, nttl=ADDR_NTTL, maxsize=ADDR_SIZE):
+		self.ttl = ttl
+		self.nttl = nttl
+		self.maxsize = maxsize
+		self.__cache = collections.OrderedDict()
+		self.__lock = trix.module('threading').Lock()
+		self.__hits = 0
+		self.__misses = 0
+	
+	
+	def getaddrinfo(self, host, port, family=0, type=0, proto=0, flags=0):
+		"""Same as `socket.getaddrinfo`, but cached."""
+		key = (host, port, family, type, proto, flags)
+		with self.__lock:
+			item = self.__cache.get(key)
+			if item and (item[0] > time.time()):
+				self.__cache.move_to_end(key)
+				self.__hits += 1
+				result = item[1]
+			else:
+				self.__misses += 1
+				result = None
+		
+		if result is not None:
+			if isinstance(result, Exception):
+				raise result.__class__(*result.args)
+			return list(result)
+		
+		try:
+			result = socket.getaddrinfo(*key)
+			self.__save(key, result, self.ttl)
+			return list(result)
+		except socket.gaierror as ex:
+			if self.nttl and (ex.errno in ADDR_NCODES):
+				self.__save(key, ex, self.nttl)
+			raise
+	
+	
+	def flush(self, host=None):
+		"""
+		Remove results for `host`; if no host is given, clear the entire
+		cache. Returns the number of entries removed.
+		"""
+		with self.__lock:
+			if host is None:
+				n = len(self.__cache)
+				self.__cache.clear()
+				return n
+			
+			keys = [key for key in self.__cache if key[0] == host]
+			for key in keys:
+				del(self.__cache[key])
+			return len(keys)
+	
+	
+	def status(self):
+		"""Return a dict describing the cache's current state."""
+		with self.__lock:
+			return dict(
+				size = len(self.__cache),
+				hits = self.__hits,
+				misses = self.__misses,
+				ttl = self.ttl,
+				nttl = self.nttl,
+				maxsize = self.maxsize
+			)
+	
+	
+	def __save(self, key, result, ttl):
+		with self.__lock:
+			self.__cache[key] = (time.time() + ttl, result)
+			self.__cache.move_to_end(key)
+			while len(self.__cache) > self.maxsize:
+				self.__cache.popitem(last=False)
+
+
+addrcache = AddrCache()
@@ -135,17 +135,10 @@ class xLocale(Locale):
 		return trix.jparse(j)
 	
 	
-	@classmethod
-	def query_locale_dict(cls, loc_str):
-		"""
-		Query locale dict from system locale data.
-		"""
-		cline = "%s -m %s loc -c %s" % (
-				sys.executable, trix.innerfpath(), loc_str
-			)
-		cx = trix.callx(cline)
-		js = cx.reader().read()
-		return trix.jparse(js)
+	#
+	# QUERY LOCALE DICT
+	#  - Inherited from Locale, which caches query results.
+	#
 
 
 